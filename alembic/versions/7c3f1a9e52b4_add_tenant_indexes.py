@@ -0,0 +1,73 @@
+"""Add tenant indexes
+
+Revision ID: 7c3f1a9e52b4
+Revises: d9164cc45119
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3f1a9e52b4"
+down_revision: Union[str, None] = "d9164cc45119"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# One index per filter of the repositories: lookups by employee on
+# attendances, overtimes and schedule details are already served by the
+# unique constraints, codes and tax numbers by their unique indexes.
+INDEXES = [
+    ("ix_companies_owner_id", "companies", ["owner_id"]),
+    ("ix_departments_company_id", "departments", ["company_id"]),
+    ("ix_positions_company_id", "positions", ["company_id"]),
+    ("ix_employees_company_id", "employees", ["company_id"]),
+    ("ix_employees_department_id", "employees", ["department_id"]),
+    ("ix_employees_position_id", "employees", ["position_id"]),
+    ("ix_insurance_policies_company_id", "insurance_policies", ["company_id"]),
+    ("ix_shifts_company_id", "shifts", ["company_id"]),
+    ("ix_schedules_company_id", "schedules", ["company_id"]),
+    ("ix_schedule_details_shift_id", "schedule_details", ["shift_id"]),
+    (
+        "ix_attendances_company_id_day",
+        "attendances",
+        ["company_id", "day_attendance"],
+    ),
+    ("ix_overtimes_company_id_day", "overtimes", ["company_id", "day_overtime"]),
+    ("ix_dependants_company_id", "dependants", ["company_id"]),
+    ("ix_dependants_employee_id", "dependants", ["employee_id"]),
+    ("ix_contract_histories_company_id", "contract_histories", ["company_id"]),
+    (
+        "ix_contract_histories_employee_id_type",
+        "contract_histories",
+        ["employee_id", "contract_type", "start_date"],
+    ),
+    (
+        "ix_payroll_managements_period",
+        "payroll_managements",
+        ["company_id", "year", "month"],
+    ),
+    (
+        "ix_payroll_managements_employee_period",
+        "payroll_managements",
+        ["employee_id", "contract_history_id", "year", "month"],
+    ),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while PostgreSQL builds the
+    # indexes, and cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,104 @@
+"""Partition attendances and overtimes by month
+
+Revision ID: b81d4e6f09a2
+Revises: 7c3f1a9e52b4
+Create Date: 2026-10-20 09:41:07.552913
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b81d4e6f09a2"
+down_revision: Union[str, None] = "7c3f1a9e52b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# PostgreSQL only. Both tables are rebuilt as RANGE partitioned tables with
+# one partition per month holding data plus the next MONTHS_AHEAD months and
+# a default partition; `python cli.py database partitions` keeps creating
+# them. Rows are copied under an exclusive lock, so run it in a maintenance
+# window. Unique constraints of a partitioned table must contain the
+# partition key, hence the primary key becomes (id, day).
+MONTHS_AHEAD = 3
+TABLES = {
+    "attendances": {
+        "column": "day_attendance",
+        "unique": "uq_employee_attendance",
+        "index": "ix_attendances_company_id_day",
+    },
+    "overtimes": {
+        "column": "day_overtime",
+        "unique": "uq_employee_overtime",
+        "index": "ix_overtimes_company_id_day",
+    },
+}
+
+
+def add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def rebuild(table: str, column: str, unique: str, index: str, partitioned: bool):
+    """Moves `table` into a new partitioned (or plain) table of the same name."""
+    old = f"{table}_old"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    for name in (f"{table}_pkey", unique, index):
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_old")
+    sequence = (
+        op.get_bind()
+        .execute(sa.text(f"SELECT pg_get_serial_sequence('{old}', 'id')"))
+        .scalar()
+    )
+
+    partition_by = f" PARTITION BY RANGE ({column})" if partitioned else ""
+    primary_key = f"id, {column}" if partitioned else "id"
+    op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS){partition_by}")
+    op.execute(
+        f"ALTER TABLE {table} "
+        f"ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key}), "
+        f"ADD CONSTRAINT {unique} UNIQUE (employee_id, {column}), "
+        f"ADD CONSTRAINT {table}_employee_id_fkey FOREIGN KEY (employee_id) "
+        "REFERENCES employees (id) ON DELETE CASCADE, "
+        f"ADD CONSTRAINT {table}_company_id_fkey FOREIGN KEY (company_id) "
+        "REFERENCES companies (id)"
+    )
+    op.execute(f"CREATE INDEX {index} ON {table} (company_id, {column})")
+
+    if partitioned:
+        first = op.get_bind().execute(sa.text(f"SELECT min({column}) FROM {old}"))
+        first = first.scalar() or date.today()
+        start = date(first.year, first.month, 1)
+        last = add_months(date.today().replace(day=1), MONTHS_AHEAD)
+        while start <= last:
+            end = add_months(start, 1)
+            op.execute(
+                f"CREATE TABLE {table}_{start:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+            start = end
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    # the id sequence belongs to the old table and would be dropped with it
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    op.execute(f"DROP TABLE {old}")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, names in TABLES.items():
+        rebuild(table, partitioned=True, **names)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, names in TABLES.items():
+        rebuild(table, partitioned=False, **names)
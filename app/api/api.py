@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -17,8 +16,11 @@ from app.api.routes.attendances.controllers import attendance_router
 from app.api.routes.overtimes.controllers import overtime_router
 from app.api.routes.dependants.controllers import dependant_router
 from app.api.routes.payroll_managements.controllers import payroll_management_router
+from app.api.routes.storage.controllers import storage_router
+from app.api.routes.system.controllers import system_router
 
 from app.core.config import settings
+from app.utils.responses import PayrollORJSONResponse
 
 # WARNING: Don't use this unless you want unauthenticated routes
 # authenticated_api_router = APIRouter()
@@ -34,7 +36,7 @@ class ErrorResponse(BaseModel):
 
 api_router = APIRouter(
     prefix=settings.API_VERSION_PREFIX,
-    default_response_class=JSONResponse,
+    default_response_class=PayrollORJSONResponse,
     responses={
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
@@ -65,10 +67,11 @@ router.include_router(
     prefix="/payroll_managements",
     tags=["payroll_managements"],
 )
+router.include_router(system_router, prefix="/system", tags=["system"])
 # router.include_router(
 #     schedule_detail_router, prefix="/schedule_details", tags=["schedule_details"]
 # )
-# router.include_router(storage_router, prefix="/storage", tags=["storage"])
+router.include_router(storage_router, prefix="/storage", tags=["storage"])
 
 # router.include_router(
 #     addendum_router,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, File, UploadFile
+from fastapi import APIRouter, File, Form, Query, Request, UploadFile
 
 from app.api.routes.attendances.schemas import (
     AttendanceRead,
@@ -8,18 +8,25 @@ from app.api.routes.attendances.schemas import (
     AttendancesRead,
     AttendanceUpdate,
 )
-from app.db.core import DbSession
+from app.core.config import settings
+from app.db.core import AsyncDbSession, DbSession
+from app.db.ingest import NDJSON_REQUEST_BODY
 from app.api.routes.attendances.services import (
+    async_get_multi_attendances_by_month,
+    attendance_buffer,
+    buffer_attendance,
+    create_batch_attendances,
     create_attendance,
     create_multi_attendances,
     delete_attendance,
     delete_multi_attendances,
     get_all_attendances,
     get_attendance_by_id,
-    get_multi_attendances_by_month,
     update_attendance,
     upload_excel,
 )
+from app.utils.models import BatchResult
+from app.utils.responses import PayrollORJSONResponse
 
 attendance_router = APIRouter()
 
@@ -32,17 +39,21 @@ def get_all(
     company_id: int,
 ):
     """Returns all attendances."""
-    return get_all_attendances(db_session=db_session, company_id=company_id)
+    return PayrollORJSONResponse(
+        get_all_attendances(db_session=db_session, company_id=company_id)
+    )
 
 
 # GET /attendances/period?m=month&y=year
 @attendance_router.get("/period", response_model=AttendancesRead)
-def get_multi_by_month(
-    *, db_session: DbSession, company_id: int, month: int, year: int
+async def get_multi_by_month(
+    *, db_session: AsyncDbSession, company_id: int, month: int, year: int
 ):
     """Returns all attendances based on the given month and year."""
-    return get_multi_attendances_by_month(
-        db_session=db_session, company_id=company_id, month=month, year=year
+    return PayrollORJSONResponse(
+        await async_get_multi_attendances_by_month(
+            db_session=db_session, company_id=company_id, month=month, year=year
+        )
     )
 
 
@@ -54,9 +65,19 @@ def get_one(*, db_session: DbSession, attendance_id: int):
 
 
 # POST /attendances
-@attendance_router.post("", response_model=AttendanceRead)
+@attendance_router.post(
+    "",
+    response_model=AttendanceRead,
+    responses={202: {"model": AttendanceCreate, "description": "Journaled"}},
+)
 def create_one(*, db_session: DbSession, attendance_in: AttendanceCreate):
-    """Creates a new attendance."""
+    """Creates a new attendance. With WRITE_BEHIND_ENABLED it is journaled
+    and upserted shortly after, the answer is a 202 without an id."""
+    if attendance_buffer.running:
+        return PayrollORJSONResponse(
+            buffer_attendance(attendance_in=attendance_in).model_dump(),
+            status_code=202,
+        )
     return create_attendance(db_session=db_session, attendance_in=attendance_in)
 
 
@@ -70,6 +91,23 @@ def create_multi(*, db_session: DbSession, attendance_list_in: AttendancesCreate
     )
 
 
+# POST /attendances/batch
+@attendance_router.post(
+    "/batch", response_model=BatchResult, openapi_extra=NDJSON_REQUEST_BODY
+)
+async def create_batch(
+    *,
+    request: Request,
+    db_session: AsyncDbSession,
+    batch_size: int = Query(settings.INGEST_BATCH_SIZE, ge=1, le=10000),
+):
+    """Upserts attendances from a streamed NDJSON body, one attendance per
+    line, and returns the errors of the refused lines."""
+    return await create_batch_attendances(
+        db_session=db_session, chunks=request.stream(), batch_size=batch_size
+    )
+
+
 # PUT /attendances/{attendance_id}
 @attendance_router.put("/{attendance_id}", response_model=AttendanceRead)
 def update_one(
@@ -99,6 +137,8 @@ def delete_one(*, db_session: DbSession, attendance_id: int):
 
 # POST /attendances/import-excel
 @attendance_router.post("/import-excel")
-def import_excel(*, db: DbSession, file: UploadFile = File(...)):
+def import_excel(
+    *, db: DbSession, file: UploadFile = File(...), company_id: int = Form(...)
+):
     """Imports attendances from an excel file."""
-    return upload_excel(db_session=db, file=file)
+    return upload_excel(db_session=db, file=file, company_id=company_id)
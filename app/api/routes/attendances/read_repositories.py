@@ -0,0 +1,94 @@
+import logging
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.api.routes.attendances.schemas import AttendanceRead
+from app.archive import archive_store
+from app.db.filters import in_month
+from app.db.models import PayrollAttendance
+from app.db.read import async_fetch_all, fetch_all, read_columns
+
+# read-only Core queries for GET endpoints, writes stay in repositories.py
+log = logging.getLogger(__name__)
+
+ATTENDANCE_READ_COLUMNS = read_columns(PayrollAttendance, AttendanceRead)
+ATTENDANCE_READ_KEYS = [column.key for column in ATTENDANCE_READ_COLUMNS]
+
+
+def select_all_attendances(*, company_id: int):
+    """Builds the select for all attendances of a company."""
+    return select(*ATTENDANCE_READ_COLUMNS).where(
+        PayrollAttendance.company_id == company_id
+    )
+
+
+def select_attendances_by_month(*, company_id: int, month: int, year: int):
+    """Builds the select for all attendances of a company by month."""
+    return select(*ATTENDANCE_READ_COLUMNS).where(
+        PayrollAttendance.company_id == company_id,
+        in_month(PayrollAttendance.day_attendance, month, year),
+    )
+
+
+# GET /attendances
+def read_all_attendances(*, db_session, company_id: int) -> dict:
+    """Returns all attendances as plain rows, archived months included."""
+    attendances = archive_store.merge(
+        "attendances",
+        fetch_all(db_session, select_all_attendances(company_id=company_id)),
+        company_id=company_id,
+        columns=ATTENDANCE_READ_KEYS,
+    )
+
+    return {"count": len(attendances), "data": attendances}
+
+
+# GET /attendances/period?m=month&y=year
+def read_attendances_by_month(
+    *, db_session, company_id: int, month: int, year: int
+) -> dict:
+    """Returns all attendances by month as plain rows, archived months included."""
+    attendances = archive_store.merge(
+        "attendances",
+        fetch_all(
+            db_session,
+            select_attendances_by_month(company_id=company_id, month=month, year=year),
+        ),
+        company_id=company_id,
+        year=year,
+        month=month,
+        columns=ATTENDANCE_READ_KEYS,
+    )
+
+    return {"count": len(attendances), "data": attendances}
+
+
+async def async_read_attendances_by_month(
+    *, db_session, company_id: int, month: int, year: int
+) -> dict:
+    """Async version of `read_attendances_by_month`."""
+    attendances = await async_fetch_all(
+        db_session,
+        select_attendances_by_month(company_id=company_id, month=month, year=year),
+    )
+    if archive_store.is_archived("attendances", year, month):
+        attendances = await run_in_threadpool(
+            archive_store.merge,
+            "attendances",
+            attendances,
+            company_id=company_id,
+            year=year,
+            month=month,
+            columns=ATTENDANCE_READ_KEYS,
+        )
+
+    return {"count": len(attendances), "data": attendances}
+
+
+# GET /attendances/{attendance_id}
+def read_archived_attendance(*, attendance_id: int) -> dict | None:
+    """Returns an archived attendance, None if it was not archived."""
+    return archive_store.find(
+        "attendances", attendance_id, columns=ATTENDANCE_READ_KEYS
+    )
@@ -1,11 +1,12 @@
 from datetime import date
 import logging
-from sqlalchemy import and_, extract
+from sqlalchemy import and_
 
 from app.api.routes.attendances.schemas import (
     AttendanceCreate,
     AttendanceUpdate,
 )
+from app.db.filters import in_month
 from app.db.models import PayrollAttendance
 
 # add, retrieve, modify, remove
@@ -63,8 +64,7 @@ def retrieve_employee_attendances_by_month(
     """Retrieve all attendances of an employee by month"""
     query = db_session.query(PayrollAttendance).filter(
         PayrollAttendance.employee_id == employee_id,
-        extract("month", PayrollAttendance.day_attendance) == month,
-        extract("year", PayrollAttendance.day_attendance) == year,
+        in_month(PayrollAttendance.day_attendance, month, year),
     )
     count = query.count()
     attendances = query.all()
@@ -78,8 +78,7 @@ def retrieve_multi_attendances_by_month(
     """Returns all attendances by month."""
     query = db_session.query(PayrollAttendance).filter(
         PayrollAttendance.company_id == company_id,
-        extract("month", PayrollAttendance.day_attendance) == month,
-        extract("year", PayrollAttendance.day_attendance) == year,
+        in_month(PayrollAttendance.day_attendance, month, year),
     )
     count = query.count()
     attendances = query.all()
@@ -1,19 +1,22 @@
 import logging
 from fastapi import File, UploadFile
 from datetime import date, timedelta
-import pandas as pd
 from io import BytesIO
 
+from app.api.routes.attendances.read_repositories import (
+    async_read_attendances_by_month,
+    read_all_attendances,
+    read_archived_attendance,
+    read_attendances_by_month,
+)
 from app.api.routes.attendances.repositories import (
     add_attendance,
     modify_attendance,
     remove_attendance,
     remove_attendances,
-    retrieve_all_attendances,
     retrieve_attendance_by_employee_and_day,
     retrieve_attendance_by_id,
     retrieve_employee_attendances,
-    retrieve_multi_attendances_by_month,
 )
 from app.api.routes.attendances.schemas import (
     AttendanceCreate,
@@ -27,11 +30,19 @@ from app.api.routes.attendances.schemas import (
 # from payroll.contracts.services import get_active_contract
 from app.api.routes.employees.repositories import (
     retrieve_all_employees,
-    retrieve_employee_by_code,
     retrieve_employee_by_id,
 )
-from app.api.routes.employees.services import check_exist_employee_by_id
+from app.api.routes.employees.services import (
+    check_exist_employee_by_id,
+    get_employee_by_code,
+)
+from app.core.config import settings
+from app.archive import archive_store
+from app.db.ingest import BatchIngest, IngestTarget
+from app.db.models import PayrollAttendance
+from app.db.write_behind import WriteBehindBuffer
 from app.exception.app_exception import AppException
+from app.metrics import ROWS_IMPORTED
 from app.exception.error_message import ErrorMessages
 from app.api.routes.schedule_details.repositories import (
     retrieve_schedule_details_by_schedule_id,
@@ -67,7 +78,7 @@ def check_exist_attendance_by_employee_and_day(
 def validate_work_hours(work_hours: float):
     """Check if work hours is valid."""
     if work_hours < 0 or work_hours > 24:
-        raise False
+        return False
     return True
 
 
@@ -82,6 +93,14 @@ def validate_create_attendance(*, attendance_in: AttendanceCreate):
     return True
 
 
+def validate_not_archived(*, day_attendance: date):
+    """Check that the month of the attendance was not archived."""
+    if archive_store.is_archived(
+        "attendances", day_attendance.year, day_attendance.month
+    ):
+        raise AppException(ErrorMessages.InvalidInput(), "day attendance")
+
+
 def validate_update_attendance(*, attendance_in: AttendanceCreate):
     """Check if attendance is valid"""
     if validate_work_hours(attendance_in.work_hours):
@@ -91,7 +110,7 @@ def validate_update_attendance(*, attendance_in: AttendanceCreate):
 # GET /attendances
 def get_all_attendances(*, db_session, company_id: int):
     """Returns all attendances."""
-    list_attendances = retrieve_all_attendances(
+    list_attendances = read_all_attendances(
         db_session=db_session, company_id=company_id
     )
     if not list_attendances["count"]:
@@ -106,7 +125,10 @@ def get_attendance_by_id(*, db_session, attendance_id: int):
     if not check_exist_attendance_by_id(
         db_session=db_session, attendance_id=attendance_id
     ):
-        raise AppException(ErrorMessages.ResourceNotFound(), "attendance")
+        archived = read_archived_attendance(attendance_id=attendance_id)
+        if archived is None:
+            raise AppException(ErrorMessages.ResourceNotFound(), "attendance")
+        return archived
 
     return retrieve_attendance_by_id(db_session=db_session, attendance_id=attendance_id)
 
@@ -131,7 +153,21 @@ def get_multi_attendances_by_month(
     *, db_session, company_id: int, month: int, year: int
 ):
     """Returns all attendances for a given month and year."""
-    list_attendances = retrieve_multi_attendances_by_month(
+    list_attendances = read_attendances_by_month(
+        db_session=db_session, month=month, year=year, company_id=company_id
+    )
+
+    if not list_attendances["count"]:
+        raise AppException(ErrorMessages.ResourceNotFound(), "attendance")
+
+    return list_attendances
+
+
+async def async_get_multi_attendances_by_month(
+    *, db_session, company_id: int, month: int, year: int
+):
+    """Async version of `get_multi_attendances_by_month`."""
+    list_attendances = await async_read_attendances_by_month(
         db_session=db_session, month=month, year=year, company_id=company_id
     )
 
@@ -154,6 +190,7 @@ def create_attendance(*, db_session, attendance_in: AttendanceCreate):
         employee_id=attendance_in.employee_id,
     ):
         raise AppException(ErrorMessages.ResourceAlreadyExists(), "attendance")
+    validate_not_archived(day_attendance=attendance_in.day_attendance)
 
     if validate_create_attendance(attendance_in=attendance_in):
         try:
@@ -207,6 +244,7 @@ def create_multi_attendances(
 
         current_date = attendance_list_in.from_date
         while current_date <= attendance_list_in.to_date:
+            validate_not_archived(day_attendance=current_date)
             attendance_in = AttendanceCreate(
                 employee_id=employee_id,
                 day_attendance=current_date,
@@ -263,15 +301,56 @@ def create_multi_attendances(
     return {"count": count, "data": attendances}
 
 
+ATTENDANCE_INGEST = IngestTarget(
+    model=PayrollAttendance,
+    schema=AttendanceCreate,
+    day="day_attendance",
+    update_columns=("work_hours", "is_holiday"),
+    validate=lambda attendance_in: validate_create_attendance(
+        attendance_in=attendance_in
+    ),
+)
+
+
+# POST /attendances/batch
+async def create_batch_attendances(*, db_session, chunks, batch_size: int):
+    """Upserts the attendances of an NDJSON body, one AttendanceCreate per
+    line, and reports the rows that were refused."""
+    result = await BatchIngest(
+        db_session=db_session,
+        target=ATTENDANCE_INGEST,
+        max_errors=settings.INGEST_MAX_ERRORS,
+    ).run(chunks, batch_size)
+    ROWS_IMPORTED.labels("attendance").inc(result["upserted"])
+    return result
+
+
+# started by the app's lifespan when WRITE_BEHIND_ENABLED
+attendance_buffer = WriteBehindBuffer(ATTENDANCE_INGEST)
+
+
+# POST /attendances, write-behind
+def buffer_attendance(*, attendance_in: AttendanceCreate) -> AttendanceCreate:
+    """Validates an attendance and journals it, the flusher upserts it with
+    the other buffered attendances."""
+    validate_create_attendance(attendance_in=attendance_in)
+    validate_not_archived(day_attendance=attendance_in.day_attendance)
+    attendance_buffer.append(attendance_in)
+
+    return attendance_in
+
+
 # PUT /attendances/{attendance_id}
 def update_attendance(
     *, db_session, attendance_id: int, attendance_in: AttendanceUpdate
 ):
     """Updates a attendance with the given data."""
-    if not check_exist_attendance_by_id(
+    stored = retrieve_attendance_by_id(
         db_session=db_session, attendance_id=attendance_id
-    ):
+    )
+    if not stored:
         raise AppException(ErrorMessages.ResourceNotFound(), "attendance")
+    validate_not_archived(day_attendance=stored.day_attendance)
 
     if validate_update_attendance(attendance_in=attendance_in):
         try:
@@ -435,7 +514,11 @@ def upload_excel(
     *,
     db_session,
     file: UploadFile = File(...),
+    company_id: int,
 ):
+    # pandas (and openpyxl under it) is only loaded by the Excel imports
+    import pandas as pd
+
     file_path = BytesIO(file.file.read())
     df = pd.read_excel(file_path, skiprows=3)
     data = []
@@ -453,8 +536,10 @@ def upload_excel(
                 if pd.isna(value):
                     continue
 
-                employee_id = retrieve_employee_by_code(
-                    db_session=db_session, employee_code=employee_code
+                employee_id = get_employee_by_code(
+                    db_session=db_session,
+                    employee_code=employee_code,
+                    company_id=company_id,
                 ).id
 
                 # Check if value is a float (work hours) or a time range (check-in/check-out)
@@ -466,6 +551,8 @@ def upload_excel(
                                 "employee_id": employee_id,
                                 "day_attendance": parsed_date,
                                 "work_hours": hours,
+                                "is_holiday": False,
+                                "company_id": company_id,
                             }
                         )
 
@@ -485,12 +572,18 @@ def upload_excel(
 
                 else:
                     continue
+    # the whole file is refused before anything is written
+    for item in data:
+        validate_not_archived(day_attendance=item["day_attendance"])
+    imported = 0
     for item in data:
         if item.get("work_hours"):
             attendance = WorkhoursAttendanceHandlerBase(**item)
         else:
             attendance = TimeAttendanceHandlerBase(**item)
-        attendance_handler(
+        if attendance_handler(
             db_session=db_session,
             attendance_in=attendance,
-        )
+        ):
+            imported += 1
+    ROWS_IMPORTED.labels("attendance").inc(imported)
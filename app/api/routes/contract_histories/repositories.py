@@ -84,13 +84,11 @@ def retrieve_contract_history_addendums_by_employee_and_period(
 
 
 def retrieve_all_contract_histories(*, db_session, company_id: int):
-    query = db_session.query(PayrollContractHistory)
-    count = query.count()
-    contract_histories = (
-        query.filter(PayrollContractHistory.company_id == company_id)
-        .order_by(PayrollContractHistory.id.asc())
-        .all()
+    query = db_session.query(PayrollContractHistory).filter(
+        PayrollContractHistory.company_id == company_id
     )
+    count = query.count()
+    contract_histories = query.order_by(PayrollContractHistory.id.asc()).all()
 
     return {"count": count, "data": contract_histories}
 
@@ -2,6 +2,7 @@
 from datetime import date
 import io
 import zipfile
+from pathlib import Path
 from typing import List, Optional
 
 from fastapi.responses import StreamingResponse
@@ -21,15 +22,16 @@ from app.api.routes.contract_histories.schemas import (
     ContractHistoryUpdate,
 )
 
-from app.api.routes.departments.repositories import retrieve_department_by_id
 from app.api.routes.employees.repositories import retrieve_employee_by_id
+from app.cache import get_cached_department, get_cached_position
 from app.exception import AppException, ErrorMessages
-from app.api.routes.positions.repositories import retrieve_position_by_id
 from app.utils.functions import fill_template, format_with_dot
 from app.utils.models import ContractHistoryType, Gender
 
 # from payroll.storage.services import read_file_from_minio
 
+TEMPLATE_DIR = Path(__file__).resolve().parents[3] / "utils" / "file"
+
 
 def check_exist_contract_history_by_id(*, db_session, contract_history_id: int):
     return bool(
@@ -210,10 +212,10 @@ def retrieve_addendum_data(
 
     data = {
         "contract_id": f"CT_{contract_data.id}_{contract_data.employee_id}",
-        "department": retrieve_department_by_id(
+        "department": get_cached_department(
             db_session=db_session, department_id=contract_data.department_id
         ).name,
-        "position": retrieve_position_by_id(
+        "position": get_cached_position(
             db_session=db_session, position_id=contract_data.position_id
         ).name,
         "employee_name": employee.name,
@@ -279,10 +281,10 @@ def retrieve_contract_data(
         or "........................................",
         "mst": employee.mst,
         "start_date": (contract_data.start_date.strftime("%d-%m-%Y")),
-        "position": retrieve_position_by_id(
+        "position": get_cached_position(
             db_session=db_session, position_id=contract_data.position_id
         ).name,
-        "department": retrieve_department_by_id(
+        "department": get_cached_department(
             db_session=db_session, department_id=contract_data.department_id
         ).name,
         "salary": str(format_with_dot(contract_data.salary)),
@@ -312,7 +314,7 @@ def generate_contract_docx(
                 raise AppException(ErrorMessages.ResourceNotFound())
 
             if contract_data.contract_type == ContractHistoryType.ADDENDUM:
-                template_path = "payroll/utils/file/addendum.docx"
+                template_path = TEMPLATE_DIR / "addendum.docx"
                 try:
                     data = retrieve_addendum_data(
                         db_session=db_session,
@@ -327,7 +329,7 @@ def generate_contract_docx(
                     raise Exception(f"Error retrieve addendum data: {e}")
 
             else:
-                template_path = "payroll/utils/file/contract.docx"
+                template_path = TEMPLATE_DIR / "contract.docx"
                 try:
                     data = retrieve_contract_data(
                         db_session=db_session,
@@ -27,8 +27,8 @@ def retrieve_department_by_code(
     return (
         db_session.query(PayrollDepartment)
         .filter(
-            PayrollDepartment.code == department_code
-            and PayrollDepartment.company_id == company_id
+            PayrollDepartment.code == department_code,
+            PayrollDepartment.company_id == company_id,
         )
         .first()
     )
@@ -8,6 +8,7 @@ from app.api.routes.departments.repositories import (
 )
 from app.api.routes.departments.schemas import DepartmentCreate, DepartmentUpdate
 from app.api.routes.employees.repositories import retrieve_employee_by_department
+from app.cache import DEPARTMENT, invalidate_reference
 from app.exception.app_exception import AppException
 from app.exception.error_message import ErrorMessages
 
@@ -84,6 +85,8 @@ def create_department(*, db_session, department_in: DepartmentCreate):
         db_session.rollback()
         raise e
 
+    invalidate_reference(DEPARTMENT, company_id=department_in.company_id)
+
     return department
 
 
@@ -108,6 +111,8 @@ def update_department(
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(DEPARTMENT, company_id=department.company_id)
+
     return department
 
 
@@ -135,4 +140,6 @@ def delete_department(*, db_session, department_id: int):
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(DEPARTMENT, company_id=department.company_id)
+
     return department
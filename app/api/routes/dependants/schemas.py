@@ -65,6 +65,7 @@ class DependantImport(PayrollBase):
     deduction_from: date
     deduction_to: date
     mst: str
+    company_id: int
 
 
 class DependantPagination(Pagination):
@@ -1,6 +1,5 @@
 import logging
 from fastapi import File, HTTPException, UploadFile, status
-import pandas as pd
 from io import BytesIO
 from pydantic import ValidationError
 
@@ -180,7 +179,9 @@ def create_dependant_by_xlsx(*, db_session, dependant_in: DependantImport):
             raise AppException(ErrorMessages.ResourceAlreadyExists, "dependant")
         if dependant_in.employee_code:
             employee = get_employee_by_code(
-                db_session=db_session, employee_code=dependant_in.employee_code
+                db_session=db_session,
+                employee_code=dependant_in.employee_code,
+                company_id=dependant_in.company_id,
             )
         employee_id = employee.id
 
@@ -211,7 +212,9 @@ def update_dependant_by_xlsx(
             setattr(dependant_data, field, update_data[field])
     if dependant_in.employee_code:
         employee = get_employee_by_code(
-            db_session=db_session, employee_code=dependant_in.employee_code
+            db_session=db_session,
+            employee_code=dependant_in.employee_code,
+            company_id=dependant_in.company_id,
         )
         dependant_db.employee_id = employee.id
 
@@ -256,6 +259,9 @@ def upload_dependants_XLSX(
     update_on_exists: bool = False,
     company_id: int,
 ):
+    # pandas (and openpyxl under it) is only loaded by the Excel imports
+    import pandas as pd
+
     data = BytesIO(file.file.read())
 
     dtype_map = {v: str for v in IMPORT_DEPENDANTS_EXCEL_MAP.values()}
@@ -1,6 +1,7 @@
 from datetime import date
 from typing import Optional
 from fastapi import APIRouter, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
 
 from app.api.routes.contract_histories.services import (
     get_active_contract_history_detail_by_period,
@@ -16,11 +17,11 @@ from app.api.routes.employees.schemas import (
     EmployeesScheduleUpdate,
     EmployeesScheduleUpdateRead,
 )
-from app.db.core import DbSession
+from app.db.core import AsyncDbSession, DbSession
 from app.api.routes.employees.services import (
+    async_get_all_employees,
     create_employee,
     delete_employee,
-    get_all_employees,
     get_employee_by_id,
     get_employee_contract_histories,
     get_employees_active_benefits,
@@ -30,19 +31,33 @@ from app.api.routes.employees.services import (
     update_multi_employees_schedule,
     upload_employees_XLSX,
 )
+from app.utils.responses import PayrollORJSONResponse
 
 employee_router = APIRouter()
 
 
 # GET /employees
 @employee_router.get("", response_model=EmployeesRead)
-def retrieve_employees(*, db_session: DbSession, name: str = None, company_id: int):
+async def retrieve_employees(
+    *,
+    db_session: DbSession,
+    async_db_session: AsyncDbSession,
+    name: str = None,
+    company_id: int,
+):
     """Returns all employees."""
     if name:
-        return search_employee_by_name(
-            db_session=db_session, name=name, company_id=company_id
+        return await run_in_threadpool(
+            search_employee_by_name,
+            db_session=db_session,
+            name=name,
+            company_id=company_id,
         )
-    return get_all_employees(db_session=db_session, company_id=company_id)
+    return PayrollORJSONResponse(
+        await async_get_all_employees(
+            db_session=async_db_session, company_id=company_id
+        )
+    )
 
 
 @employee_router.get("/benefits", response_model=BenefitsRead)
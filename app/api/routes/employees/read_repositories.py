@@ -0,0 +1,64 @@
+import logging
+
+from sqlalchemy import select
+
+from app.api.routes.departments.schemas import DepartmentBase
+from app.api.routes.employees.schemas import EmployeeRead
+from app.api.routes.positions.schemas import PositionBase
+from app.api.routes.schedules.schemas import ScheduleBase
+from app.db.models import (
+    PayrollDepartment,
+    PayrollEmployee,
+    PayrollPosition,
+    PayrollSchedule,
+)
+from app.db.read import async_fetch_all, fetch_all, nest, read_columns
+
+# read-only Core queries for GET endpoints, writes stay in repositories.py
+log = logging.getLogger(__name__)
+
+EMPLOYEE_READ_COLUMNS = (
+    read_columns(PayrollEmployee, EmployeeRead)
+    + read_columns(PayrollDepartment, DepartmentBase, prefix="department__")
+    + read_columns(PayrollPosition, PositionBase, prefix="position__")
+    + read_columns(PayrollSchedule, ScheduleBase, prefix="schedule__")
+)
+
+
+def select_all_employees(*, company_id: int):
+    """Builds the select for all employees of a company with their relations."""
+    return (
+        select(*EMPLOYEE_READ_COLUMNS)
+        .join(PayrollDepartment, PayrollEmployee.department_id == PayrollDepartment.id)
+        .join(PayrollPosition, PayrollEmployee.position_id == PayrollPosition.id)
+        .outerjoin(PayrollSchedule, PayrollEmployee.schedule_id == PayrollSchedule.id)
+        .where(PayrollEmployee.company_id == company_id)
+        .order_by(PayrollEmployee.id.asc())
+    )
+
+
+def nest_employee_relations(employees: list[dict]) -> list[dict]:
+    """Shapes flat employee rows like EmployeeRead."""
+    nest(employees, key="department", prefix="department__")
+    nest(employees, key="position", prefix="position__")
+    nest(employees, key="schedule", prefix="schedule__", optional_on="code")
+    return employees
+
+
+# GET /employees
+def read_all_employees(*, db_session, company_id: int) -> dict:
+    """Returns all employees as plain rows."""
+    employees = nest_employee_relations(
+        fetch_all(db_session, select_all_employees(company_id=company_id))
+    )
+
+    return {"count": len(employees), "data": employees}
+
+
+async def async_read_all_employees(*, db_session, company_id: int) -> dict:
+    """Async version of `read_all_employees`."""
+    employees = nest_employee_relations(
+        await async_fetch_all(db_session, select_all_employees(company_id=company_id))
+    )
+
+    return {"count": len(employees), "data": employees}
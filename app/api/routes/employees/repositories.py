@@ -43,8 +43,8 @@ def retrieve_employee_by_code(
     return (
         db_session.query(PayrollEmployee)
         .filter(
-            PayrollEmployee.code == employee_code
-            and PayrollEmployee.company_id == company_id
+            PayrollEmployee.code == employee_code,
+            PayrollEmployee.company_id == company_id,
         )
         .first()
     )
@@ -55,8 +55,8 @@ def retrieve_employee_by_cccd(
 ) -> PayrollEmployee:
     """Returns a employee based on the given code."""
     query = db_session.query(PayrollEmployee).filter(
-        PayrollEmployee.cccd == employee_cccd
-        and PayrollEmployee.company_id == company_id
+        PayrollEmployee.cccd == employee_cccd,
+        PayrollEmployee.company_id == company_id,
     )
     if exclude_employee_id:
         query = query.filter(PayrollEmployee.id != exclude_employee_id)
@@ -69,7 +69,7 @@ def retrieve_employee_by_mst(
 ) -> PayrollEmployee:
     """Returns a employee based on the given code."""
     query = db_session.query(PayrollEmployee).filter(
-        PayrollEmployee.mst == employee_mst and PayrollEmployee.company_id == company_id
+        PayrollEmployee.mst == employee_mst, PayrollEmployee.company_id == company_id
     )
     if exclude_employee_id:
         query = query.filter(PayrollEmployee.id != exclude_employee_id)
@@ -130,8 +130,8 @@ def retrieve_active_employees_benefits(*, db_session, company_id: int):
 def search_employees_by_partial_name(*, db_session, name: str, company_id: int):
     """Searches for employees based on a partial name match (case-insensitive)."""
     query = db_session.query(PayrollEmployee).filter(
-        func.lower(PayrollEmployee.name).like(f"%{name.lower()}%")
-        and PayrollEmployee.company_id == company_id
+        func.lower(PayrollEmployee.name).like(f"%{name.lower()}%"),
+        PayrollEmployee.company_id == company_id,
     )
     count = query.count()
     employees = query.all()
@@ -134,6 +134,7 @@ class EmployeeImport(PayrollBase):
     meal_benefit: float
     toxic_benefit: float
     phone_benefit: float
+    company_id: int
 
 
 class EmployeePagination(Pagination):
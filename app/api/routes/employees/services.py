@@ -1,6 +1,5 @@
 import logging
 from fastapi import File, HTTPException, UploadFile, status
-import pandas as pd
 from io import BytesIO
 from pydantic import ValidationError
 
@@ -25,6 +24,10 @@ from app.api.routes.positions.services import (
     check_exist_position_by_id,
     get_position_by_code,
 )
+from app.api.routes.employees.read_repositories import (
+    async_read_all_employees,
+    read_all_employees,
+)
 from app.api.routes.employees.repositories import (
     add_employee,
     modify_employee,
@@ -37,6 +40,7 @@ from app.api.routes.employees.repositories import (
 )
 from app.exception.app_exception import AppException
 from app.exception.error_message import ErrorMessages
+from app.metrics import ROWS_IMPORTED
 from app.db.models import PayrollEmployee
 from app.api.routes.employees.constant import DTYPES_MAP, IMPORT_EMPLOYEES_EXCEL_MAP
 from app.api.routes.employees.schemas import (
@@ -137,20 +141,31 @@ def get_employee_by_id(*, db_session, employee_id: int):
     return retrieve_employee_by_id(db_session=db_session, employee_id=employee_id)
 
 
-def get_employee_by_code(*, db_session, employee_code: str):
+def get_employee_by_code(*, db_session, employee_code: str, company_id: int):
     """Returns a employee based on the given code."""
     if not check_exist_employee_by_code(
-        db_session=db_session, employee_code=employee_code
+        db_session=db_session, employee_code=employee_code, company_id=company_id
     ):
         raise AppException(ErrorMessages.ResourceNotFound(), "employee")
 
-    return retrieve_employee_by_code(db_session=db_session, employee_code=employee_code)
+    return retrieve_employee_by_code(
+        db_session=db_session, employee_code=employee_code, company_id=company_id
+    )
 
 
 # GET /employees
 def get_all_employees(*, db_session, company_id: int):
     """Returns all employees."""
-    list_employees = retrieve_all_employees(
+    list_employees = read_all_employees(db_session=db_session, company_id=company_id)
+    if not list_employees["count"]:
+        raise AppException(ErrorMessages.ResourceNotFound(), "employee")
+
+    return list_employees
+
+
+async def async_get_all_employees(*, db_session, company_id: int):
+    """Async version of `get_all_employees`."""
+    list_employees = await async_read_all_employees(
         db_session=db_session, company_id=company_id
     )
     if not list_employees["count"]:
@@ -403,17 +418,23 @@ def create_employee_by_xlsx(*, db_session, employee_in: EmployeeImport):
     """Creates a new employee."""
     try:
         if check_exist_employee_by_code(
-            db_session=db_session, employee_code=employee_in.code
+            db_session=db_session,
+            employee_code=employee_in.code,
+            company_id=employee_in.company_id,
         ):
             raise AppException(ErrorMessages.ResourceAlreadyExists, "employee")
         if employee_in.department_code:
             department = get_department_by_code(
-                db_session=db_session, department_code=employee_in.department_code
+                db_session=db_session,
+                department_code=employee_in.department_code,
+                company_id=employee_in.company_id,
             )
         department_id = department.id
         if employee_in.position_code:
             position = get_position_by_code(
-                db_session=db_session, position_code=employee_in.position_code
+                db_session=db_session,
+                position_code=employee_in.position_code,
+                company_id=employee_in.company_id,
             )
         position_id = position.id
 
@@ -428,7 +449,11 @@ def create_employee_by_xlsx(*, db_session, employee_in: EmployeeImport):
         employee_create = EmployeeCreate(**employee_data)
 
         employee = add_employee(db_session=db_session, employee_in=employee_create)
-        retrieve_employee_by_code(db_session=db_session, employee_code=employee.code)
+        retrieve_employee_by_code(
+            db_session=db_session,
+            employee_code=employee.code,
+            company_id=employee_in.company_id,
+        )
         contract_history_create = ContractHistoryCreate(
             employee_id=employee.id,
             department_id=department_id,
@@ -444,6 +469,7 @@ def create_employee_by_xlsx(*, db_session, employee_in: EmployeeImport):
             phone_benefit=employee_in.phone_benefit,
             attendant_benefit=employee_in.attendant_benefit,
             contract_type=ContractHistoryType.CONTRACT,
+            company_id=employee_in.company_id,
         )
         add_contract_history(
             db_session=db_session,
@@ -469,12 +495,16 @@ def update_employee_by_xlsx(
             setattr(employee_db, field, update_data[field])
     if employee_in.department_code:
         department = get_department_by_code(
-            db_session=db_session, code=employee_in.department_code
+            db_session=db_session,
+            department_code=employee_in.department_code,
+            company_id=employee_db.company_id,
         )
         employee_db.department = department
     if employee_in.position_code:
         position = get_position_by_code(
-            db_session=db_session, code=employee_in.position_code
+            db_session=db_session,
+            position_code=employee_in.position_code,
+            company_id=employee_db.company_id,
         )
         employee_db.position = position
 
@@ -487,7 +517,9 @@ def upsert_employee(
 ) -> PayrollEmployee:
     """Creates or updates an employee based on the code."""
     employee_db = retrieve_employee_by_code(
-        db_session=db_session, employee_code=employee_in.code
+        db_session=db_session,
+        employee_code=employee_in.code,
+        company_id=employee_in.company_id,
     )
     if employee_db:
         if not update_on_exists:
@@ -508,6 +540,9 @@ def upload_employees_XLSX(
     update_on_exists: bool = False,
     company_id: int,
 ):
+    # pandas (and openpyxl under it) is only loaded by the Excel imports
+    import pandas as pd
+
     data = BytesIO(file.file.read())
 
     dtype_map = {v: str for v in IMPORT_EMPLOYEES_EXCEL_MAP.values()}
@@ -523,7 +558,7 @@ def upload_employees_XLSX(
 
     df = df.astype(DTYPES_MAP)
 
-    date_columns = ["date_of_birth", "cccd_date", "start_date"]
+    date_columns = ["date_of_birth", "cccd_date", "start_date", "end_date"]
 
     for col in date_columns:
         df[col] = pd.to_datetime(df[col], errors="coerce")
@@ -565,6 +600,7 @@ def upload_employees_XLSX(
             employee_in=employee_data,
             update_on_exists=update_on_exists,
         )
+    ROWS_IMPORTED.labels("employee").inc(len(employees_data))
 
     return {"message": "Nhân viên đã được thêm thành công từ tệp Excel"}
 
@@ -1,3 +1,4 @@
+from app.cache import INSURANCE_POLICY, invalidate_reference
 from app.exception import AppException, ErrorMessages
 from app.db.models import InsurancePolicy
 from app.api.routes.insurances import repositories as insurance_repo
@@ -39,6 +40,7 @@ def create(
         db_session=db_session, create_data=insurance_policy_in.model_dump()
     )
     db_session.commit()
+    invalidate_reference(INSURANCE_POLICY, company_id=insurance_policy.company_id)
     return insurance_policy
 
 
@@ -53,8 +55,10 @@ def update(
 
     update_data = insurance_policy_in.model_dump(exclude_unset=True)
 
+    company_id = insurance_policy_db.company_id
     insurance_repo.update(db_session=db_session, id=id, update_data=update_data)
     db_session.commit()
+    invalidate_reference(INSURANCE_POLICY, company_id=company_id)
     return InsurancePolicyRead.from_orm(insurance_policy_db)
 
 
@@ -63,8 +67,10 @@ def delete(*, db_session, id: int) -> None:
     insurance_policy = get_insurance_policy_by_id(db_session=db_session, id=id)
     if not insurance_policy:
         raise AppException(ErrorMessages.ResourceNotFound())
+    company_id = insurance_policy.company_id
     insurance_repo.delete(db_session=db_session, id=id)
     db_session.commit()
+    invalidate_reference(INSURANCE_POLICY, company_id=company_id)
 
 
 def get_all(*, db_session, company_id: int) -> InsurancePoliciesRead:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, File, UploadFile
+from fastapi import APIRouter, File, Form, Query, Request, UploadFile
 
 # , File, Form, UploadFile
 
@@ -10,8 +10,11 @@ from app.api.routes.overtimes.schemas import (
     OvertimesRead,
     OvertimeUpdate,
 )
-from app.db.core import DbSession
+from app.core.config import settings
+from app.db.core import AsyncDbSession, DbSession
+from app.db.ingest import NDJSON_REQUEST_BODY
 from app.api.routes.overtimes.services import (
+    create_batch_overtimes,
     create_multi_overtimes,
     create_overtime,
     delete_multi_overtimes,
@@ -22,6 +25,8 @@ from app.api.routes.overtimes.services import (
     update_overtime,
     upload_excel,
 )
+from app.utils.models import BatchResult
+from app.utils.responses import PayrollORJSONResponse
 
 overtime_router = APIRouter()
 
@@ -33,7 +38,7 @@ def retrieve_overtimes(
     db_session: DbSession,
 ):
     """Returns all overtimes."""
-    return get_all_overtimes(db_session=db_session)
+    return PayrollORJSONResponse(get_all_overtimes(db_session=db_session))
 
 
 # GET /overtimes/period?m=month&y=year
@@ -42,8 +47,10 @@ def retrieve_overtimes_by_month(
     *, db_session: DbSession, company_id: int, month: int, year: int
 ):
     """Retrieve all overtimes of employees by month and year"""
-    return get_overtimes_by_month(
-        db_session=db_session, month=month, year=year, company_id=company_id
+    return PayrollORJSONResponse(
+        get_overtimes_by_month(
+            db_session=db_session, month=month, year=year, company_id=company_id
+        )
     )
 
 
@@ -71,6 +78,23 @@ def create_multi(*, db_session: DbSession, overtime_list_in: OvertimesCreate):
     )
 
 
+# POST /overtimes/batch
+@overtime_router.post(
+    "/batch", response_model=BatchResult, openapi_extra=NDJSON_REQUEST_BODY
+)
+async def create_batch(
+    *,
+    request: Request,
+    db_session: AsyncDbSession,
+    batch_size: int = Query(settings.INGEST_BATCH_SIZE, ge=1, le=10000),
+):
+    """Upserts overtimes from a streamed NDJSON body, one overtime per line,
+    and returns the errors of the refused lines."""
+    return await create_batch_overtimes(
+        db_session=db_session, chunks=request.stream(), batch_size=batch_size
+    )
+
+
 # PUT /overtimes/{overtime_id}
 @overtime_router.put("/{overtime_id}", response_model=OvertimeRead)
 def update(*, db_session: DbSession, overtime_id: int, overtime_in: OvertimeUpdate):
@@ -98,5 +122,7 @@ def delete(*, db_session: DbSession, overtime_id: int):
 
 # POST /overtimes/import-excel
 @overtime_router.post("/import-excel")
-def import_excel(*, db: DbSession, file: UploadFile = File(...)):
-    return upload_excel(db_session=db, file=file)
+def import_excel(
+    *, db: DbSession, file: UploadFile = File(...), company_id: int = Form(...)
+):
+    return upload_excel(db_session=db, file=file, company_id=company_id)
@@ -0,0 +1,67 @@
+import logging
+
+from sqlalchemy import select
+
+from app.api.routes.overtimes.schemas import OvertimeRead
+from app.archive import archive_store
+from app.db.filters import in_month
+from app.db.models import PayrollOvertime
+from app.db.read import fetch_all, read_columns
+
+# read-only Core queries for GET endpoints, writes stay in repositories.py
+log = logging.getLogger(__name__)
+
+OVERTIME_READ_COLUMNS = read_columns(PayrollOvertime, OvertimeRead)
+OVERTIME_READ_KEYS = [column.key for column in OVERTIME_READ_COLUMNS]
+
+
+def select_all_overtimes():
+    """Builds the select for all overtimes."""
+    return select(*OVERTIME_READ_COLUMNS)
+
+
+def select_overtimes_by_month(*, company_id: int, month: int, year: int):
+    """Builds the select for all overtimes of a company by month."""
+    return select(*OVERTIME_READ_COLUMNS).where(
+        PayrollOvertime.company_id == company_id,
+        in_month(PayrollOvertime.day_overtime, month, year),
+    )
+
+
+# GET /overtimes
+def read_all_overtimes(*, db_session) -> dict:
+    """Returns all overtimes as plain rows, archived months included."""
+    overtimes = archive_store.merge(
+        "overtimes",
+        fetch_all(db_session, select_all_overtimes()),
+        columns=OVERTIME_READ_KEYS,
+    )
+
+    return {"count": len(overtimes), "data": overtimes}
+
+
+# GET /overtimes/period?m=month&y=year
+def read_overtimes_by_month(
+    *, db_session, company_id: int, month: int, year: int
+) -> dict:
+    """Returns all overtimes of a company by month as plain rows, archived
+    months included."""
+    overtimes = archive_store.merge(
+        "overtimes",
+        fetch_all(
+            db_session,
+            select_overtimes_by_month(company_id=company_id, month=month, year=year),
+        ),
+        company_id=company_id,
+        year=year,
+        month=month,
+        columns=OVERTIME_READ_KEYS,
+    )
+
+    return {"count": len(overtimes), "data": overtimes}
+
+
+# GET /overtimes/{overtime_id}
+def read_archived_overtime(*, overtime_id: int) -> dict | None:
+    """Returns an archived overtime, None if it was not archived."""
+    return archive_store.find("overtimes", overtime_id, columns=OVERTIME_READ_KEYS)
@@ -1,11 +1,12 @@
 from datetime import date
 import logging
-from sqlalchemy import and_, extract
+from sqlalchemy import and_
 
 from app.api.routes.overtimes.schemas import (
     OvertimeCreate,
     OvertimeUpdate,
 )
+from app.db.filters import in_month
 from app.db.models import PayrollOvertime
 
 # add, retrieve, modify, remove
@@ -42,8 +43,7 @@ def retrieve_employee_overtime_by_month(
     """Returns all attendances of an employee."""
     query = db_session.query(PayrollOvertime).filter(
         PayrollOvertime.employee_id == employee_id,
-        extract("month", PayrollOvertime.day_overtime) == month,
-        extract("year", PayrollOvertime.day_overtime) == year,
+        in_month(PayrollOvertime.day_overtime, month, year),
     )
     count = query.count()
     overtimes = query.all()
@@ -80,8 +80,7 @@ def retrieve_employee_overtimes_by_month(
     """Retrieve all overtimes of employees by month and year"""
     query = db_session.query(PayrollOvertime).filter(
         PayrollOvertime.company_id == company_id,
-        extract("month", PayrollOvertime.day_overtime) == month,
-        extract("year", PayrollOvertime.day_overtime) == year,
+        in_month(PayrollOvertime.day_overtime, month, year),
     )
     count = query.count()
     overtimes = query.all()
@@ -1,18 +1,20 @@
 import logging
 from fastapi import File, UploadFile
 from datetime import date, timedelta
-import pandas as pd
 from io import BytesIO
 
+from app.api.routes.overtimes.read_repositories import (
+    read_all_overtimes,
+    read_archived_overtime,
+    read_overtimes_by_month,
+)
 from app.api.routes.overtimes.repositories import (
     add_overtime,
     modify_overtime,
     remove_overtime,
     remove_overtimes,
-    retrieve_all_overtimes,
     retrieve_overtime_by_employee_and_day,
     retrieve_overtime_by_id,
-    retrieve_employee_overtimes_by_month,
     retrieve_employee_overtimes,
 )
 from app.api.routes.overtimes.schemas import (
@@ -23,11 +25,18 @@ from app.api.routes.overtimes.schemas import (
 )
 from app.api.routes.employees.repositories import (
     retrieve_all_employees,
-    retrieve_employee_by_code,
 )
-from app.api.routes.employees.services import check_exist_employee_by_id
+from app.api.routes.employees.services import (
+    check_exist_employee_by_id,
+    get_employee_by_code,
+)
+from app.archive import archive_store
+from app.core.config import settings
+from app.db.ingest import BatchIngest, IngestTarget
+from app.db.models import PayrollOvertime
 from app.exception.app_exception import AppException
 from app.exception.error_message import ErrorMessages
+from app.metrics import ROWS_IMPORTED
 
 log = logging.getLogger(__name__)
 
@@ -55,7 +64,7 @@ def check_exist_overtime_by_employee_and_day(
 def validate_overtime_hours(overtime_hours: float):
     """Check if overtime hours is valid."""
     if overtime_hours < 0 or overtime_hours > 24:
-        raise False
+        return False
     return True
 
 
@@ -70,6 +79,12 @@ def validate_create_overtime(*, overtime_in: OvertimeCreate):
     return True
 
 
+def validate_not_archived(*, day_overtime: date):
+    """Check that the month of the overtime was not archived."""
+    if archive_store.is_archived("overtimes", day_overtime.year, day_overtime.month):
+        raise AppException(ErrorMessages.InvalidInput(), "day overtime")
+
+
 def validate_update_overtime(*, overtime_in: OvertimeCreate):
     """Check if overtime is valid"""
     if validate_overtime_hours(overtime_in.overtime_hours):
@@ -79,7 +94,7 @@ def validate_update_overtime(*, overtime_in: OvertimeCreate):
 # GET /overtimes
 def get_all_overtimes(*, db_session):
     """Returns all overtimes."""
-    list_overtimes = retrieve_all_overtimes(db_session=db_session)
+    list_overtimes = read_all_overtimes(db_session=db_session)
     if not list_overtimes["count"]:
         raise AppException(ErrorMessages.ResourceNotFound(), "overtime")
 
@@ -90,7 +105,10 @@ def get_all_overtimes(*, db_session):
 def get_overtime_by_id(*, db_session, overtime_id: int):
     """Returns a overtime based on the given id."""
     if not check_exist_overtime_by_id(db_session=db_session, overtime_id=overtime_id):
-        raise AppException(ErrorMessages.ResourceNotFound(), "overtime")
+        archived = read_archived_overtime(overtime_id=overtime_id)
+        if archived is None:
+            raise AppException(ErrorMessages.ResourceNotFound(), "overtime")
+        return archived
 
     return retrieve_overtime_by_id(db_session=db_session, overtime_id=overtime_id)
 
@@ -113,7 +131,7 @@ def get_employee_overtimes(*, db_session, employee_id: int):
 # GET /overtimes/period?m=month&y=year
 def get_overtimes_by_month(*, db_session, company_id: int, month: int, year: int):
     """Returns all overtimes for a given month and year."""
-    list_overtimes = retrieve_employee_overtimes_by_month(
+    list_overtimes = read_overtimes_by_month(
         db_session=db_session, month=month, year=year, company_id=company_id
     )
 
@@ -136,6 +154,7 @@ def create_overtime(*, db_session, overtime_in: OvertimeCreate):
         employee_id=overtime_in.employee_id,
     ):
         raise AppException(ErrorMessages.ResourceAlreadyExists(), "overtime")
+    validate_not_archived(day_overtime=overtime_in.day_overtime)
 
     if validate_create_overtime(overtime_in=overtime_in):
         try:
@@ -172,6 +191,7 @@ def create_multi_overtimes(
 
         current_date = overtime_list_in.from_date
         while current_date <= overtime_list_in.to_date:
+            validate_not_archived(day_overtime=current_date)
             overtime_in = OvertimeCreate(
                 employee_id=employee_id,
                 day_overtime=current_date,
@@ -224,11 +244,35 @@ def create_multi_overtimes(
     return {"count": count, "data": overtimes}
 
 
+OVERTIME_INGEST = IngestTarget(
+    model=PayrollOvertime,
+    schema=OvertimeCreate,
+    day="day_overtime",
+    update_columns=("overtime_hours",),
+    validate=lambda overtime_in: validate_create_overtime(overtime_in=overtime_in),
+)
+
+
+# POST /overtimes/batch
+async def create_batch_overtimes(*, db_session, chunks, batch_size: int):
+    """Upserts the overtimes of an NDJSON body, one OvertimeCreate per line,
+    and reports the rows that were refused."""
+    result = await BatchIngest(
+        db_session=db_session,
+        target=OVERTIME_INGEST,
+        max_errors=settings.INGEST_MAX_ERRORS,
+    ).run(chunks, batch_size)
+    ROWS_IMPORTED.labels("overtime").inc(result["upserted"])
+    return result
+
+
 # PUT /overtimes/{overtime_id}
 def update_overtime(*, db_session, overtime_id: int, overtime_in: OvertimeUpdate):
     """Updates a overtime with the given data."""
-    if not check_exist_overtime_by_id(db_session=db_session, overtime_id=overtime_id):
+    stored = retrieve_overtime_by_id(db_session=db_session, overtime_id=overtime_id)
+    if not stored:
         raise AppException(ErrorMessages.ResourceNotFound(), "overtime")
+    validate_not_archived(day_overtime=stored.day_overtime)
 
     if validate_update_overtime(overtime_in=overtime_in):
         try:
@@ -309,8 +353,12 @@ def upload_excel(
     *,
     db_session,
     file: UploadFile = File(...),
+    company_id: int,
     # update_on_exists: bool = False
 ):
+    # pandas (and openpyxl under it) is only loaded by the Excel imports
+    import pandas as pd
+
     file_path = BytesIO(file.file.read())
     df = pd.read_excel(file_path, skiprows=2)
     data = []
@@ -327,8 +375,10 @@ def upload_excel(
                 if pd.isna(value):
                     continue
 
-                employee_id = retrieve_employee_by_code(
-                    db_session=db_session, employee_code=employee_code
+                employee_id = get_employee_by_code(
+                    db_session=db_session,
+                    employee_code=employee_code,
+                    company_id=company_id,
                 ).id
 
                 hours = value
@@ -338,9 +388,13 @@ def upload_excel(
                             "employee_id": employee_id,
                             "day_overtime": parsed_date,
                             "overtime_hours": hours,
+                            "company_id": company_id,
                         }
                     )
 
+    # the whole file is refused before anything is written
+    for overtime in data:
+        validate_not_archived(day_overtime=overtime["day_overtime"])
     for overtime in data:
         add_overtime(
             db_session=db_session,
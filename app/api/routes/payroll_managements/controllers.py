@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal
 from fastapi import APIRouter, Query
 
 from app.api.routes.payroll_managements.schemas import (
@@ -8,38 +8,83 @@ from app.api.routes.payroll_managements.schemas import (
     PayrollManagementsCreate,
     PayrollManagementsRead,
 )
-from app.db.core import DbSession
+from app.db.core import AsyncDbSession, DbSession
 from app.api.routes.payroll_managements.services import (
+    async_get_all_payroll_management,
+    async_metrics_handler,
     create_multi_payroll_managements,
     create_payroll_management,
     delete_payroll_management,
     delete_payroll_managements,
-    get_all_payroll_management,
+    export_payroll_managements,
     get_payroll_management_by_id,
-    metrics_handler,
 )
+from app.utils.responses import PayrollORJSONResponse
+from fastapi.responses import StreamingResponse
 
 payroll_management_router = APIRouter()
 
 
 # GET /payroll_managements
 @payroll_management_router.get("", response_model=PayrollManagementsRead)
-def retrieve_payroll_managements(
-    *, db_session: DbSession, company_id: int, month: int = None, year: int = None
+async def retrieve_payroll_managements(
+    *,
+    db_session: AsyncDbSession,
+    company_id: int,
+    month: int = None,
+    year: int = None,
 ):
     """Retrieve all payroll_managements."""
-    return get_all_payroll_management(
-        db_session=db_session, month=month, year=year, company_id=company_id
+    return PayrollORJSONResponse(
+        await async_get_all_payroll_management(
+            db_session=db_session, month=month, year=year, company_id=company_id
+        )
     )
 
 
 @payroll_management_router.get("/metrics")
-def metrics(*, db_session: DbSession, month: int, year: int, company_id: int):
-    return metrics_handler(
+async def metrics(
+    *, db_session: AsyncDbSession, month: int, year: int, company_id: int
+):
+    return await async_metrics_handler(
         db_session=db_session, month=month, year=year, company_id=company_id
     )
 
 
+# GET /payroll_managements/export
+@payroll_management_router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {
+                "application/vnd.apache.parquet": {},
+                "application/vnd.apache.arrow.stream": {},
+            }
+        }
+    },
+)
+def export(
+    *,
+    db_session: DbSession,
+    company_id: int,
+    from_year: int,
+    from_month: int = Query(1, ge=1, le=12),
+    to_year: int = None,
+    to_month: int = Query(12, ge=1, le=12),
+    format: Literal["parquet", "arrow"] = "parquet",
+):
+    """Export the payroll of a company between two periods as a typed columnar
+    file, the whole `from_year` by default."""
+    return export_payroll_managements(
+        db_session=db_session,
+        company_id=company_id,
+        start=(from_year, from_month),
+        end=(to_year or from_year, to_month),
+        format=format,
+    )
+
+
 # GET /payroll_managements/{payroll_management_id}
 @payroll_management_router.get(
     "/{payroll_management_id}", response_model=PayrollManagementRead
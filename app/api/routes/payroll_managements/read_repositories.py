@@ -0,0 +1,327 @@
+import logging
+
+from sqlalchemy import func, select, tuple_
+from starlette.concurrency import run_in_threadpool
+
+from app.api.routes.employees.schemas import EmployeeBase
+from app.api.routes.payroll_managements.schemas import PayrollManagementRead
+from app.archive import archive_store
+from app.db.arrow import arrow_schema, to_record_batch
+from app.db.models import PayrollEmployee, PayrollPayrollManagement
+from app.db.read import (
+    async_fetch_all,
+    async_fetch_one,
+    fetch_all,
+    fetch_one,
+    nest,
+    read_columns,
+)
+
+# read-only Core queries for GET endpoints, writes stay in repositories.py
+log = logging.getLogger(__name__)
+
+PAYROLL_MANAGEMENT_READ_COLUMNS = read_columns(
+    PayrollPayrollManagement, PayrollManagementRead
+) + read_columns(PayrollEmployee, EmployeeBase, prefix="employee__")
+PAYROLL_MANAGEMENT_READ_KEYS = [
+    column.key for column in PAYROLL_MANAGEMENT_READ_COLUMNS
+]
+
+PAYROLL_MANAGEMENT_EXPORT_COLUMNS = read_columns(
+    PayrollPayrollManagement, PayrollManagementRead
+) + [
+    PayrollEmployee.code.label("employee__code"),
+    PayrollEmployee.name.label("employee__name"),
+    PayrollEmployee.department_id.label("employee__department_id"),
+    PayrollEmployee.position_id.label("employee__position_id"),
+]
+# rows per Arrow record batch, and Parquet row group, of an export
+EXPORT_BATCH_SIZE = 10_000
+
+PAYROLL_METRIC_COLUMNS = [
+    PayrollPayrollManagement.id,
+    PayrollPayrollManagement.gross_income,
+    PayrollPayrollManagement.tax,
+    PayrollPayrollManagement.overtime_1_5x_salary,
+    PayrollPayrollManagement.overtime_2_0x_salary,
+    PayrollPayrollManagement.meal_benefit_salary,
+    PayrollPayrollManagement.attendant_benefit_salary,
+    PayrollPayrollManagement.transportation_benefit_salary,
+    PayrollPayrollManagement.housing_benefit_salary,
+    PayrollPayrollManagement.phone_benefit_salary,
+]
+PAYROLL_METRIC_KEYS = [column.key for column in PAYROLL_METRIC_COLUMNS]
+
+
+def select_all_payroll_managements(
+    *, company_id: int, month: int = None, year: int = None
+):
+    """Builds the select for the payroll_managements of a company."""
+    statement = (
+        select(*PAYROLL_MANAGEMENT_READ_COLUMNS)
+        .join(
+            PayrollEmployee, PayrollPayrollManagement.employee_id == PayrollEmployee.id
+        )
+        .where(PayrollPayrollManagement.company_id == company_id)
+        .order_by(PayrollPayrollManagement.id.asc())
+    )
+    if month and year:
+        statement = statement.where(
+            PayrollPayrollManagement.month == month,
+            PayrollPayrollManagement.year == year,
+        )
+    return statement
+
+
+def select_payroll_managements_export(
+    *, company_id: int, start: tuple[int, int], end: tuple[int, int]
+):
+    """Builds the select for the payroll of a company between two (year, month)
+    periods, both included."""
+    period = tuple_(PayrollPayrollManagement.year, PayrollPayrollManagement.month)
+    return (
+        select(*PAYROLL_MANAGEMENT_EXPORT_COLUMNS)
+        .join(
+            PayrollEmployee, PayrollPayrollManagement.employee_id == PayrollEmployee.id
+        )
+        .where(
+            PayrollPayrollManagement.company_id == company_id,
+            period.between(tuple_(*start), tuple_(*end)),
+        )
+        .order_by(
+            PayrollPayrollManagement.year,
+            PayrollPayrollManagement.month,
+            PayrollPayrollManagement.id,
+        )
+    )
+
+
+def select_payroll_metrics(*, company_id: int, month: int, year: int):
+    """Builds one aggregate select for the payroll metrics of a period."""
+    return select(
+        func.count(PayrollPayrollManagement.id).label("total_payroll_documents"),
+        func.sum(PayrollPayrollManagement.gross_income).label("total_gross_income"),
+        func.sum(PayrollPayrollManagement.tax).label("total_tax"),
+        (
+            func.sum(PayrollPayrollManagement.overtime_1_5x_salary)
+            + func.sum(PayrollPayrollManagement.overtime_2_0x_salary)
+        ).label("total_overtime_salary"),
+        (
+            func.sum(PayrollPayrollManagement.meal_benefit_salary)
+            + func.sum(PayrollPayrollManagement.attendant_benefit_salary)
+            + func.sum(PayrollPayrollManagement.transportation_benefit_salary)
+            + func.sum(PayrollPayrollManagement.housing_benefit_salary)
+            + func.sum(PayrollPayrollManagement.phone_benefit_salary)
+        ).label("total_benefit_salary"),
+    ).where(
+        PayrollPayrollManagement.company_id == company_id,
+        PayrollPayrollManagement.month == month,
+        PayrollPayrollManagement.year == year,
+    )
+
+
+def select_payroll_metric_rows(*, company_id: int, month: int, year: int):
+    """Builds the select for the rows the metrics of a period add up."""
+    return select(*PAYROLL_METRIC_COLUMNS).where(
+        PayrollPayrollManagement.company_id == company_id,
+        PayrollPayrollManagement.month == month,
+        PayrollPayrollManagement.year == year,
+    )
+
+
+def archived_period(month: int = None, year: int = None) -> dict:
+    """Returns the period the archive is read for, every period without one."""
+    return {"month": month, "year": year} if month and year else {}
+
+
+def merge_archived_payroll_managements(
+    rows: list[dict], *, company_id: int, month: int = None, year: int = None
+) -> list[dict]:
+    """Adds the archived payroll of the company to the database rows."""
+    return archive_store.merge(
+        "payroll_managements",
+        rows,
+        company_id=company_id,
+        columns=PAYROLL_MANAGEMENT_READ_KEYS,
+        **archived_period(month, year),
+    )
+
+
+def sum_of(rows: list[dict], *keys: str):
+    """Sums the columns like SQL `sum(a) + sum(b)`: None if a column is all NULL."""
+    total = 0
+    for key in keys:
+        values = [row[key] for row in rows if row[key] is not None]
+        if not values:
+            return None
+        total += sum(values)
+    return total
+
+
+def archived_payroll_metrics(*, company_id: int, month: int, year: int, rows):
+    """Computes the metrics of an archived period from its archived rows and
+    the database `rows` not archived yet."""
+    rows = archive_store.merge(
+        "payroll_managements",
+        rows,
+        company_id=company_id,
+        month=month,
+        year=year,
+        columns=PAYROLL_METRIC_KEYS,
+    )
+    return {
+        "total_payroll_documents": len(rows),
+        "total_gross_income": sum_of(rows, "gross_income"),
+        "total_tax": sum_of(rows, "tax"),
+        "total_overtime_salary": sum_of(
+            rows, "overtime_1_5x_salary", "overtime_2_0x_salary"
+        ),
+        "total_benefit_salary": sum_of(
+            rows,
+            "meal_benefit_salary",
+            "attendant_benefit_salary",
+            "transportation_benefit_salary",
+            "housing_benefit_salary",
+            "phone_benefit_salary",
+        ),
+    }
+
+
+# GET /payroll_managements
+def read_all_payroll_managements(
+    *, db_session, company_id: int, month: int = None, year: int = None
+) -> dict:
+    """Returns all payroll_managements as plain rows, archived periods included."""
+    payroll_managements = nest(
+        merge_archived_payroll_managements(
+            fetch_all(
+                db_session,
+                select_all_payroll_managements(
+                    company_id=company_id, month=month, year=year
+                ),
+            ),
+            company_id=company_id,
+            month=month,
+            year=year,
+        ),
+        key="employee",
+        prefix="employee__",
+    )
+
+    return {"count": len(payroll_managements), "data": payroll_managements}
+
+
+async def async_read_all_payroll_managements(
+    *, db_session, company_id: int, month: int = None, year: int = None
+) -> dict:
+    """Async version of `read_all_payroll_managements`."""
+    payroll_managements = await async_fetch_all(
+        db_session,
+        select_all_payroll_managements(company_id=company_id, month=month, year=year),
+    )
+    if archive_store.is_archived("payroll_managements", **archived_period(month, year)):
+        payroll_managements = await run_in_threadpool(
+            merge_archived_payroll_managements,
+            payroll_managements,
+            company_id=company_id,
+            month=month,
+            year=year,
+        )
+    payroll_managements = nest(payroll_managements, key="employee", prefix="employee__")
+
+    return {"count": len(payroll_managements), "data": payroll_managements}
+
+
+# GET /payroll_managements/{payroll_management_id}
+def read_archived_payroll_management(*, payroll_management_id: int) -> dict | None:
+    """Returns an archived payroll_management, None if it was not archived."""
+    row = archive_store.find(
+        "payroll_managements",
+        payroll_management_id,
+        columns=PAYROLL_MANAGEMENT_READ_KEYS,
+    )
+    if row is None:
+        return None
+    return nest([row], key="employee", prefix="employee__")[0]
+
+
+# GET /payroll_managements/metrics
+def read_payroll_metrics(*, db_session, company_id: int, month: int, year: int):
+    """Returns the payroll totals of a period in a single query, added up
+    from the archive when the period was archived."""
+    if archive_store.is_archived("payroll_managements", year, month):
+        return archived_payroll_metrics(
+            company_id=company_id,
+            month=month,
+            year=year,
+            rows=fetch_all(
+                db_session,
+                select_payroll_metric_rows(
+                    company_id=company_id, month=month, year=year
+                ),
+            ),
+        )
+    return fetch_one(
+        db_session,
+        select_payroll_metrics(company_id=company_id, month=month, year=year),
+    )
+
+
+async def async_read_payroll_metrics(
+    *, db_session, company_id: int, month: int, year: int
+):
+    """Async version of `read_payroll_metrics`."""
+    if archive_store.is_archived("payroll_managements", year, month):
+        rows = await async_fetch_all(
+            db_session,
+            select_payroll_metric_rows(company_id=company_id, month=month, year=year),
+        )
+        return await run_in_threadpool(
+            archived_payroll_metrics,
+            company_id=company_id,
+            month=month,
+            year=year,
+            rows=rows,
+        )
+    return await async_fetch_one(
+        db_session,
+        select_payroll_metrics(company_id=company_id, month=month, year=year),
+    )
+
+
+# GET /payroll_managements/export
+def read_payroll_management_batches(
+    *, db_session, company_id: int, start: tuple[int, int], end: tuple[int, int]
+):
+    """Yields the payroll of a period range as Arrow record batches, archived
+    periods first. Database rows are fetched `EXPORT_BATCH_SIZE` at a time
+    from a server-side cursor."""
+    schema = arrow_schema(PAYROLL_MANAGEMENT_EXPORT_COLUMNS)
+    archived = [
+        (year, month)
+        for year, month in archive_store.periods("payroll_managements")
+        if start <= (year, month) <= end
+    ]
+    archived_ids = set()
+    for year, month in archived:
+        rows = archive_store.read_table(
+            "payroll_managements",
+            company_id=company_id,
+            year=year,
+            month=month,
+            columns=schema.names,
+        )
+        yield from rows.cast(schema).to_batches(EXPORT_BATCH_SIZE)
+        archived_ids |= archive_store.ids("payroll_managements", year, month)
+
+    statement = select_payroll_managements_export(
+        company_id=company_id, start=start, end=end
+    )
+    # a Core connection of the session: rows skip the ORM result processing
+    connection = db_session.connection(bind_arguments={"clause": statement})
+    result = connection.execution_options(stream_results=True).execute(statement)
+    for rows in result.partitions(EXPORT_BATCH_SIZE):
+        if archived_ids:
+            rows = [row for row in rows if row.id not in archived_ids]
+        if rows:
+            yield to_record_batch(schema, rows)
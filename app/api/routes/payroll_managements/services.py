@@ -1,6 +1,9 @@
 import calendar
 from datetime import date, timedelta
 from typing import List, Optional
+
+from fastapi.responses import StreamingResponse
+
 from app.api.routes.attendances.repositories import (
     retrieve_attendance_by_id,
     retrieve_employee_attendances_by_month,
@@ -22,17 +25,26 @@ from app.api.routes.employees.repositories import (
     retrieve_employee_by_id,
 )
 from app.api.routes.employees.services import check_exist_employee_by_id
-from app.api.routes.insurances.repositories import get_insurance_policy_by_id
+from app.db.arrow import CONTENT_TYPES, arrow_schema, write_batches
+from app.db.filters import month_range
 from app.db.models import (
     PayrollPayrollManagement,
     PayrollScheduleDetail,
 )
 from app.api.routes.overtimes.repositories import retrieve_employee_overtime_by_month
 
+from app.api.routes.payroll_managements.read_repositories import (
+    PAYROLL_MANAGEMENT_EXPORT_COLUMNS,
+    async_read_all_payroll_managements,
+    async_read_payroll_metrics,
+    read_all_payroll_managements,
+    read_archived_payroll_management,
+    read_payroll_management_batches,
+    read_payroll_metrics,
+)
 from app.api.routes.payroll_managements.repositories import (
     add_payroll_management,
     remove_payroll_management,
-    retrieve_all_payroll_managements,
     retrieve_number_of_payroll,
     retrieve_payroll_management_by_id,
     retrieve_payroll_management_by_information,
@@ -45,13 +57,16 @@ from app.api.routes.payroll_managements.schemas import (
     PayrollManagementCreate,
     PayrollManagementsCreate,
 )
+from app.archive import archive_store
+from app.cache import (
+    get_cached_insurance_policy,
+    get_cached_schedule_details,
+    get_cached_shift,
+)
 from app.exception.app_exception import AppException
 from app.exception.error_message import ErrorMessages
-from app.api.routes.schedule_details.repositories import (
-    retrieve_schedule_details_by_schedule_id,
-)
+from app.metrics import PAYSLIPS_COMPUTED
 from app.api.routes.schedules.services import check_exist_schedule_by_employee_id
-from app.api.routes.shifts.repositories import retrieve_shift_by_id
 from app.utils.models import Day
 
 
@@ -79,6 +94,12 @@ def check_exist_payroll_management_by_information(
     )
 
 
+def validate_not_archived(*, month: int, year: int):
+    """Check that the payroll period was not archived."""
+    if archive_store.is_archived("payroll_managements", year, month):
+        raise AppException(ErrorMessages.InvalidInput(), "month")
+
+
 def check_available_employee_create_payroll(
     *, db_session, employee_id: int, month: int, year: int
 ):
@@ -148,39 +169,33 @@ def get_total_benefit_salary(*, db_session, month: int, year: int, company_id: i
     )
 
 
+def payroll_metrics(metrics: dict):
+    """Rounds the aggregated payroll totals, None when there is no payroll."""
+    if not metrics or not metrics["total_payroll_documents"]:
+        return None
+    return {
+        "total_payroll_documents": metrics["total_payroll_documents"],
+        "total_gross_income": round(metrics["total_gross_income"] or 0, -3),
+        "total_tax": round(metrics["total_tax"] or 0, -3),
+        "total_overtime_salary": round(metrics["total_overtime_salary"] or 0, -3),
+        "total_benefit_salary": round(metrics["total_benefit_salary"] or 0, -3),
+    }
+
+
 def metrics_handler(*, db_session, month: int, year: int, company_id: int):
-    if (
-        get_number_payroll_documents(
+    return payroll_metrics(
+        read_payroll_metrics(
             db_session=db_session, month=month, year=year, company_id=company_id
         )
-        != 0
-    ):
-        return {
-            "total_payroll_documents": get_number_payroll_documents(
-                db_session=db_session, month=month, year=year, company_id=company_id
-            ),
-            "total_gross_income": get_total_payroll_gross_income(
-                db_session=db_session, month=month, year=year, company_id=company_id
-            ),
-            "total_tax": get_total_payroll_tax(
-                db_session=db_session, month=month, year=year, company_id=company_id
-            ),
-            "total_overtime_salary": get_total_payroll_overtime_salary(
-                db_session=db_session, month=month, year=year, company_id=company_id
-            ),
-            "total_benefit_salary": get_total_benefit_salary(
-                db_session=db_session, month=month, year=year, company_id=company_id
-            ),
-        }
-    else:
-        return
-        {
-            "total_payroll_documents": 0,
-            "total_gross_income": 0,
-            "total_tax": 0,
-            "total_overtime_salary": 0,
-            "total_benefit_salary": 0,
-        }
+    )
+
+
+async def async_metrics_handler(*, db_session, month: int, year: int, company_id: int):
+    return payroll_metrics(
+        await async_read_payroll_metrics(
+            db_session=db_session, month=month, year=year, company_id=company_id
+        )
+    )
 
 
 # GET /payroll_managements/{payroll_management_id}
@@ -189,7 +204,12 @@ def get_payroll_management_by_id(*, db_session, payroll_management_id: int):
     if not check_exist_payroll_management_by_id(
         db_session=db_session, payroll_management_id=payroll_management_id
     ):
-        raise AppException(ErrorMessages.ResourceNotFound(), "payroll")
+        archived = read_archived_payroll_management(
+            payroll_management_id=payroll_management_id
+        )
+        if archived is None:
+            raise AppException(ErrorMessages.ResourceNotFound(), "payroll")
+        return archived
 
     return retrieve_payroll_management_by_id(
         db_session=db_session, payroll_management_id=payroll_management_id
@@ -201,7 +221,7 @@ def get_all_payroll_management(
     *, db_session, company_id: int, month: int = None, year: int = None
 ):
     """Returns all payroll_managements."""
-    payroll_managements = retrieve_all_payroll_managements(
+    payroll_managements = read_all_payroll_managements(
         db_session=db_session, month=month, year=year, company_id=company_id
     )
     if not payroll_managements["count"]:
@@ -210,11 +230,54 @@ def get_all_payroll_management(
     return payroll_managements
 
 
+async def async_get_all_payroll_management(
+    *, db_session, company_id: int, month: int = None, year: int = None
+):
+    """Async version of `get_all_payroll_management`."""
+    payroll_managements = await async_read_all_payroll_managements(
+        db_session=db_session, month=month, year=year, company_id=company_id
+    )
+    if not payroll_managements["count"]:
+        raise AppException(ErrorMessages.ResourceNotFound(), "payroll")
+
+    return payroll_managements
+
+
+# GET /payroll_managements/export
+def export_payroll_managements(
+    *,
+    db_session,
+    company_id: int,
+    start: tuple[int, int],
+    end: tuple[int, int],
+    format: str = "parquet",
+):
+    """Streams the payroll of a period range as a Parquet file or an Arrow
+    IPC stream, one record batch at a time."""
+    if start > end:
+        raise AppException(ErrorMessages.InvalidInput(), "period range")
+    batches = read_payroll_management_batches(
+        db_session=db_session, company_id=company_id, start=start, end=end
+    )
+    filename = (
+        f"payroll-{company_id}-{start[0]}{start[1]:02d}-{end[0]}{end[1]:02d}"
+        f".{'parquet' if format == 'parquet' else 'arrows'}"
+    )
+    return StreamingResponse(
+        write_batches(arrow_schema(PAYROLL_MANAGEMENT_EXPORT_COLUMNS), batches, format),
+        media_type=CONTENT_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 def create_payroll_management(
     *,
     db_session,
     payroll_management_in: PayrollManagementCreate,
 ):
+    validate_not_archived(
+        month=payroll_management_in.month, year=payroll_management_in.year
+    )
     payroll_management_create = payroll_handler(
         db_session=db_session,
         employee_id=payroll_management_in.employee_id,
@@ -236,6 +299,7 @@ def create_payroll_management(
     except Exception as e:
         db_session.rollback()
         raise e
+    PAYSLIPS_COMPUTED.inc()
     return payroll_management
 
 
@@ -247,6 +311,9 @@ def create_multi_payroll_managements(
     payroll_managements = []
     count = 0
     list_id = []
+    validate_not_archived(
+        month=payroll_management_list_in.month, year=payroll_management_list_in.year
+    )
 
     if payroll_management_list_in.apply_all:
         for employee in retrieve_all_employees(
@@ -338,7 +405,7 @@ def delete_payroll_managements(*, db_session, list_id: List):
 def work_hours_standard_handler(*, db_session, schedule_details: PayrollScheduleDetail):
     work_hours_standard = 0
     for schedule_detail in schedule_details["data"]:
-        shift_work_hours = retrieve_shift_by_id(
+        shift_work_hours = get_cached_shift(
             db_session=db_session, shift_id=schedule_detail.shift_id
         ).standard_work_hours
 
@@ -375,7 +442,7 @@ def work_days_actual_handler(
 
 
 def check_sufficient_work_hours(*, db_session, schedule_id: int, attendance_id: int):
-    schedule_details = retrieve_schedule_details_by_schedule_id(
+    schedule_details = get_cached_schedule_details(
         db_session=db_session, schedule_id=schedule_id
     )
     attendance = retrieve_attendance_by_id(
@@ -388,7 +455,7 @@ def check_sufficient_work_hours(*, db_session, schedule_id: int, attendance_id:
         (detail for detail in schedule_details["data"] if detail.day == day), None
     )
 
-    shift_work_hours = retrieve_shift_by_id(
+    shift_work_hours = get_cached_shift(
         db_session=db_session, shift_id=matching_schedule_detail.shift_id
     ).standard_work_hours
 
@@ -459,16 +526,7 @@ def get_month_boundaries(month: int, year: int):
     if month < 1 or month > 12:
         raise ValueError("Month must be between 1 and 12")
 
-    first_day = date(year, month, 1)
-
-    if month == 12:
-        next_month = date(year + 1, 1, 1)
-    else:
-        next_month = date(year, month + 1, 1)
-
-    last_day = next_month - timedelta(days=1)
-
-    return first_day, last_day
+    return month_range(month, year)
 
 
 def tax_handler(income: float):
@@ -538,7 +596,7 @@ def payroll_handler(
 
     schedule_id = employee.schedule_id
 
-    schedule_details = retrieve_schedule_details_by_schedule_id(
+    schedule_details = get_cached_schedule_details(
         db_session=db_session, schedule_id=schedule_id
     )
 
@@ -676,7 +734,7 @@ def payroll_handler(
     # INSURANCE HANDLER
     employee_insurance = company_insurance = 0
     if apply_insurance:
-        insurance = get_insurance_policy_by_id(db_session=db_session, id=insurance_id)
+        insurance = get_cached_insurance_policy(db_session=db_session, id=insurance_id)
         if not insurance:
             raise AppException(ErrorMessages.ResourceNotFound, "insurance")
         employee_insurance = basic_salary * insurance.employee_percentage / 100
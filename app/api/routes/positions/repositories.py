@@ -27,8 +27,8 @@ def retrieve_position_by_code(
     return (
         db_session.query(PayrollPosition)
         .filter(
-            PayrollPosition.code == position_code
-            and PayrollPosition.company_id == company_id
+            PayrollPosition.code == position_code,
+            PayrollPosition.company_id == company_id,
         )
         .first()
     )
@@ -8,6 +8,7 @@ from app.api.routes.positions.repositories import (
     retrieve_all_positions_by_company_id,
 )
 from app.api.routes.positions.schemas import PositionCreate, PositionUpdate
+from app.cache import POSITION, invalidate_reference
 from app.exception.app_exception import AppException
 from app.exception.error_message import ErrorMessages
 
@@ -42,7 +43,9 @@ def get_position_by_code(*, db_session, position_code: int, company_id: int):
     ):
         raise AppException(ErrorMessages.ResourceNotFound(), "position")
 
-    return retrieve_position_by_code(db_session=db_session, position_code=position_code)
+    return retrieve_position_by_code(
+        db_session=db_session, position_code=position_code, company_id=company_id
+    )
 
 
 # GET /positions
@@ -74,6 +77,8 @@ def create_position(*, db_session, position_in: PositionCreate):
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(POSITION, company_id=position_in.company_id)
+
     return position
 
 
@@ -92,6 +97,8 @@ def update_position(*, db_session, position_id: int, position_in: PositionUpdate
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(POSITION, company_id=position.company_id)
+
     return position
 
 
@@ -111,4 +118,6 @@ def delete_position(*, db_session, position_id: int):
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(POSITION, company_id=position.company_id)
+
     return position
@@ -11,6 +11,7 @@ from app.api.routes.schedule_details.repositories import (
     retrieve_schedule_detail_by_info,
     retrieve_schedule_details_by_schedule_id,
 )
+from app.cache import SCHEDULE_DETAILS, invalidate_reference
 from app.exception.app_exception import AppException
 from app.exception.error_message import ErrorMessages
 from app.api.routes.schedule_details.schemas import (
@@ -62,6 +63,14 @@ def check_limit_of_shifts_per_day(*, db_session, schedule_id: int, day: Day):
     return False
 
 
+def invalidate_schedule_details(*, db_session, schedule_id: int):
+    """Drops the cached schedule_details of the schedule's company."""
+    schedule = retrieve_schedule_by_id(db_session=db_session, schedule_id=schedule_id)
+    invalidate_reference(
+        SCHEDULE_DETAILS, company_id=schedule.company_id if schedule else None
+    )
+
+
 # GET /schedule_details
 def get_all_schedule_details(*, db_session):
     """Returns all schedule_details."""
@@ -131,6 +140,9 @@ def create_schedule_detail(*, db_session, schedule_detail_in: ScheduleDetailCrea
     schedule_detail = add_schedule_detail(
         db_session=db_session, schedule_detail_in=schedule_detail_in
     )
+    invalidate_schedule_details(
+        db_session=db_session, schedule_id=schedule_detail_in.schedule_id
+    )
 
     return schedule_detail
 
@@ -171,6 +183,8 @@ def create_multi_schedule_details(
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_schedule_details(db_session=db_session, schedule_id=schedule_id)
+
     return retrieve_schedule_details_by_schedule_id(
         db_session=db_session, schedule_id=schedule_id
     )
@@ -197,6 +211,8 @@ def update_schedule_detail(
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_schedule_details(db_session=db_session, schedule_id=schedule.schedule_id)
+
     return schedule
 
 
@@ -256,6 +272,8 @@ def update_multi_schedule_details(
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_schedule_details(db_session=db_session, schedule_id=schedule_id)
+
     return retrieve_schedule_details_by_schedule_id(
         db_session=db_session, schedule_id=schedule_id
     )
@@ -278,4 +296,6 @@ def delete_schedule_detail(*, db_session, schedule_detail_id: int):
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_schedule_details(db_session=db_session, schedule_id=schedule.schedule_id)
+
     return schedule
@@ -29,6 +29,7 @@ from app.api.routes.schedules.schemas import (
     ScheduleCreate,
     ScheduleUpdate,
 )
+from app.cache import SCHEDULE, SCHEDULE_DETAILS, invalidate_reference
 from app.exception.app_exception import AppException
 from app.exception.error_message import ErrorMessages
 from app.db.models import PayrollSchedule
@@ -123,6 +124,8 @@ def create_schedule(*, db_session, schedule_in: ScheduleCreate):
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(SCHEDULE, company_id=schedule_in.company_id)
+
     return schedule
 
 
@@ -179,6 +182,8 @@ def update_schedule(*, db_session, schedule_id: int, schedule_in: ScheduleUpdate
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(SCHEDULE, SCHEDULE_DETAILS, company_id=schedule.company_id)
+
     return schedule
 
 
@@ -223,4 +228,6 @@ def delete_schedule(*, db_session, schedule_id: int) -> PayrollSchedule:
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(SCHEDULE, SCHEDULE_DETAILS, company_id=schedule.company_id)
+
     return schedule
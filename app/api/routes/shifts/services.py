@@ -10,6 +10,7 @@ from app.api.routes.shifts.repositories import (
     retrieve_shift_by_id,
 )
 from app.api.routes.shifts.schemas import ShiftCreate, ShiftUpdate
+from app.cache import SHIFT, invalidate_reference
 from app.exception.app_exception import AppException
 from app.exception.error_message import ErrorMessages
 
@@ -80,6 +81,8 @@ def create_shift(*, db_session, shift_in: ShiftCreate):
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(SHIFT, company_id=shift_in.company_id)
+
     return shift
 
 
@@ -100,6 +103,8 @@ def update_shift(*, db_session, shift_id: int, shift_in: ShiftUpdate):
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(SHIFT, company_id=shift.company_id)
+
     return shift
 
 
@@ -120,4 +125,6 @@ def delete_shift(*, db_session, shift_id: int):
         db_session.rollback()
         raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    invalidate_reference(SHIFT, company_id=shift.company_id)
+
     return shift
@@ -1,13 +1,22 @@
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, Header, HTTPException, UploadFile
 
-from app.api.routes.storage import services as storage_services
-from app.api.routes.storage.schema import FileData
+from app.api.routes.storage.schema import StoredFileRead
+from app.api.routes.storage.services import (
+    delete_stored_file,
+    get_stored_file_by_id,
+    read_stored_file,
+    upload_file,
+)
+from app.db.core import DbSession
 
 storage_router = APIRouter()
 
 
-@storage_router.post("/upload", response_model=FileData)
-async def upload(file: UploadFile = File(...)):
+# POST /storage/upload
+@storage_router.post("/upload", response_model=StoredFileRead)
+def upload(*, db_session: DbSession, file: UploadFile = File(...)):
+    """Stores a DOCX file. The multipart parser spools large uploads to disk,
+    they are copied to the storage in chunks."""
     if (
         file.content_type
         != "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
@@ -16,12 +25,42 @@ async def upload(file: UploadFile = File(...)):
             status_code=400, detail="Invalid file format. Only DOCX files are accepted."
         )
 
-    # Read the file content as binary
-    file_content = await file.read()
+    return upload_file(
+        db_session=db_session,
+        stream=file.file,
+        filename=file.filename,
+        content_type=file.content_type,
+    )
+
+
+# GET /storage/{file_id}
+@storage_router.get("/{file_id}", response_model=StoredFileRead)
+def retrieve_stored_file(*, db_session: DbSession, file_id: int):
+    """Retrieve the metadata of a stored file."""
+    return get_stored_file_by_id(db_session=db_session, file_id=file_id)
 
-    # Pass the binary content to your storage service
-    result = storage_services.upload_file_to_local_server(
-        file_content, file.filename, file.content_type
+
+# GET /storage/{file_id}/content
+@storage_router.get("/{file_id}/content")
+@storage_router.head("/{file_id}/content")
+def download(
+    *,
+    db_session: DbSession,
+    file_id: int,
+    range: str = Header(None),
+    if_none_match: str = Header(None),
+):
+    """Download a stored file, a single `Range` is answered with a 206."""
+    return read_stored_file(
+        db_session=db_session,
+        file_id=file_id,
+        range_header=range,
+        if_none_match=if_none_match,
     )
 
-    return result
+
+# DELETE /storage/{file_id}
+@storage_router.delete("/{file_id}", response_model=StoredFileRead)
+def delete(*, db_session: DbSession, file_id: int):
+    """Delete a stored file."""
+    return delete_stored_file(db_session=db_session, file_id=file_id)
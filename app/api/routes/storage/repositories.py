@@ -1,23 +1,46 @@
 import logging
 
-from fastapi import UploadFile
+from sqlalchemy import select
 
-from app.storage.schema import FileData
-from app.storage.services import upload_file_to_local_server
+from app.db.models import PayrollStoredFile
 
+# add, retrieve, remove
 log = logging.getLogger(__name__)
 
 
-def upload_fileStorage(*, db_session, file: UploadFile) -> FileData:
-    """Uploads a file to the storage."""
-    try:
-        file_data = FileData(
-            file=file.file.read(),
-            filename=file.filename,
-            content_type=file.content_type,
-        )
-        file_data = upload_file_to_local_server(file_data)
-        return file_data
-    except Exception as e:
-        log.error(f"Error uploading file: {e}")
-        return FileData(status=False, error=str(e))
+# GET /storage/{file_id}
+def retrieve_stored_file_by_id(*, db_session, file_id: int) -> PayrollStoredFile:
+    """Returns a stored file based on the given id."""
+    return (
+        db_session.query(PayrollStoredFile)
+        .filter(PayrollStoredFile.id == file_id)
+        .first()
+    )
+
+
+def retrieve_stored_sha256s(*, db_session) -> set[str]:
+    """Returns the hashes of every content still referenced by a file."""
+    return set(db_session.scalars(select(PayrollStoredFile.sha256).distinct()))
+
+
+# POST /storage/upload
+def add_stored_file(
+    *, db_session, sha256: str, size: int, filename: str, content_type: str
+) -> PayrollStoredFile:
+    """Records a file whose content was stored under `sha256`."""
+    stored_file = PayrollStoredFile(
+        sha256=sha256, size=size, filename=filename, content_type=content_type
+    )
+    db_session.add(stored_file)
+
+    return stored_file
+
+
+# DELETE /storage/{file_id}
+def remove_stored_file(*, db_session, file_id: int):
+    """Deletes a stored file based on the given id."""
+    query = db_session.query(PayrollStoredFile).filter(PayrollStoredFile.id == file_id)
+    deleted_file = query.first()
+    query.delete()
+
+    return deleted_file
@@ -1,31 +1,14 @@
-from logging import getLogger
-from pathlib import Path
+from datetime import datetime
 
-from pydantic import BaseModel, HttpUrl
+from app.utils.models import PayrollBase
 
-logger = getLogger(__name__)
 
+class StoredFileRead(PayrollBase):
+    """Metadata of a stored file, its content is at /storage/{id}/content."""
 
-class FileData(BaseModel):
-    """
-    Represents the result of an upload operation
-
-    Attributes:
-        file (Bytes): File saved to memory
-        path (Path | str): Path to file in local storage
-        url (HttpUrl | str): A URL for accessing the object.
-        size (int): Size of the file in bytes.
-        filename (str): Name of the file.
-        status (bool): True if the upload is successful else False.
-        error (str): Error message for failed upload.
-        message: Response Message
-    """
-
-    file: bytes = b""
-    path: Path | str = ""
-    url: HttpUrl | str = ""
-    filename: str = ""
-    content_type: str = ""
-    status: bool = True
-    error: str = ""
-    message: str = ""
+    id: int
+    sha256: str
+    size: int
+    filename: str
+    content_type: str
+    created_at: datetime
@@ -1,65 +1,167 @@
+import hashlib
+import logging
 import os
-from typing import Optional
-import uuid
-import base64
-from io import BytesIO
-from app.storage.schema import FileData
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote
 
-BASE_DIR = "/var/www/uploads"
+from fastapi import Response
 
+from app.api.routes.storage.repositories import (
+    add_stored_file,
+    remove_stored_file,
+    retrieve_stored_file_by_id,
+    retrieve_stored_sha256s,
+)
+from app.core.config import settings
+from app.db.models import PayrollStoredFile
+from app.exception.app_exception import AppException
+from app.exception.error_message import ErrorMessages
+from app.utils.responses import RangeFileResponse
 
-# Ensure the base directory exists (create it if it doesn't)
-if not os.path.exists(BASE_DIR):
-    os.makedirs(BASE_DIR)
+log = logging.getLogger(__name__)
 
+# Contents are stored once, named by their SHA-256:
+#
+#   <STORAGE_DIR>/9f/86/9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08
+#
+# and every upload is a `stored_files` row pointing at one. Uploads are
+# copied in STORAGE_CHUNK_SIZE chunks into a temporary file while hashing,
+# then renamed into place, so a file is never held in memory. Deleting a
+# file only deletes its row; `python cli.py storage gc` removes contents no
+# row points at any more.
 
-def upload_file_to_local_server(
-    file_content: bytes, filename: str, content_type: str
-) -> FileData:
-    try:
-        # Generate a unique file ID and define the full path to store the file
-        file_id = str(uuid.uuid4())
-        file_path = os.path.join(BASE_DIR, f"{file_id}_{filename}")
 
-        if isinstance(file_content, str):
-            raise ValueError("file_content should be a bytes-like object, not a string")
+def blob_path(sha256: str) -> Path:
+    return Path(settings.STORAGE_DIR) / sha256[:2] / sha256[2:4] / sha256
+
+
+def tmp_dir() -> Path:
+    return Path(settings.STORAGE_DIR) / "tmp"
+
 
-        # Save the file to the local file system
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+def write_blob(stream) -> tuple[str, int]:
+    """Copies a binary stream to the storage, returns its SHA-256 and size."""
+    directory = tmp_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as tmp:
+        try:
+            while chunk := stream.read(settings.STORAGE_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.STORAGE_MAX_FILE_SIZE:
+                    raise AppException(ErrorMessages.InvalidInput(), "file size")
+                digest.update(chunk)
+                tmp.write(chunk)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
 
-        # Encode the file content in base64 (optional, for returning it)
-        file_content_base64 = base64.b64encode(file_content).decode("utf-8")
+    sha256 = digest.hexdigest()
+    path = blob_path(sha256)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # replacing an existing copy keeps one file per content and refreshes
+    # its mtime, so a concurrent `storage gc` leaves it alone
+    os.replace(tmp.name, path)
+    return sha256, size
 
-        return FileData(
+
+# POST /storage/upload
+def upload_file(
+    *, db_session, stream, filename: str, content_type: str
+) -> PayrollStoredFile:
+    """Stores an uploaded file, the content only once for identical files."""
+    sha256, size = write_blob(stream)
+    try:
+        stored_file = add_stored_file(
+            db_session=db_session,
+            sha256=sha256,
+            size=size,
             filename=filename,
-            content_type=content_type,
-            file=file_content_base64,
-            message="File upload successful.",
-            path=file_path,
+            content_type=content_type or "application/octet-stream",
         )
+        db_session.commit()
     except Exception as e:
-        return {
-            "status": False,
-            "error": str(e),
-            "message": "File upload failed due to an internal error.",
-        }
+        db_session.rollback()
+        raise AppException(ErrorMessages.ErrSM99999(), str(e))
 
+    return stored_file
 
-def read_file_from_local_server(file_path: str) -> Optional[BytesIO]:
-    try:
-        # Read the file from the local file system
-        if not os.path.exists(file_path):
-            raise FileNotFoundError("File does not exist.")
 
-        file_in_memory = BytesIO()
+# GET /storage/{file_id}
+def get_stored_file_by_id(*, db_session, file_id: int) -> PayrollStoredFile:
+    """Returns a stored file based on the given id."""
+    stored_file = retrieve_stored_file_by_id(db_session=db_session, file_id=file_id)
+    if not stored_file:
+        raise AppException(ErrorMessages.ResourceNotFound(), "file")
+
+    return stored_file
 
-        with open(file_path, "rb") as f:
-            file_in_memory.write(f.read())
 
-        file_in_memory.seek(0)  # Reset the stream's position
-        return file_in_memory
+# GET /storage/{file_id}/content
+def read_stored_file(
+    *, db_session, file_id: int, range_header: str = None, if_none_match: str = None
+) -> Response:
+    """Streams the content of a stored file, or the byte range asked for."""
+    stored_file = get_stored_file_by_id(db_session=db_session, file_id=file_id)
+    etag = f'"{stored_file.sha256}"'
+    if if_none_match and etag in if_none_match:
+        return Response(status_code=304, headers={"ETag": etag})
 
+    path = blob_path(stored_file.sha256)
+    if not path.is_file():
+        log.error(f"Content {stored_file.sha256} of file {file_id} is missing")
+        raise AppException(ErrorMessages.ResourceNotFound(), "file content")
+
+    return RangeFileResponse(
+        path,
+        size=stored_file.size,
+        media_type=stored_file.content_type,
+        range_header=range_header,
+        chunk_size=settings.STORAGE_CHUNK_SIZE,
+        headers={
+            "ETag": etag,
+            "Content-Disposition": (
+                f"attachment; filename*=utf-8''{quote(stored_file.filename)}"
+            ),
+        },
+    )
+
+
+# DELETE /storage/{file_id}
+def delete_stored_file(*, db_session, file_id: int) -> PayrollStoredFile:
+    """Deletes a stored file, its content stays until `storage gc`."""
+    get_stored_file_by_id(db_session=db_session, file_id=file_id)
+    try:
+        removed_file = remove_stored_file(db_session=db_session, file_id=file_id)
+        db_session.commit()
     except Exception as e:
-        print(f"Error reading file: {str(e)}")
-        return None
+        db_session.rollback()
+        raise AppException(ErrorMessages.ErrSM99999(), str(e))
+
+    return removed_file
+
+
+def collect_garbage(*, db_session, grace_seconds: float) -> int:
+    """Removes the contents no file points at and abandoned temporary files
+    older than `grace_seconds`, returns how many were removed."""
+    referenced = retrieve_stored_sha256s(db_session=db_session)
+    cutoff = time.time() - grace_seconds
+    root = Path(settings.STORAGE_DIR)
+    candidates = [
+        path for path in root.glob("??/??/*") if path.name not in referenced
+    ] + list(tmp_dir().glob("*"))
+    removed = 0
+    for path in candidates:
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
@@ -0,0 +1,155 @@
+import ipaddress
+import os
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import APIRouter, Request, Response
+
+from app.api.routes.system.schemas import (
+    HealthRead,
+    PoolStatusRead,
+    ProfileDetailRead,
+    ProfileRead,
+    SlowQueryRead,
+)
+from app.auth.service import CurrentAdmin
+from app.core.config import settings
+from app.db.core import async_engine, get_pool_status
+from app.db.slow_queries import slow_query_log
+from app.exception import AppException
+from app.exception.error_message import ErrorMessages
+from app.metrics import render_metrics
+from app.profiling import Profile, profile_store
+from app.utils.responses import PayrollORJSONResponse
+
+system_router = APIRouter()
+# mounted outside the API prefix for the scraper, only answers the
+# METRICS_ALLOWED_NETWORKS
+metrics_router = APIRouter()
+# mounted outside the API prefix and without authentication for load balancers
+health_router = APIRouter()
+
+# start of this worker; reset in forked server workers
+worker_started = {"at": datetime.now(timezone.utc), "clock": time.monotonic()}
+
+
+def reset_worker_started():
+    worker_started.update(at=datetime.now(timezone.utc), clock=time.monotonic())
+
+
+os.register_at_fork(after_in_child=reset_worker_started)
+
+
+# GET /system/pool
+@system_router.get("/pool", response_model=PoolStatusRead)
+def retrieve_pool_status():
+    """Retrieve the database connection pool counters."""
+    return get_pool_status()
+
+
+# GET /system/pool/async
+@system_router.get("/pool/async", response_model=PoolStatusRead)
+def retrieve_async_pool_status():
+    """Retrieve the connection pool counters of the async engine."""
+    return get_pool_status(async_engine.pool)
+
+
+def retrieve_profile_or_404(profile_id: str) -> Profile:
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise AppException(ErrorMessages.ResourceNotFound(), "profile")
+    return profile
+
+
+# GET /system/profiles
+@system_router.get("/profiles", response_model=List[ProfileRead])
+def retrieve_profiles(current_user: CurrentAdmin):
+    """Retrieve the profiled requests kept by this worker, newest first."""
+    return [profile.summary() for profile in profile_store.list()]
+
+
+# GET /system/profiles/{profile_id}
+@system_router.get("/profiles/{profile_id}", response_model=ProfileDetailRead)
+def retrieve_profile(profile_id: str, current_user: CurrentAdmin):
+    """Retrieve the call tree and SQL statements of a profiled request."""
+    profile = retrieve_profile_or_404(profile_id)
+    return {
+        **profile.summary(),
+        "call_tree": profile.call_tree(),
+        "sql_statements": [
+            {"duration_ms": duration_ms, "statement": statement}
+            for duration_ms, statement in profile.statements
+        ],
+    }
+
+
+# GET /system/profiles/{profile_id}/flamegraph
+@system_router.get("/profiles/{profile_id}/flamegraph")
+def retrieve_profile_flamegraph(profile_id: str, current_user: CurrentAdmin):
+    """Retrieve the collapsed stacks of a profiled request.
+
+    Open them with speedscope or render them with flamegraph.pl.
+    """
+    profile = retrieve_profile_or_404(profile_id)
+    return Response(content=profile.collapsed(), media_type="text/plain")
+
+
+# GET /system/slow_queries
+@system_router.get("/slow_queries", response_model=List[SlowQueryRead])
+def retrieve_slow_queries(current_user: CurrentAdmin):
+    """Retrieve the slow statements kept by this worker, newest first."""
+    return [entry.dict() for entry in slow_query_log.list()]
+
+
+# GET /system/slow_queries/{slow_query_id}
+@system_router.get("/slow_queries/{slow_query_id}", response_model=SlowQueryRead)
+def retrieve_slow_query(slow_query_id: int, current_user: CurrentAdmin):
+    """Retrieve a slow statement with its plan."""
+    entry = slow_query_log.get(slow_query_id)
+    if entry is None:
+        raise AppException(ErrorMessages.ResourceNotFound(), "slow query")
+    return entry.dict()
+
+
+# GET /health
+@health_router.get("/health", response_model=HealthRead)
+def retrieve_health():
+    """Retrieve the liveness of the worker that serves the request."""
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "started_at": worker_started["at"],
+        "uptime_seconds": time.monotonic() - worker_started["clock"],
+        "pool": get_pool_status(),
+    }
+
+
+# GET /ready
+@health_router.get("/ready")
+def retrieve_readiness(request: Request):
+    """Retrieve whether the worker finished warming up and can take traffic."""
+    if not getattr(request.app.state, "ready", False):
+        return PayrollORJSONResponse(status_code=503, content={"status": "warming"})
+    return {"status": "ready"}
+
+
+def is_metrics_client(host: str | None) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_NETWORKS_LIST
+    )
+
+
+# GET /metrics
+@metrics_router.get("/metrics", include_in_schema=False)
+def retrieve_metrics(request: Request):
+    """Retrieve the Prometheus metrics of the process."""
+    if not is_metrics_client(request.client.host if request.client else None):
+        raise AppException(ErrorMessages.ResourceNotFound(), "page")
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
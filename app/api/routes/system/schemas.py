@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import List, Optional
+
+from app.utils.models import PayrollBase
+
+
+class PoolStatusRead(PayrollBase):
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    status: str
+
+
+class ProfileRead(PayrollBase):
+    id: str
+    method: str
+    path: str
+    status_code: Optional[int] = None
+    created_at: datetime
+    duration_ms: float
+    samples: int
+    statements: int
+    sql_time_ms: float
+
+
+class ProfileStatementRead(PayrollBase):
+    duration_ms: float
+    statement: str
+
+
+class ProfileFrameRead(PayrollBase):
+    frame: str
+    samples: int
+    time_ms: float
+    own_time_ms: float
+    children: List["ProfileFrameRead"] = []
+
+
+class ProfileDetailRead(ProfileRead):
+    call_tree: List[ProfileFrameRead]
+    sql_statements: List[ProfileStatementRead]
+
+
+class SlowQueryRead(PayrollBase):
+    id: int
+    created_at: datetime
+    duration_ms: float
+    database: Optional[str] = None
+    fingerprint: str
+    statement: str
+    parameters: str
+    plan: Optional[str] = None
+    plan_error: Optional[str] = None
+
+
+class HealthRead(PayrollBase):
+    status: str
+    pid: int
+    started_at: datetime
+    uptime_seconds: float
+    pool: PoolStatusRead
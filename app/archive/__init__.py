@@ -0,0 +1,3 @@
+from app.archive.store import ArchiveStore, archive_store
+
+__all__ = ["ArchiveStore", "archive_store"]
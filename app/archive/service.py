@@ -0,0 +1,133 @@
+import logging
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import delete, select, text
+
+from app.api.routes.payroll_managements.read_repositories import (
+    PAYROLL_MANAGEMENT_READ_COLUMNS,
+)
+from app.archive.store import ArchiveStore
+from app.core.config import settings
+from app.db.arrow import to_arrow
+from app.db.filters import add_months, in_month
+from app.db.models import (
+    PayrollAttendance,
+    PayrollEmployee,
+    PayrollOvertime,
+    PayrollPayrollManagement,
+)
+
+log = logging.getLogger(__name__)
+
+# rows deleted per statement once a period is written
+DELETE_BATCH_SIZE = 5000
+ARCHIVE_EXCLUDED_COLUMNS = {"employee__cv"}
+
+
+@dataclass(frozen=True)
+class ArchivedTable:
+    model: type
+    # the columns kept, every column of the table by default
+    archived_columns: tuple = ()
+
+    @property
+    def name(self) -> str:
+        return self.model.__tablename__
+
+    def columns(self):
+        return list(self.archived_columns or self.model.__table__.columns)
+
+    def select_period(self, year: int, month: int):
+        model = self.model
+        if model is PayrollPayrollManagement:
+            return (
+                select(*self.columns())
+                .join(PayrollEmployee, model.employee_id == PayrollEmployee.id)
+                .where(model.year == year, model.month == month)
+            )
+        day = model.day_attendance if model is PayrollAttendance else model.day_overtime
+        return select(*self.columns()).where(in_month(day, month, year))
+
+
+ARCHIVED_TABLES = [
+    ArchivedTable(
+        PayrollPayrollManagement,
+        # what GET /payroll_managements returns, with the employee as it was
+        # when the period was closed. The CV is not a payslip field and stays
+        # out of the files, archived rows return it as null
+        tuple(
+            column
+            for column in PAYROLL_MANAGEMENT_READ_COLUMNS
+            if column.key not in ARCHIVE_EXCLUDED_COLUMNS
+        ),
+    ),
+    ArchivedTable(PayrollAttendance),
+    ArchivedTable(PayrollOvertime),
+]
+
+
+def is_closed(year: int, month: int, today: date | None = None) -> bool:
+    """A period is closed `ARCHIVE_CLOSED_AFTER_MONTHS` months after its end."""
+    closes = add_months(date(year, month, 1), 1 + settings.ARCHIVE_CLOSED_AFTER_MONTHS)
+    return closes <= (today or date.today())
+
+
+def period_partition(conn, table: str, year: int, month: int) -> str | None:
+    """Returns the partition holding exactly the month, if the table has one."""
+    if conn.dialect.name != "postgresql":
+        return None
+    from app.db.partitions import PARTITIONED_TABLES, list_partitions, partition_name
+
+    if table not in PARTITIONED_TABLES:
+        return None
+    name = partition_name(table, date(year, month, 1))
+    partitions = list_partitions(conn, table)
+    return name if any(p.name == name for p in partitions) else None
+
+
+def archive_table(engine, store: ArchiveStore, spec: ArchivedTable, year, month):
+    """Moves the rows of a period from the database to a new archive part.
+
+    Runs in one transaction: the rows are only deleted once the part is on
+    disk. If the commit fails anyway, the rows exist twice; reads skip
+    database rows whose id was archived and running the archive again
+    deletes them.
+    """
+    with engine.begin() as conn:
+        partition = period_partition(conn, spec.name, year, month)
+        if partition:
+            # no writes to the month until it is detached
+            conn.execute(text(f"LOCK TABLE {partition} IN EXCLUSIVE MODE"))
+        rows = conn.execute(spec.select_period(year, month)).all()
+        archived = store.ids(spec.name, year, month)
+        new_rows = [row for row in rows if row.id not in archived]
+        if new_rows:
+            store.write(spec.name, year, month, to_arrow(spec.columns(), new_rows))
+
+        if partition:
+            conn.execute(text(f"ALTER TABLE {spec.name} DETACH PARTITION {partition}"))
+            conn.execute(text(f"DROP TABLE {partition}"))
+        else:
+            ids = [row.id for row in rows]
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                conn.execute(
+                    delete(spec.model).where(
+                        spec.model.id.in_(ids[start : start + DELETE_BATCH_SIZE])
+                    )
+                )
+    log.info(
+        f"Archived {len(new_rows)} rows of {spec.name} {year}-{month:02d}"
+        + (f", dropped partition {partition}" if partition else "")
+    )
+    return len(new_rows)
+
+
+def archive_period(engine, store: ArchiveStore, year: int, month: int) -> dict:
+    """Archives a closed period of every archived table."""
+    if not is_closed(year, month):
+        raise ValueError(f"{year}-{month:02d} is not closed yet")
+    return {
+        spec.name: archive_table(engine, store, spec, year, month)
+        for spec in ARCHIVED_TABLES
+    }
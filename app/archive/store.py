@@ -0,0 +1,178 @@
+import os
+import uuid
+from pathlib import Path
+
+from app.core.config import settings
+
+# Closed periods moved out of the database are kept as zstd-compressed
+# Parquet files, one directory per table and month in the Hive layout:
+#
+#   <ARCHIVE_DIR>/attendances/period=2023-05/part-<uuid>.parquet
+#
+# Each archive run of a month adds a part. Files are sorted by company_id,
+# so a read filtered on the company skips the row groups of the others and
+# the directories of other periods are never opened. pyarrow is
+# imported only when an archived period is read or written.
+#
+# The payroll parts hold the employees' identity numbers: directories and
+# files are only readable by the user running the API.
+
+ROW_GROUP_SIZE = 64 * 1024
+DIRECTORY_MODE = 0o700
+FILE_MODE = 0o600
+
+
+def period(year: int, month: int) -> str:
+    return f"{year:04d}-{month:02d}"
+
+
+class ArchiveStore:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def path(self, table: str, year: int | None = None, month: int | None = None):
+        if year is None or month is None:
+            return self.root / table
+        return self.root / table / f"period={period(year, month)}"
+
+    def is_archived(self, table: str, year: int | None = None, month=None) -> bool:
+        """Whether anything of the period (or of the table) was archived."""
+        return self.path(table, year, month).is_dir()
+
+    def periods(self, table: str) -> list[tuple[int, int]]:
+        """Returns the archived (year, month) periods of `table`."""
+        return sorted(
+            (int(path.name[7:11]), int(path.name[12:14]))
+            for path in self.path(table).glob("period=*")
+        )
+
+    def write(self, table: str, year: int, month: int, rows) -> Path:
+        """Writes an Arrow table as a new part of the period.
+
+        The file is written under a temporary name, synced and then renamed,
+        so readers never see a partial part.
+        """
+        import pyarrow.parquet as pq
+
+        directory = self.path(table, year, month)
+        for path in (self.root, self.path(table), directory):
+            path.mkdir(mode=DIRECTORY_MODE, parents=True, exist_ok=True)
+        name = f"part-{uuid.uuid4().hex}.parquet"
+        tmp = directory / f".{name}.tmp"
+        rows = rows.sort_by([("company_id", "ascending"), ("id", "ascending")])
+        descriptor = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, FILE_MODE)
+        with open(descriptor, "wb") as file:
+            pq.write_table(
+                rows, file, compression="zstd", row_group_size=ROW_GROUP_SIZE
+            )
+            file.flush()
+            os.fsync(file.fileno())
+        path = directory / name
+        os.replace(tmp, path)
+        return path
+
+    def read(
+        self,
+        table: str,
+        *,
+        company_id: int | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        row_id: int | None = None,
+        columns: list[str] | None = None,
+    ) -> list[dict]:
+        """Returns the archived rows of a company (of every company without
+        one), optionally of one period or with one id."""
+        rows = self.read_table(
+            table,
+            company_id=company_id,
+            year=year,
+            month=month,
+            row_id=row_id,
+            columns=columns,
+        )
+        return rows.to_pylist() if rows is not None else []
+
+    def find(self, table: str, row_id: int, *, columns: list[str]) -> dict | None:
+        """Returns the archived row with the id, None if it was not archived."""
+        rows = self.read(table, row_id=row_id, columns=columns)
+        return rows[0] if rows else None
+
+    def read_table(
+        self,
+        table: str,
+        *,
+        company_id: int | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        row_id: int | None = None,
+        columns: list[str] | None = None,
+    ):
+        """Same as `read` as an Arrow table, None when nothing was archived.
+        Columns that were not archived are read as nulls."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if not self.is_archived(table, year, month):
+            return None
+        dataset = ds.dataset(
+            self.path(table),
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([("period", pa.string())]), flavor="hive"
+            ),
+        )
+        conditions = []
+        if company_id is not None:
+            conditions.append(ds.field("company_id") == company_id)
+        if year is not None and month is not None:
+            conditions.append(ds.field("period") == period(year, month))
+        if row_id is not None:
+            conditions.append(ds.field("id") == row_id)
+        condition = None
+        for part in conditions:
+            condition = part if condition is None else condition & part
+        if columns is None:
+            return dataset.to_table(filter=condition)
+        archived = set(dataset.schema.names)
+        rows = dataset.to_table(
+            columns=[name for name in columns if name in archived], filter=condition
+        )
+        for name in columns:
+            if name not in archived:
+                rows = rows.append_column(name, pa.nulls(rows.num_rows))
+        return rows
+
+    def ids(self, table: str, year: int, month: int) -> set[int]:
+        """Returns the ids already archived for the period."""
+        import pyarrow.dataset as ds
+
+        if not self.is_archived(table, year, month):
+            return set()
+        dataset = ds.dataset(self.path(table, year, month), format="parquet")
+        return set(dataset.to_table(columns=["id"]).column("id").to_pylist())
+
+    def merge(
+        self,
+        table: str,
+        rows: list[dict],
+        *,
+        company_id: int | None = None,
+        year: int | None = None,
+        month: int | None = None,
+        columns: list[str],
+    ) -> list[dict]:
+        """Returns the archived rows followed by the database `rows` that were
+        not archived yet, ordered by id."""
+        if not self.is_archived(table, year, month):
+            return rows
+        archived = self.read(
+            table, company_id=company_id, year=year, month=month, columns=columns
+        )
+        # a run that failed after writing its part left its rows in the database
+        ids = {row["id"] for row in archived}
+        merged = archived + [row for row in rows if row["id"] not in ids]
+        return sorted(merged, key=lambda row: row["id"])
+
+
+archive_store = ArchiveStore(settings.ARCHIVE_DIR)
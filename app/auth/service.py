@@ -1,17 +1,44 @@
+import hashlib
 import logging
+import time
 from typing import Annotated, Optional
 
 from fastapi import Depends, Request
+from sqlalchemy import event, inspect
 from sqlalchemy.exc import IntegrityError
-from app.auth.models import PayrollUser, UserCreate, UserRegister
+from sqlalchemy.orm import Session, object_session
+from app.auth.models import PayrollUser, Role, UserCreate, UserRegister
+from app.cache import MISSING, Snapshot, VersionedCache, snapshot
+from app.cache.bus import LocalVersionBus
 from app.core.config import settings
+from app.db.core import USE_PRIMARY, get_db
 from app.exception.error_message import ErrorMessages
-from app.utils.functions import get_user_email
+from app.utils.functions import get_token_claims
 from app.utils.functions import TokenDep
 from app.exception import AppException
 
 log = logging.getLogger(__name__)
 
+# Decoded tokens and their user, keyed by a hash of the Authorization header
+# and versioned by the user's email so an update drops all of its tokens.
+# The other workers learn about the update through the bus.
+CURRENT_USER = "current_user"
+# emails of the users changed by the session's transaction
+CHANGED_USERS = "changed_users"
+current_user_cache = VersionedCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+current_user_bus = (
+    LocalVersionBus(
+        settings.AUTH_CACHE_BUS_PATH,
+        poll_seconds=settings.AUTH_CACHE_BUS_POLL_SECONDS,
+        scope_type=str,
+    )
+    if settings.AUTH_CACHE_BUS_PATH
+    else None
+)
+
 
 def get(*, db_session, user_id: int) -> Optional[PayrollUser]:
     """Returns a user based on the given user id."""
@@ -19,9 +46,13 @@ def get(*, db_session, user_id: int) -> Optional[PayrollUser]:
 
 
 def get_by_email(*, db_session, email: str) -> Optional[PayrollUser]:
-    """Returns a user based on the given email."""
+    """Returns a user based on the given email, read from the primary so a
+    lagging replica never authenticates a deleted or demoted user."""
     return (
-        db_session.query(PayrollUser).filter(PayrollUser.email == email).one_or_none()
+        db_session.query(PayrollUser)
+        .execution_options(**{USE_PRIMARY: True})
+        .filter(PayrollUser.email == email)
+        .one_or_none()
     )
 
 
@@ -49,18 +80,83 @@ def get_or_create(*, db_session, user_in: UserRegister) -> PayrollUser:
     return user
 
 
-def get_current_user(request: Request, authorization: TokenDep) -> PayrollUser:
+def invalidate_user(*, email: str):
+    """Forgets the cached tokens of a user, in every worker.
+
+    Called automatically once a transaction that updated or deleted a
+    PayrollUser through the ORM is committed; bulk `query.update()` calls
+    bypass those events and must call it after their commit.
+    """
+    current_user_cache.invalidate(CURRENT_USER, email)
+    if current_user_bus is not None:
+        current_user_bus.publish(CURRENT_USER, email)
+
+
+@event.listens_for(PayrollUser, "after_update")
+@event.listens_for(PayrollUser, "after_delete")
+def remember_changed_user(mapper, connection, target: PayrollUser):
+    # at flush the change is not visible to the other sessions yet, a
+    # request reloading the user now would cache the old row again
+    emails = object_session(target).info.setdefault(CHANGED_USERS, set())
+    emails.add(target.email)
+    emails.update(inspect(target).attrs.email.history.deleted)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_users(session):
+    for email in session.info.pop(CHANGED_USERS, ()):
+        invalidate_user(email=email)
+
+
+def get_current_user(request: Request, authorization: TokenDep) -> Optional[Snapshot]:
     """Attempts to get the current user depending on the configured authentication provider."""
-    user_email = get_user_email(authorization)
+    token_key = hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+    if settings.AUTH_CACHE_ENABLED:
+        if current_user_bus is not None:
+            current_user_bus.poll(current_user_cache)
+        user = current_user_cache.get(CURRENT_USER, token_key)
+        if user is not MISSING:
+            return user
+
+    claims = get_token_claims(authorization)
+    user_email = claims.get("email") if claims else None
     if not user_email:
         log.exception(
             f"Unable to determine user email based on configured auth provider or no default auth user email defined. Provider: {settings.AUTHENTICATION_PROVIDER_SLUG}"
         )
         raise AppException(ErrorMessages.InvalidUsernameOrPassword())
-    return get_by_email(
-        db_session=request.state.db,
-        email=user_email,
+    # read before loading, a change committed meanwhile keeps it uncached
+    generation = current_user_cache.generation()
+    user = snapshot(
+        get_by_email(
+            db_session=get_db(request),
+            email=user_email,
+        )
     )
+    if user is None or not settings.AUTH_CACHE_ENABLED:
+        return user
+
+    expires_in = claims["exp"] - time.time() if "exp" in claims else None
+    if expires_in is None or expires_in > 0:
+        current_user_cache.set(
+            CURRENT_USER,
+            token_key,
+            user,
+            scope=user_email,
+            ttl_seconds=expires_in,
+            generation=generation,
+        )
+    return user
+
+
+CurrentUser = Annotated[Snapshot, Depends(get_current_user)]
+
+
+def get_current_admin(current_user: CurrentUser) -> Snapshot:
+    """Returns the current user, who must be an admin."""
+    if current_user is None or current_user.role != Role.ADMIN:
+        raise AppException(ErrorMessages.ForbiddenAction())
+    return current_user
 
 
-CurrentUser = Annotated[PayrollUser, Depends(get_current_user)]
+CurrentAdmin = Annotated[Snapshot, Depends(get_current_admin)]
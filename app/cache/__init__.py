@@ -0,0 +1,38 @@
+from .reference import (  # noqa
+    DEPARTMENT,
+    INSURANCE_POLICY,
+    POSITION,
+    SCHEDULE,
+    SCHEDULE_DETAILS,
+    SHIFT,
+    get_cached_department,
+    get_cached_insurance_policy,
+    get_cached_position,
+    get_cached_schedule,
+    get_cached_schedule_details,
+    get_cached_shift,
+    invalidate_reference,
+    reference_cache,
+)
+from .store import MISSING, Snapshot, VersionedCache, snapshot  # noqa
+
+__all__ = [
+    "MISSING",
+    "Snapshot",
+    "VersionedCache",
+    "snapshot",
+    "DEPARTMENT",
+    "INSURANCE_POLICY",
+    "POSITION",
+    "SCHEDULE",
+    "SCHEDULE_DETAILS",
+    "SHIFT",
+    "get_cached_department",
+    "get_cached_insurance_policy",
+    "get_cached_position",
+    "get_cached_schedule",
+    "get_cached_schedule_details",
+    "get_cached_shift",
+    "invalidate_reference",
+    "reference_cache",
+]
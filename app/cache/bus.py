@@ -0,0 +1,103 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Hashable
+
+log = logging.getLogger(__name__)
+
+
+class LocalVersionBus:
+    """File-based stand-in for a pub/sub channel between workers on one host.
+
+    Every invalidation is appended to a shared log file as
+    "<pid> <namespace> <scope>", the scope being read back with `scope_type`
+    (a company id by default). Each worker remembers how far it has
+    read and, at most once per `poll_seconds`, replays the lines written by
+    the other workers. A publisher that truncates the file starts it again
+    with a "#" line unique to the truncation, so a worker whose first line
+    changed knows the file was truncated, even once it grew past its offset
+    again; as it cannot know what it missed it clears its whole cache.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        poll_seconds: float = 1.0,
+        max_bytes=1 << 20,
+        scope_type: Callable[[str], Hashable] = int,
+    ):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.scope_type = scope_type
+        self.max_bytes = max_bytes
+        self._header, self._offset = self.read_header()
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+
+    def publish(self, namespace: str, scope: Hashable | None):
+        line = f"{os.getpid()} {namespace} {'' if scope is None else scope}\n"
+        try:
+            with open(self.path, "a", encoding="utf-8") as bus:
+                bus.write(line)
+                if bus.tell() > self.max_bytes:
+                    bus.truncate(0)
+                    bus.write(f"# {time.time_ns()} {os.getpid()}\n")
+        except OSError as e:
+            log.warning(f"Could not publish cache invalidation: {e}")
+
+    def read_header(self) -> tuple[str, int]:
+        """Returns the first line of the file, if complete, and its size."""
+        try:
+            with open(self.path, encoding="utf-8") as bus:
+                header = bus.readline()
+                size = os.fstat(bus.fileno()).st_size
+        except OSError:
+            return "", 0
+        return (header if header.endswith("\n") else ""), size
+
+    def poll(self, cache):
+        """Applies the invalidations published by other workers to `cache`."""
+        now = time.monotonic()
+        if now < self._next_poll:
+            return
+        with self._lock:
+            if now < self._next_poll:
+                return
+            self._next_poll = now + self.poll_seconds
+            try:
+                with open(self.path, encoding="utf-8") as bus:
+                    header = bus.readline()
+                    size = os.fstat(bus.fileno()).st_size
+                    if not header.endswith("\n"):
+                        # empty, or its first line is still being written
+                        return
+                    if self._header and header != self._header:
+                        self._header, self._offset = header, size
+                        cache.clear()
+                        return
+                    if size < self._offset:
+                        # truncated, its new first line not written yet
+                        self._header, self._offset = header, size
+                        cache.clear()
+                        return
+                    self._header = header
+                    if size == self._offset:
+                        return
+                    bus.seek(self._offset)
+                    lines = bus.readlines()
+            except OSError:
+                return
+            # a line that is still being written is picked up on the next poll
+            if lines and not lines[-1].endswith("\n"):
+                lines.pop()
+            self._offset += sum(len(line.encode("utf-8")) for line in lines)
+
+        pid = str(os.getpid())
+        for line in lines:
+            parts = line.rstrip("\n").split(" ", 2)
+            if len(parts) != 3 or parts[0] in (pid, "#"):
+                continue
+            _, namespace, scope = parts
+            cache.invalidate(namespace, self.scope_type(scope) if scope else None)
@@ -0,0 +1,185 @@
+import logging
+
+from app.cache.bus import LocalVersionBus
+from app.cache.store import Snapshot, VersionedCache, snapshot
+from app.core.config import settings
+from app.db.core import USE_PRIMARY
+from app.db.models import (
+    InsurancePolicy,
+    PayrollDepartment,
+    PayrollPosition,
+    PayrollSchedule,
+    PayrollScheduleDetail,
+    PayrollShift,
+)
+
+log = logging.getLogger(__name__)
+
+# Reference data changes rarely but is read in every payroll and contract
+# loop. Rows are cached as detached snapshots so they can be shared between
+# requests and threads without touching any session. They are always loaded
+# from the primary so a lagging replica cannot refill the cache with rows
+# that were just invalidated.
+
+SHIFT = "shift"
+SCHEDULE = "schedule"
+SCHEDULE_DETAILS = "schedule_details"
+DEPARTMENT = "department"
+POSITION = "position"
+INSURANCE_POLICY = "insurance_policy"
+
+reference_cache = VersionedCache(
+    max_entries=settings.REFERENCE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.REFERENCE_CACHE_TTL_SECONDS,
+)
+reference_bus = (
+    LocalVersionBus(
+        settings.REFERENCE_CACHE_BUS_PATH,
+        poll_seconds=settings.REFERENCE_CACHE_BUS_POLL_SECONDS,
+    )
+    if settings.REFERENCE_CACHE_BUS_PATH
+    else None
+)
+
+
+def _cached(namespace: str, key, loader):
+    if not settings.REFERENCE_CACHE_ENABLED:
+        return loader()[0]
+    if reference_bus is not None:
+        reference_bus.poll(reference_cache)
+    return reference_cache.get_or_load(namespace, key, loader)
+
+
+def _load_by_id(db_session, model, id: int):
+    row = snapshot(
+        db_session.query(model)
+        .execution_options(**{USE_PRIMARY: True})
+        .filter(model.id == id)
+        .first()
+    )
+    return row, getattr(row, "company_id", None)
+
+
+def get_cached_shift(*, db_session, shift_id: int) -> Snapshot | None:
+    """Returns a shift snapshot based on the given id."""
+    return _cached(
+        SHIFT, shift_id, lambda: _load_by_id(db_session, PayrollShift, shift_id)
+    )
+
+
+def get_cached_schedule(*, db_session, schedule_id: int) -> Snapshot | None:
+    """Returns a schedule snapshot based on the given id."""
+    return _cached(
+        SCHEDULE,
+        schedule_id,
+        lambda: _load_by_id(db_session, PayrollSchedule, schedule_id),
+    )
+
+
+def get_cached_schedule_details(*, db_session, schedule_id: int) -> dict:
+    """Returns all schedule_details of a schedule as snapshots."""
+
+    def load():
+        schedule = get_cached_schedule(db_session=db_session, schedule_id=schedule_id)
+        schedule_details = [
+            snapshot(schedule_detail)
+            for schedule_detail in db_session.query(PayrollScheduleDetail)
+            .execution_options(**{USE_PRIMARY: True})
+            .filter(PayrollScheduleDetail.schedule_id == schedule_id)
+            .all()
+        ]
+        data = {"count": len(schedule_details), "data": schedule_details}
+        return data, getattr(schedule, "company_id", None)
+
+    return _cached(SCHEDULE_DETAILS, schedule_id, load)
+
+
+def get_cached_department(*, db_session, department_id: int) -> Snapshot | None:
+    """Returns a department snapshot based on the given id."""
+    return _cached(
+        DEPARTMENT,
+        department_id,
+        lambda: _load_by_id(db_session, PayrollDepartment, department_id),
+    )
+
+
+def get_cached_position(*, db_session, position_id: int) -> Snapshot | None:
+    """Returns a position snapshot based on the given id."""
+    return _cached(
+        POSITION,
+        position_id,
+        lambda: _load_by_id(db_session, PayrollPosition, position_id),
+    )
+
+
+def get_cached_insurance_policy(*, db_session, id: int) -> Snapshot | None:
+    """Returns an insurance policy snapshot based on the given id."""
+    return _cached(
+        INSURANCE_POLICY, id, lambda: _load_by_id(db_session, InsurancePolicy, id)
+    )
+
+
+def warm_reference_cache(*, db_session) -> int:
+    """Loads the reference rows of every company, up to the cache size.
+
+    Used at startup so the first payroll runs find the cache filled; returns
+    the number of rows cached.
+    """
+    if not settings.REFERENCE_CACHE_ENABLED:
+        return 0
+    models = (
+        (SHIFT, PayrollShift),
+        (SCHEDULE, PayrollSchedule),
+        (DEPARTMENT, PayrollDepartment),
+        (POSITION, PayrollPosition),
+        (INSURANCE_POLICY, InsurancePolicy),
+    )
+    # the schedule details share the budget with the other kinds
+    limit = reference_cache.max_entries // (len(models) + 1)
+    # nothing is cached if a change is invalidated while loading
+    generation = reference_cache.generation()
+    cached = 0
+    for namespace, model in models:
+        for row in (
+            db_session.query(model)
+            .execution_options(**{USE_PRIMARY: True})
+            .order_by(model.id)
+            .limit(limit)
+        ):
+            scope = getattr(row, "company_id", None)
+            reference_cache.set(
+                namespace, row.id, snapshot(row), scope=scope, generation=generation
+            )
+            cached += 1
+
+    schedule_details: dict[int, list] = {}
+    for schedule_detail in (
+        db_session.query(PayrollScheduleDetail)
+        .execution_options(**{USE_PRIMARY: True})
+        .order_by(PayrollScheduleDetail.schedule_id, PayrollScheduleDetail.id)
+    ):
+        schedule_details.setdefault(schedule_detail.schedule_id, []).append(
+            snapshot(schedule_detail)
+        )
+    for schedule_id, details in list(schedule_details.items())[:limit]:
+        schedule = reference_cache.get(SCHEDULE, schedule_id)
+        reference_cache.set(
+            SCHEDULE_DETAILS,
+            schedule_id,
+            {"count": len(details), "data": details},
+            scope=getattr(schedule, "company_id", None),
+            generation=generation,
+        )
+        cached += 1
+    return cached
+
+
+def invalidate_reference(*namespaces: str, company_id: int | None = None):
+    """Drops the cached rows of a company, or of every company when unknown.
+
+    Called by the create/update/delete services once their change is made.
+    """
+    for namespace in namespaces:
+        reference_cache.invalidate(namespace, company_id)
+        if reference_bus is not None:
+            reference_bus.publish(namespace, company_id)
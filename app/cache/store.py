@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Callable, Hashable
+
+from sqlalchemy import inspect
+
+
+MISSING = object()
+
+
+class Snapshot(SimpleNamespace):
+    """Read-only copy of the column values of an ORM row."""
+
+    def __setattr__(self, name, value):
+        raise AttributeError("cached snapshots are read-only")
+
+
+def snapshot(instance) -> Snapshot | None:
+    if instance is None:
+        return None
+    values = {
+        attr.key: getattr(instance, attr.key)
+        for attr in inspect(instance).mapper.column_attrs
+    }
+    return Snapshot(**values)
+
+
+class VersionedCache:
+    """Thread-safe LRU/TTL cache whose entries are versioned by (namespace, scope).
+
+    The scope is whatever owns the entry, e.g. a company id. Every entry
+    remembers the version of its (namespace, scope) at the time it was
+    stored. `invalidate` bumps that version, so stale entries are never
+    served again and simply age out of the LRU. A value loaded while an
+    invalidation happened is returned but not stored, it may predate it.
+    """
+
+    def __init__(self, *, max_entries: int = 2048, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._versions: dict[tuple[str, Hashable], int] = {}
+        # bumped by every invalidation, the scope of a value being loaded is
+        # only known once it is loaded
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _version(self, namespace: str, scope: Hashable) -> tuple[int, int]:
+        # The namespace-wide version is bumped when the scope is unknown.
+        return (
+            self._versions.get((namespace, None), 0),
+            self._versions.get((namespace, scope), 0),
+        )
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        """Returns the cached value or `MISSING`."""
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None:
+                scope, version, expires_at, value = entry
+                if expires_at > time.monotonic() and version == self._version(
+                    namespace, scope
+                ):
+                    self._entries.move_to_end((namespace, key))
+                    self.hits += 1
+                    return value
+                del self._entries[(namespace, key)]
+            self.misses += 1
+            return MISSING
+
+    def set(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        *,
+        scope: Hashable,
+        ttl_seconds: float | None = None,
+        generation: int | None = None,
+    ):
+        """Stores a value; `ttl_seconds` can only shorten the default TTL.
+
+        With the `generation` read before the value was loaded, nothing is
+        stored when an invalidation happened since.
+        """
+        if ttl_seconds is None or ttl_seconds > self.ttl_seconds:
+            ttl_seconds = self.ttl_seconds
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[(namespace, key)] = (
+                scope,
+                self._version(namespace, scope),
+                time.monotonic() + ttl_seconds,
+                value,
+            )
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], tuple[Any, Hashable]],
+    ) -> Any:
+        """Returns the cached value, calling `loader` on a miss.
+
+        `loader` returns the value and the scope it belongs to. Missing rows
+        (None) are not cached so that a later create is seen immediately.
+        """
+        value = self.get(namespace, key)
+        if value is not MISSING:
+            return value
+        generation = self.generation()
+        value, scope = loader()
+        if value is not None:
+            self.set(namespace, key, value, scope=scope, generation=generation)
+        return value
+
+    def generation(self) -> int:
+        """Returns the counter to pass to `set` for a value about to be loaded."""
+        with self._lock:
+            return self._generation
+
+    def invalidate(self, namespace: str, scope: Hashable = None):
+        """Drops every entry of `namespace` for a scope, or for all of them."""
+        with self._lock:
+            self._versions[(namespace, scope)] = (
+                self._versions.get((namespace, scope), 0) + 1
+            )
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,64 @@
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+# "import time:       self [us] |       cumulative | imported package"
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split(".", 1)[0]
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """Parses the stderr of `python -X importtime`, in import order."""
+    rows = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append(
+                ImportTime(module, int(self_us), int(cumulative_us), len(indent) // 2)
+            )
+    return rows
+
+
+def measure_import(module: str = "app.main") -> list[ImportTime]:
+    """Imports `module` in a fresh interpreter and returns its import times."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return parse_importtime(completed.stderr)
+
+
+def total_us(rows: list[ImportTime], module: str) -> int:
+    return next(row.cumulative_us for row in rows if row.module == module)
+
+
+def by_package(rows: list[ImportTime]) -> list[tuple[str, int, int]]:
+    """Returns (package, self time, modules) per top-level package, slowest first."""
+    self_us, modules = defaultdict(int), defaultdict(int)
+    for row in rows:
+        self_us[row.package] += row.self_us
+        modules[row.package] += 1
+    return sorted(
+        ((package, self_us[package], modules[package]) for package in self_us),
+        key=lambda item: -item[1],
+    )
@@ -0,0 +1,138 @@
+import logging
+import math
+import os
+import tempfile
+from pathlib import Path
+
+from gunicorn.app.base import BaseApplication
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+# Production server: a gunicorn master forking uvicorn workers. The app is
+# imported once in the master (preload) so workers start in milliseconds and
+# share its memory pages; every worker then gets connection pools of its own
+# in `post_fork`, as connections must never cross a fork.
+
+WORKER_CLASS = "uvicorn_worker.UvicornWorker"
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and the cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = CGROUP_CPU_MAX.read_text().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def default_workers() -> int:
+    """One worker per CPU: the handlers are CPU bound between queries and the
+    threadpool of each worker already overlaps the database waits."""
+    return available_cpus()
+
+
+def on_starting(server):
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        # files of a previous run would be summed with the new ones
+        for path in Path(directory).glob("*.db"):
+            path.unlink()
+
+
+def post_fork(server, worker):
+    from app.db.core import dispose_engines
+
+    dispose_engines()
+    log.info(f"Worker {worker.pid} started")
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+class PayrollServer(BaseApplication):
+    def __init__(self, app_uri: str, options: dict):
+        self.app_uri = app_uri
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        from gunicorn.util import import_app
+
+        return import_app(self.app_uri)
+
+
+def serve(
+    *,
+    host: str,
+    port: int,
+    workers: int | None = None,
+    timeout: int = 60,
+    graceful_timeout: int = 30,
+    keepalive: int = 5,
+    max_requests: int = 0,
+    max_requests_jitter: int = 0,
+    preload: bool = True,
+    app_uri: str = "app.main:app",
+):
+    """Runs the API with `workers` processes until the master is stopped.
+
+    Signals to the master: TERM/INT drain (in-flight requests get
+    `graceful_timeout` seconds) and stop, HUP replaces the workers one
+    generation at a time, TTIN/TTOU add or remove a worker. With `preload`
+    the new workers are forked from the code the master loaded at start, so
+    HUP does not deploy new code: restart the master, or serve without
+    preload to have HUP reload it.
+    """
+    workers = workers or default_workers()
+    if workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        # must be set before prometheus_client is imported by the app
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(
+            prefix="payroll-metrics-"
+        )
+    if workers > 1 and not (
+        settings.AUTH_CACHE_BUS_PATH and settings.REFERENCE_CACHE_BUS_PATH
+    ):
+        # read when the app is imported below, so that a change made in one
+        # worker drops the cached users and reference data in all of them
+        directory = Path(tempfile.mkdtemp(prefix="payroll-cache-"))
+        settings.AUTH_CACHE_BUS_PATH = settings.AUTH_CACHE_BUS_PATH or str(
+            directory / "auth.bus"
+        )
+        settings.REFERENCE_CACHE_BUS_PATH = settings.REFERENCE_CACHE_BUS_PATH or str(
+            directory / "reference.bus"
+        )
+    PayrollServer(
+        app_uri,
+        {
+            "bind": f"{host}:{port}",
+            "workers": workers,
+            "worker_class": WORKER_CLASS,
+            "preload_app": preload,
+            "timeout": timeout,
+            "graceful_timeout": graceful_timeout,
+            "keepalive": keepalive,
+            "max_requests": max_requests,
+            "max_requests_jitter": max_requests_jitter,
+            "on_starting": on_starting,
+            "post_fork": post_fork,
+            "child_exit": child_exit,
+        },
+    ).run()
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, ExitStack
+
+from fastapi import FastAPI
+from sqlalchemy.orm import configure_mappers
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+# Work the first requests of a new worker would otherwise do: mapper
+# configuration, opening pool connections, loading reference data and
+# contract templates, and building the OpenAPI schema. `/ready` answers 503
+# until it is done.
+
+
+def open_connections(engine, count: int):
+    """Opens `count` pool connections at once and returns them to the pool."""
+    with ExitStack() as stack:
+        for _ in range(count):
+            stack.enter_context(engine.connect())
+
+
+async def open_async_connections(engine, count: int):
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            await stack.enter_async_context(engine.connect())
+
+
+def warm_reference_cache():
+    from app.cache.reference import warm_reference_cache
+    from app.db.core import SessionLocal
+
+    with SessionLocal() as db_session:
+        return warm_reference_cache(db_session=db_session)
+
+
+def load_templates():
+    from app.api.routes.contract_histories.services import TEMPLATE_DIR
+    from app.utils.functions import load_template
+
+    templates = sorted(TEMPLATE_DIR.glob("*.docx"))
+    for template_path in templates:
+        load_template(str(template_path))
+    return len(templates)
+
+
+async def warm_up(app: FastAPI) -> bool:
+    """Runs every warm-up step, marks the app ready and returns True on success."""
+    from app.db import core
+
+    started = time.perf_counter()
+    try:
+        configure_mappers()
+        count = min(settings.WARMUP_CONNECTIONS, settings.DATABASE_POOL_SIZE)
+        for engine in (core.engine, core.replica_engine):
+            if engine is not None:
+                await run_in_threadpool(open_connections, engine, count)
+        for engine in (core.async_engine, core.async_replica_engine):
+            if engine is not None:
+                await open_async_connections(engine, count)
+        cached = await run_in_threadpool(warm_reference_cache)
+        templates = await run_in_threadpool(load_templates)
+        app.openapi()
+    except Exception:
+        log.exception("Warm-up failed, the worker stays unready")
+        return False
+    app.state.ready = True
+    log.info(
+        f"Warm-up done in {time.perf_counter() - started:.2f}s: {count} connections "
+        f"per engine, {cached} reference rows, {templates} templates"
+    )
+    return True
+
+
+async def warm_up_until_ready(app: FastAPI, retry_seconds: float):
+    """Retries the warm-up, e.g. until the database is reachable."""
+    while not await warm_up(app):
+        await asyncio.sleep(retry_seconds)
@@ -0,0 +1,113 @@
+import io
+from datetime import date, datetime
+from enum import Enum
+
+# Typed Arrow conversion of Core rows, shared by the Parquet archive and the
+# columnar exports. Enums are stored by value. pyarrow is imported inside the
+# functions, like the other heavy libraries.
+
+CONTENT_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def arrow_type(column):
+    import pyarrow as pa
+
+    python_type = column.type.python_type
+    if issubclass(python_type, Enum) or issubclass(python_type, str):
+        return pa.string()
+    if issubclass(python_type, bytes):
+        return pa.binary()
+    if issubclass(python_type, bool):
+        return pa.bool_()
+    if issubclass(python_type, int):
+        return pa.int64()
+    if issubclass(python_type, float):
+        return pa.float64()
+    if issubclass(python_type, datetime):
+        return pa.timestamp("us")
+    if issubclass(python_type, date):
+        return pa.date32()
+    raise TypeError(f"{column.key} has no Arrow type for {python_type}")
+
+
+def arrow_schema(columns):
+    """Returns the Arrow schema of the selected columns, named by their key."""
+    import pyarrow as pa
+
+    return pa.schema([(column.key, arrow_type(column)) for column in columns])
+
+
+def by_value(values):
+    """Replaces the enums of a column by their value; checks a single value
+    so other columns are passed through untouched."""
+    sample = next((value for value in values if value is not None), None)
+    if not isinstance(sample, Enum):
+        return values
+    return [value.value if value is not None else None for value in values]
+
+
+def to_record_batch(schema, rows):
+    """Builds a record batch from Core rows selected in the schema's order."""
+    import pyarrow as pa
+
+    data = [by_value(values) for values in zip(*rows)] or [[] for _ in schema]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(data, schema)],
+        schema=schema,
+    )
+
+
+def to_arrow(columns, rows):
+    """Builds a typed Arrow table from Core rows."""
+    import pyarrow as pa
+
+    schema = arrow_schema(columns)
+    return pa.Table.from_batches([to_record_batch(schema, rows)], schema=schema)
+
+
+class ChunkSink(io.RawIOBase):
+    """A write-only file that keeps what was written until it is drained."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def write_batches(schema, batches, format: str):
+    """Encodes record batches as a Parquet file or an Arrow IPC stream,
+    yielding the bytes written for each batch so they can be streamed."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = ChunkSink()
+    if format == "parquet":
+        # one row group per batch
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    with writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            if data := sink.drain():
+                yield data
+    if data := sink.drain():
+        yield data
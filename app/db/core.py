@@ -1,13 +1,82 @@
 from typing import Annotated
 from fastapi import Depends, Request
-from sqlalchemy import create_engine
+from sqlalchemy import Select, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
 from app.core.config import settings
 
-print(settings.SQLALCHEMY_DATABASE_URI)
-engine = create_engine(
-    str(settings.SQLALCHEMY_DATABASE_URI),
+POOL_OPTIONS = {
+    "pool_size": settings.DATABASE_POOL_SIZE,
+    "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+    "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+}
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **POOL_OPTIONS)
+# psycopg 3 serves both engines; async read endpoints are bounded by this
+# pool instead of by the threadpool that runs sync handlers.
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **POOL_OPTIONS
 )
+replica_engine = (
+    create_engine(settings.DATABASE_REPLICA_URI, **POOL_OPTIONS)
+    if settings.DATABASE_REPLICA_URI
+    else None
+)
+async_replica_engine = (
+    create_async_engine(settings.DATABASE_REPLICA_URI, **POOL_OPTIONS)
+    if settings.DATABASE_REPLICA_URI
+    else None
+)
+
+# Session.info flag: plain SELECTs of this session may go to the replica
+READ_REPLICA = "read_replica"
+# execution option pinning one statement to the primary
+USE_PRIMARY = "use_primary"
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to the replica when allowed.
+
+    Only sessions flagged with `READ_REPLICA` are routed, see `get_db`.
+    Writes, flushes, SELECT ... FOR UPDATE and statements executed with the
+    `USE_PRIMARY` option always use the primary, and a session that has
+    flushed once stays on the primary so it reads its own writes.
+    """
+
+    def __init__(self, *args, replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replica is not None
+            and self.info.get(READ_REPLICA)
+            and not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and not clause.get_execution_options().get(USE_PRIMARY)
+        ):
+            return self.replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def stay_on_primary_after_flush(session, flush_context):
+    session.info[READ_REPLICA] = False
+
+
+def use_primary(db_session):
+    """Sends every further query of the session to the primary."""
+    sync_session = getattr(db_session, "sync_session", db_session)
+    sync_session.info[READ_REPLICA] = False
+
+
+def can_read_replica(request: Request) -> bool:
+    """GET/HEAD requests read from the replica unless they ask otherwise."""
+    return request.method in ("GET", "HEAD") and not request.headers.get(
+        settings.READ_YOUR_WRITES_HEADER
+    )
 
 
 class Base(DeclarativeBase):
@@ -17,8 +86,61 @@ class Base(DeclarativeBase):
 
 
 def get_db(request: Request):
-    return request.state.db
+    """Returns the request's session, opening it on first use.
+
+    Requests that never ask for a session (CORS preflights, docs, cached
+    auth) never check a connection out of the pool.
+    """
+    db_session = getattr(request.state, "db", None)
+    if db_session is None:
+        db_session = SessionLocal(info={READ_REPLICA: can_read_replica(request)})
+        request.state.db = db_session
+    return db_session
+
+
+def get_async_db(request: Request):
+    """Returns the request's async session, opening it on first use."""
+    db_session = getattr(request.state, "async_db", None)
+    if db_session is None:
+        db_session = AsyncSessionLocal(info={READ_REPLICA: can_read_replica(request)})
+        request.state.async_db = db_session
+    return db_session
+
 
+def dispose_engines():
+    """Drops the pooled connections inherited from a parent process.
 
-SessionLocal = sessionmaker(bind=engine)
+    Called in forked server workers; close=False leaves the parent's
+    connections open for the parent instead of closing them under it.
+    """
+    for sync_engine in (engine, replica_engine):
+        if sync_engine is not None:
+            sync_engine.dispose(close=False)
+    for an_async_engine in (async_engine, async_replica_engine):
+        if an_async_engine is not None:
+            an_async_engine.sync_engine.dispose(close=False)
+
+
+def get_pool_status(pool=None):
+    """Returns the connection pool counters of the engine."""
+    pool = pool or engine.pool
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        "max_overflow": getattr(pool, "_max_overflow", None),
+        "status": pool.status(),
+    }
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, bind=engine, replica=replica_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    expire_on_commit=False,
+    sync_session_class=RoutingSession,
+    replica=async_replica_engine.sync_engine if async_replica_engine else None,
+)
 DbSession = Annotated[Session, Depends(get_db)]
+AsyncDbSession = Annotated[AsyncSession, Depends(get_async_db)]
@@ -0,0 +1,31 @@
+from datetime import date, timedelta
+
+from sqlalchemy import false
+
+# Filter helpers shared by the repositories. Predicates compare the bare
+# column, so an index on it can be used: `extract("month", column) == month`
+# would have the database compute the month of every row instead.
+
+
+def month_range(month: int, year: int) -> tuple[date, date]:
+    """Returns the first and the last day of the month."""
+    first_day = date(year, month, 1)
+    if month == 12:
+        next_month = date(year + 1, 1, 1)
+    else:
+        next_month = date(year, month + 1, 1)
+    return first_day, next_month - timedelta(days=1)
+
+
+def add_months(day: date, months: int) -> date:
+    """Returns the first day of the month `months` after the month of `day`."""
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def in_month(column, month: int, year: int):
+    """Filters `column` on the days of the month, matching nothing for an
+    invalid month like the `extract` comparison it replaces."""
+    if not 1 <= month <= 12 or not 1 <= year <= 9999:
+        return false()
+    return column.between(*month_range(month, year))
@@ -0,0 +1,245 @@
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+import orjson
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.archive import archive_store
+from app.db.models import PayrollEmployee
+from app.exception.app_exception import AppException
+
+log = logging.getLogger(__name__)
+
+# Batch ingestion of NDJSON bodies, one JSON object per line: rows are
+# validated while the body streams in and upserted `batch_size` at a time on
+# their (employee, day) unique constraint, one transaction per batch. A bad
+# row is reported with its line number and does not stop the others. On
+# SQLite (the benchmark and test databases) a batch is upserted with an
+# executemany instead.
+
+# longer lines are reported instead of being buffered
+MAX_LINE_SIZE = 64 * 1024
+# OpenAPI request body of the batch endpoints
+NDJSON_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+    }
+}
+
+
+@dataclass(frozen=True)
+class IngestTarget:
+    model: type
+    schema: type[BaseModel]
+    # the day column of the (employee_id, day) unique constraint
+    day: str
+    # columns overwritten when the row of the employee and day exists
+    update_columns: tuple[str, ...]
+    # raises AppException for a row the single-row endpoint would refuse
+    validate: Callable
+
+    @property
+    def name(self) -> str:
+        return self.model.__tablename__
+
+
+def upsert_statement(target: IngestTarget, columns: list[str]):
+    """Builds the INSERT ... ON CONFLICT DO UPDATE of a batch of rows, passed
+    as one array per column: a single cached statement and round trip
+    whatever the size of the batch."""
+    table = target.model.__table__
+    rows = select(
+        *(
+            func.unnest(
+                bindparam(column, type_=postgresql.ARRAY(table.c[column].type))
+            ).label(column)
+            for column in columns
+        )
+    )
+    return on_conflict_update(
+        target, postgresql.insert(table).from_select(columns, rows)
+    )
+
+
+def on_conflict_update(target: IngestTarget, statement):
+    """Overwrites the existing row of the employee and day instead."""
+    return statement.on_conflict_do_update(
+        index_elements=["employee_id", target.day],
+        set_={
+            **{column: statement.excluded[column] for column in target.update_columns},
+            "updated_at": func.now(),
+        },
+    )
+
+
+async def ndjson_lines(chunks: AsyncIterator[bytes]):
+    """Yields the (line number, line) of a streamed NDJSON body, the line
+    being None when it is longer than `MAX_LINE_SIZE`. Blank lines are
+    skipped."""
+    buffer = b""
+    number = 0
+    too_long = False
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            number += 1
+            if too_long:
+                too_long = False
+                yield number, None
+            elif line.strip():
+                yield number, line
+        if len(buffer) > MAX_LINE_SIZE:
+            too_long, buffer = True, b""
+    if too_long:
+        yield number + 1, None
+    elif buffer.strip():
+        yield number + 1, buffer
+
+
+def parse_row(target: IngestTarget, line: bytes | None):
+    """Returns the validated row of a line, raises ValueError with the reason."""
+    if line is None:
+        raise ValueError(f"line longer than {MAX_LINE_SIZE} bytes")
+    try:
+        row = target.schema.model_validate(orjson.loads(line))
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}")
+    except ValidationError as e:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                for error in e.errors()
+            )
+        )
+    try:
+        target.validate(row)
+    except AppException as e:
+        raise ValueError(e.text)
+    return row
+
+
+class BatchIngest:
+    """Validates and upserts the rows of one NDJSON body."""
+
+    def __init__(self, *, db_session, target: IngestTarget, max_errors: int):
+        self.db_session = db_session
+        self.target = target
+        self.max_errors = max_errors
+        # company of each employee seen so far, None when it does not exist
+        self.employees = {}
+        # whether each (year, month) seen so far is archived
+        self.archived = {}
+        self.received = 0
+        self.upserted = 0
+        self.failed = 0
+        # lines superseded by a later line for the same employee and day
+        self.replaced = 0
+        self.errors = []
+
+    def fail(self, number: int, error: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": number, "error": error})
+
+    def is_archived(self, day) -> bool:
+        month = (day.year, day.month)
+        if month not in self.archived:
+            self.archived[month] = archive_store.is_archived(self.target.name, *month)
+        return self.archived[month]
+
+    async def load_employees(self, employee_ids: set[int]):
+        missing = employee_ids - self.employees.keys()
+        if not missing:
+            return
+        result = await self.db_session.execute(
+            select(PayrollEmployee.id, PayrollEmployee.company_id).where(
+                PayrollEmployee.id.in_(missing)
+            )
+        )
+        self.employees.update(dict.fromkeys(missing))
+        self.employees.update(dict(result.all()))
+
+    async def check(self, batch: dict) -> tuple[list[int], list[dict]]:
+        """Returns the line numbers and values of the rows of a batch of
+        {(employee_id, day): (line number, row)} whose employee is in their
+        company, the other rows are reported."""
+        await self.load_employees({row.employee_id for _, row in batch.values()})
+        lines, values = [], []
+        # sorted on the unique key, so concurrent batches lock rows in order
+        for key in sorted(batch):
+            number, row = batch[key]
+            company_id = self.employees[row.employee_id]
+            if company_id is None:
+                self.fail(number, "employee not found")
+            elif company_id != row.company_id:
+                self.fail(number, f"employee is not in company {row.company_id}")
+            else:
+                lines.append(number)
+                values.append({**row.model_dump(), "created_by": "admin"})
+        return lines, values
+
+    async def upsert(self, values: list[dict]):
+        """Upserts and commits rows, raises SQLAlchemyError on failure."""
+        if self.db_session.get_bind().dialect.name == "postgresql":
+            await self.db_session.execute(
+                upsert_statement(self.target, list(values[0])),
+                {column: [value[column] for value in values] for column in values[0]},
+            )
+        else:
+            await self.db_session.execute(
+                on_conflict_update(
+                    self.target, sqlite.insert(self.target.model.__table__)
+                ),
+                values,
+            )
+        await self.db_session.commit()
+        self.upserted += len(values)
+
+    async def flush(self, batch: dict):
+        """Upserts a batch of {(employee_id, day): (line number, row)}."""
+        lines, values = await self.check(batch)
+        if not values:
+            return
+        try:
+            await self.upsert(values)
+        except SQLAlchemyError as e:
+            await self.db_session.rollback()
+            log.warning(f"Batch of {len(values)} {self.target.name} failed: {e}")
+            for number in lines:
+                self.fail(number, f"not stored: {getattr(e, 'orig', None) or e}")
+
+    async def run(self, chunks: AsyncIterator[bytes], batch_size: int) -> dict:
+        batch = {}
+        async for number, line in ndjson_lines(chunks):
+            self.received += 1
+            try:
+                row = parse_row(self.target, line)
+            except ValueError as e:
+                self.fail(number, str(e))
+                continue
+            day = getattr(row, self.target.day)
+            if self.is_archived(day):
+                self.fail(number, f"{day:%Y-%m} is archived")
+                continue
+            # a later line for the same employee and day replaces the earlier
+            key = (row.employee_id, day)
+            if key in batch:
+                self.replaced += 1
+            batch[key] = (number, row)
+            if len(batch) >= batch_size:
+                await self.flush(batch)
+                batch = {}
+        if batch:
+            await self.flush(batch)
+        return {
+            "received": self.received,
+            "upserted": self.upserted,
+            "failed": self.failed,
+            "replaced": self.replaced,
+            "errors": self.errors,
+        }
@@ -0,0 +1,118 @@
+import heapq
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Per-request SQL statistics. The middleware opens a QueryStats for every
+# request; the cursor hooks below add to whichever one is current. Sync
+# handlers run in the threadpool with a copy of the request context, so they
+# see the same object.
+
+_current_stats: ContextVar["QueryStats | None"] = ContextVar(
+    "query_stats", default=None
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAMETER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,?)+\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SELECT_LIST = re.compile(r"^SELECT .+? FROM ", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalizes a statement so repeated queries compare equal."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _LITERAL.sub("?", statement)
+    return _PARAMETER_LIST.sub("(?)", statement)
+
+
+def summarize(statement: str, length: int = 300) -> str:
+    """Drops the column list of a SELECT so its tables and filters stay visible."""
+    statement = _SELECT_LIST.sub("SELECT ... FROM ", statement, count=1)
+    return statement[:length]
+
+
+class QueryStats:
+    """Statement count, DB time and slowest statements of one request."""
+
+    def __init__(self, slowest: int = 5):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_limit = slowest
+        self._slowest: list[tuple[float, int, str]] = []
+        self.fingerprints: Counter = Counter()
+        # every statement in order, only kept while the request is profiled
+        self.statements: list[tuple[float, str]] | None = None
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(statement)] += 1
+        if self.statements is not None:
+            self.statements.append((duration * 1000, statement))
+        entry = (duration, self.count, statement)
+        if len(self._slowest) < self.slowest_limit:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    def slowest(self) -> list[tuple[float, str]]:
+        """Returns the slowest statements as (milliseconds, statement)."""
+        return [
+            (duration * 1000, statement)
+            for duration, _, statement in sorted(self._slowest, reverse=True)
+        ]
+
+    def repeated(self, minimum: int = 2) -> list[tuple[str, int]]:
+        """Returns the fingerprints executed at least `minimum` times."""
+        return [
+            (statement, count)
+            for statement, count in self.fingerprints.most_common()
+            if count >= minimum
+        ]
+
+
+def start_query_stats(slowest: int = 5):
+    """Starts collecting statistics for the current request."""
+    stats = QueryStats(slowest=slowest)
+    return stats, _current_stats.set(stats)
+
+
+def stop_query_stats(token):
+    _current_stats.reset(token)
+
+
+def get_query_stats() -> QueryStats | None:
+    return _current_stats.get()
+
+
+# start times by cursor: a statement that fails never reaches
+# after_cursor_execute, its entry must not be taken for the next one's
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", {})[cursor] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = conn.info.get("query_start_time", {}).pop(cursor, None)
+    if stats is None or started is None:
+        return
+    stats.record(statement, time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "handle_error")
+def forget_failed_query(exception_context):
+    conn = exception_context.connection
+    context = exception_context.execution_context
+    if conn is not None and context is not None and not conn.closed:
+        conn.info.get("query_start_time", {}).pop(context.cursor, None)
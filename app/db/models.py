@@ -2,10 +2,12 @@ from datetime import date
 from typing import List, Optional
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy import (
+    BigInteger,
     ForeignKey,
     String,
     LargeBinary,
     Float,
+    Index,
     UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
@@ -30,7 +32,9 @@ class PayrollCompany(Base, TimeStampMixin):
     name: Mapped[str] = mapped_column(String(50))  # required
     description: Mapped[Optional[str]] = mapped_column(String(255))
     created_by: Mapped[str] = mapped_column(String(30))  # required
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))  # Add ForeignKey here
+    owner_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), index=True
+    )  # Add ForeignKey here
 
     owner = relationship("PayrollUser", back_populates="company")
 
@@ -81,7 +85,9 @@ class PayrollDepartment(Base, TimeStampMixin):
     code: Mapped[str] = mapped_column(String(30), unique=True)  # required
     name: Mapped[str] = mapped_column(String(50))  # required
     description: Mapped[Optional[str]] = mapped_column(String(255))
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))  # required
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id"), index=True
+    )  # required
     created_by: Mapped[str] = mapped_column(String(30))  # required
 
     employees: Mapped[List["PayrollEmployee"]] = relationship(
@@ -102,7 +108,9 @@ class PayrollPosition(Base, TimeStampMixin):
     code: Mapped[str] = mapped_column(String(30), unique=True)  # required
     name: Mapped[str] = mapped_column(String(50))  # required
     description: Mapped[Optional[str]] = mapped_column(String(255))
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))  # required
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id"), index=True
+    )  # required
     created_by: Mapped[str] = mapped_column(String(30))  # required
 
     employees: Mapped[List["PayrollEmployee"]] = relationship(
@@ -125,8 +133,12 @@ class PayrollEmployee(Base, TimeStampMixin):
     date_of_birth: Mapped[date]  # required
     gender: Mapped[Gender]  # required
     nationality: Mapped[Optional[Nationality]]
-    department_id: Mapped[int] = mapped_column(ForeignKey("departments.id"))  # required
-    position_id: Mapped[int] = mapped_column(ForeignKey("positions.id"))  # required
+    department_id: Mapped[int] = mapped_column(
+        ForeignKey("departments.id"), index=True
+    )  # required
+    position_id: Mapped[int] = mapped_column(
+        ForeignKey("positions.id"), index=True
+    )  # required
     mst: Mapped[str] = mapped_column(String(10), unique=True)  # required
     cccd: Mapped[str] = mapped_column(String(12), unique=True)  # required
     cccd_date: Mapped[date]
@@ -151,7 +163,9 @@ class PayrollEmployee(Base, TimeStampMixin):
     bank_name: Mapped[Optional[str]] = mapped_column(String(30))
     cv: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
     note: Mapped[Optional[str]] = mapped_column(String(255))
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))  # required
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id"), index=True
+    )  # required
     created_by: Mapped[str] = mapped_column(String(30))  # required
 
     company: Mapped["PayrollCompany"] = relationship(
@@ -208,7 +222,9 @@ class InsurancePolicy(Base, TimeStampMixin):
     company_percentage: Mapped[float] = mapped_column(Float)  # required
     employee_percentage: Mapped[float] = mapped_column(Float)  # required
     description: Mapped[Optional[str]] = mapped_column(String(255))
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))  # required
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id"), index=True
+    )  # required
     created_by: Mapped[str] = mapped_column(String(30))  # required
 
     company: Mapped["PayrollCompany"] = relationship(
@@ -231,7 +247,9 @@ class PayrollShift(Base, TimeStampMixin):
     # checkout: Mapped[Optional[time]] = mapped_column(Time)
     # earliest_checkout: Mapped[Optional[time]] = mapped_column(Time)
     # latest_checkout: Mapped[Optional[time]] = mapped_column(Time)
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))  # required
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id"), index=True
+    )  # required
     created_by: Mapped[str] = mapped_column(String(30))
 
     company: Mapped["PayrollCompany"] = relationship(
@@ -248,7 +266,9 @@ class PayrollSchedule(Base, TimeStampMixin):
     code: Mapped[str] = mapped_column(String(30), unique=True)  # required
     name: Mapped[str] = mapped_column(String(50))  # required
     shift_per_day: Mapped[int]
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))  # required
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id"), index=True
+    )  # required
     created_by: Mapped[str] = mapped_column(String(30))  # required
 
     shifts: Mapped[List["PayrollScheduleDetail"]] = relationship(
@@ -269,7 +289,7 @@ class PayrollScheduleDetail(Base, TimeStampMixin):
     schedule_id: Mapped[int] = mapped_column(
         ForeignKey("schedules.id", ondelete="CASCADE")
     )
-    shift_id: Mapped[int] = mapped_column(ForeignKey("shifts.id"))
+    shift_id: Mapped[int] = mapped_column(ForeignKey("shifts.id"), index=True)
     day: Mapped[Day]
     # company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))  # required
     created_by: Mapped[str] = mapped_column(String(30))  # required
@@ -318,6 +338,7 @@ class PayrollAttendance(Base, TimeStampMixin):
         UniqueConstraint(
             "employee_id", "day_attendance", name="uq_employee_attendance"
         ),
+        Index("ix_attendances_company_id_day", "company_id", "day_attendance"),
     )
 
     def __repr__(self) -> str:
@@ -346,6 +367,7 @@ class PayrollOvertime(Base, TimeStampMixin):
 
     __table_args__ = (
         UniqueConstraint("employee_id", "day_overtime", name="uq_employee_overtime"),
+        Index("ix_overtimes_company_id_day", "company_id", "day_overtime"),
     )
 
     def __repr__(self) -> str:
@@ -358,7 +380,7 @@ class PayrollDependant(Base, TimeStampMixin):
     code: Mapped[str] = mapped_column(String(30), unique=True)  # required
     name: Mapped[str] = mapped_column(String(50))  # required
     employee_id: Mapped[int] = mapped_column(
-        ForeignKey("employees.id", ondelete="CASCADE"),
+        ForeignKey("employees.id", ondelete="CASCADE"), index=True
     )  # required
     date_of_birth: Mapped[date]  # required
     phone: Mapped[Optional[str]] = mapped_column(String(30))
@@ -369,7 +391,9 @@ class PayrollDependant(Base, TimeStampMixin):
     deduction_from: Mapped[date]
     deduction_to: Mapped[date]
     note: Mapped[Optional[str]] = mapped_column(String(255))
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))  # required
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id"), index=True
+    )  # required
     created_by: Mapped[str] = mapped_column(String(30))  # required
 
     employee: Mapped["PayrollEmployee"] = relationship(
@@ -404,7 +428,9 @@ class PayrollContractHistory(Base, TimeStampMixin):
     attendant_benefit: Mapped[float]
     contract_type: Mapped[ContractHistoryType]
     schedule_id: Mapped[Optional[int]] = mapped_column(ForeignKey("schedules.id"))
-    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))  # required
+    company_id: Mapped[int] = mapped_column(
+        ForeignKey("companies.id"), index=True
+    )  # required
     # template: Mapped[Optional[str]] = mapped_column(String(255))
     created_by: Mapped[str] = mapped_column(String(30))  # required
 
@@ -422,6 +448,15 @@ class PayrollContractHistory(Base, TimeStampMixin):
         "PayrollPayrollManagement", back_populates="contract"
     )
 
+    __table_args__ = (
+        Index(
+            "ix_contract_histories_employee_id_type",
+            "employee_id",
+            "contract_type",
+            "start_date",
+        ),
+    )
+
 
 class PayrollPayrollManagement(Base, TimeStampMixin):
     __tablename__ = "payroll_managements"
@@ -478,10 +513,34 @@ class PayrollPayrollManagement(Base, TimeStampMixin):
         "PayrollCompany", back_populates="payroll_managements"
     )
 
+    __table_args__ = (
+        Index("ix_payroll_managements_period", "company_id", "year", "month"),
+        Index(
+            "ix_payroll_managements_employee_period",
+            "employee_id",
+            "contract_history_id",
+            "year",
+            "month",
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"Payroll (employee_id={self.employee_id!r}, value={self.net_income!r}, month={self.month!r})"
 
 
+class PayrollStoredFile(Base, TimeStampMixin):
+    __tablename__ = "stored_files"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # the content lives once on disk under its SHA-256, see storage.services
+    sha256: Mapped[str] = mapped_column(String(64), index=True)
+    size: Mapped[int] = mapped_column(BigInteger)
+    filename: Mapped[str] = mapped_column(String(255))
+    content_type: Mapped[str] = mapped_column(String(255))
+
+    def __repr__(self) -> str:
+        return f"StoredFile (id={self.id!r}, filename={self.filename!r}, sha256={self.sha256!r})"
+
+
 # class TaxPolicy(Base, TimeStampMixin):
 #     __tablename__ = "tax_policies"
 #     id: Mapped[int] = mapped_column(primary_key=True)  # required
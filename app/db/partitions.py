@@ -0,0 +1,157 @@
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import text
+
+from app.db.filters import add_months
+
+log = logging.getLogger(__name__)
+
+# Monthly RANGE partitions of the day tables (PostgreSQL only, set up by the
+# `b81d4e6f09a2` migration). A month query prunes to a single partition, old
+# partitions get a BRIN index on the day, which stays tiny because rows are
+# appended in day order, and a closed year is detached in one statement
+# instead of a large DELETE.
+PARTITIONED_TABLES = {"attendances": "day_attendance", "overtimes": "day_overtime"}
+PARTITION_BOUND = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+
+@dataclass
+class Partition:
+    name: str
+    # None for the default partition
+    start: date | None
+    end: date | None
+
+
+def partition_name(table: str, start: date) -> str:
+    return f"{table}_{start:%Y_%m}"
+
+
+def is_partitioned(conn, table: str) -> bool:
+    return bool(
+        conn.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table)"
+            ),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def list_partitions(conn, table: str) -> list[Partition]:
+    """Returns the partitions of `table`, the default one first."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    partitions = []
+    for name, bound in rows:
+        match = PARTITION_BOUND.search(bound)
+        if match:
+            start, end = (date.fromisoformat(value) for value in match.groups())
+            partitions.append(Partition(name, start, end))
+        else:
+            partitions.append(Partition(name, None, None))
+    return sorted(partitions, key=lambda partition: partition.start or date.min)
+
+
+def create_partition(conn, table: str, start: date) -> str:
+    """Creates and attaches the partition of the month starting at `start`.
+
+    The table is created on its own and attached afterwards, which only
+    takes a SHARE UPDATE EXCLUSIVE lock on the parent, so reads and writes
+    go on. Rows of the month that landed in the default partition are moved
+    first, the attach would fail otherwise.
+    """
+    column = PARTITIONED_TABLES[table]
+    name = partition_name(table, start)
+    end = add_months(start, 1)
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    default = f"{table}_default"
+    moved = conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} "
+            f"WHERE {column} >= :start AND {column} < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    ).rowcount
+    if moved:
+        log.warning(f"Moved {moved} rows from {default} to {name}")
+    conn.execute(
+        text(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    )
+    return name
+
+
+def create_partitions(conn, table: str, through: date) -> list[str]:
+    """Creates the missing monthly partitions up to the month of `through`."""
+    months = [p.start for p in list_partitions(conn, table) if p.start is not None]
+    start = add_months(max(months), 1) if months else date.today().replace(day=1)
+    created = []
+    while start <= through:
+        created.append(create_partition(conn, table, start))
+        start = add_months(start, 1)
+    return created
+
+
+def index_old_partitions(conn, table: str, before: date) -> list[str]:
+    """Adds a BRIN index on the day to the partitions that end before `before`."""
+    column = PARTITIONED_TABLES[table]
+    indexed = []
+    for partition in list_partitions(conn, table):
+        if partition.end is None or partition.end > before:
+            continue
+        index = f"{partition.name}_{column}_brin"
+        exists = conn.execute(
+            text("SELECT to_regclass(:index)"), {"index": index}
+        ).scalar()
+        if exists is None:
+            conn.execute(
+                text(f"CREATE INDEX {index} ON {partition.name} USING brin ({column})")
+            )
+            indexed.append(index)
+    return indexed
+
+
+def detach_year(conn, table: str, year: int) -> list[str]:
+    """Detaches the partitions of `year`; they stay as plain tables."""
+    detached = []
+    for partition in list_partitions(conn, table):
+        if partition.start is not None and partition.start.year == year:
+            conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+            detached.append(partition.name)
+    return detached
+
+
+def maintain_partitions(
+    engine, *, months_ahead: int, brin_after_months: int, today: date | None = None
+) -> dict:
+    """Creates the partitions of the next `months_ahead` months and indexes the
+    partitions older than `brin_after_months` months, for every table."""
+    this_month = (today or date.today()).replace(day=1)
+    report = {}
+    for table in PARTITIONED_TABLES:
+        with engine.begin() as conn:
+            if not is_partitioned(conn, table):
+                raise RuntimeError(f"{table} is not partitioned, run the migrations")
+            report[table] = {
+                "created": create_partitions(
+                    conn, table, add_months(this_month, months_ahead)
+                ),
+                "indexed": index_old_partitions(
+                    conn, table, add_months(this_month, -brin_after_months)
+                ),
+            }
+    return report
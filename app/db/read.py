@@ -0,0 +1,70 @@
+from typing import Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+
+# Read-side helpers: list endpoints select plain columns with Core and hand
+# the rows straight to the response class, skipping ORM hydration and the
+# second validation pass through `response_model`.
+
+
+def read_columns(model, schema: Type[BaseModel], *, prefix: str = ""):
+    """Returns the table columns of `model` that are fields of `schema`."""
+    fields = schema.model_fields
+    return [
+        column.label(f"{prefix}{column.name}") if prefix else column
+        for column in model.__table__.columns
+        if column.name in fields
+    ]
+
+
+def fetch_all(db_session, statement: Select) -> list[dict]:
+    """Executes a Core select and returns every row as a plain dict."""
+    result = db_session.execute(statement)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def fetch_one(db_session, statement: Select) -> dict | None:
+    """Executes a Core select and returns the first row as a plain dict."""
+    result = db_session.execute(statement)
+    row = result.first()
+    if row is None:
+        return None
+    return dict(zip(result.keys(), row))
+
+
+async def async_fetch_all(db_session, statement: Select) -> list[dict]:
+    """Async version of `fetch_all` for an AsyncSession."""
+    result = await db_session.execute(statement)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+async def async_fetch_one(db_session, statement: Select) -> dict | None:
+    """Async version of `fetch_one` for an AsyncSession."""
+    result = await db_session.execute(statement)
+    row = result.first()
+    if row is None:
+        return None
+    return dict(zip(result.keys(), row))
+
+
+def nest(rows: list[dict], *, key: str, prefix: str, optional_on: str = None):
+    """Moves the `prefix`-labelled columns of each row into a nested dict.
+
+    When `optional_on` is given and that nested column is NULL (outer join
+    without a match) the nested value is set to None instead.
+    """
+    nested_keys = None
+    for row in rows:
+        if nested_keys is None:
+            nested_keys = [
+                (name, name[len(prefix) :]) for name in row if name.startswith(prefix)
+            ]
+        nested = {field: row.pop(name) for name, field in nested_keys}
+        if optional_on is not None and nested.get(optional_on) is None:
+            nested = None
+        row[key] = nested
+    return rows
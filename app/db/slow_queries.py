@@ -0,0 +1,199 @@
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.instrumentation import fingerprint
+
+log = logging.getLogger(__name__)
+
+# Statements slower than the threshold are logged with their parameters and
+# kept in a ring buffer together with their plan. The EXPLAIN runs on a
+# background thread with its own connection, so the request that ran the
+# slow statement does not wait for it.
+
+# execution option of the EXPLAIN statements, which must not be logged again
+SKIP_SLOW_QUERY_LOG = "skip_slow_query_log"
+PARAMETERS_LOG_LENGTH = 500
+STATEMENT_LOG_LENGTH = 300
+# plans waiting for the background thread; over this, entries keep no plan
+EXPLAIN_QUEUE_SIZE = 100
+
+
+class SlowQuery:
+    """One slow statement and, once captured, its plan."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, statement: str, parameters, duration: float, database: str):
+        self.id = next(self._ids)
+        self.created_at = datetime.now(timezone.utc)
+        self.statement = statement
+        self.fingerprint = fingerprint(statement)
+        self.parameters = repr(parameters)[:PARAMETERS_LOG_LENGTH]
+        self.duration_ms = duration * 1000
+        self.database = database
+        self.plan: str | None = None
+        self.plan_error: str | None = None
+
+    def dict(self) -> dict:
+        return {
+            "id": self.id,
+            "created_at": self.created_at,
+            "duration_ms": self.duration_ms,
+            "database": self.database,
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "parameters": self.parameters,
+            "plan": self.plan,
+            "plan_error": self.plan_error,
+        }
+
+
+class SlowQueryLog:
+    """The last `max_entries` slow statements of the process, newest first."""
+
+    def __init__(self, max_entries: int):
+        self._entries: deque[SlowQuery] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self._worker: threading.Thread | None = None
+        self.threshold: float | None = None
+        self.explain = True
+        self.analyze = False
+
+    def enable(self, *, threshold_ms: float, explain: bool = True, analyze=False):
+        """Starts logging statements slower than `threshold_ms`.
+
+        With `analyze`, SELECTs are explained with EXPLAIN ANALYZE, i.e. run
+        a second time inside a transaction that is rolled back.
+        """
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.analyze = analyze
+
+    def add(self, entry: SlowQuery):
+        with self._lock:
+            self._entries.appendleft(entry)
+
+    def get(self, entry_id: int) -> SlowQuery | None:
+        with self._lock:
+            return next(
+                (entry for entry in self._entries if entry.id == entry_id), None
+            )
+
+    def list(self) -> list[SlowQuery]:
+        with self._lock:
+            return list(self._entries)
+
+    def capture(self, conn, statement: str, parameters, duration: float, many: bool):
+        entry = SlowQuery(statement, parameters, duration, conn.engine.url.database)
+        log.warning(
+            f"slow query {entry.duration_ms:.1f}ms "
+            f"{entry.fingerprint[:STATEMENT_LOG_LENGTH]} parameters={entry.parameters}"
+        )
+        self.add(entry)
+        if not self.explain:
+            return
+        if many:
+            entry.plan_error = "executemany statements are not explained"
+            return
+        try:
+            self._queue.put_nowait((explain_engine(conn.engine), entry, parameters))
+        except queue.Full:
+            entry.plan_error = "too many plans waiting"
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._explain_forever, name="slow-query-explain", daemon=True
+                )
+                self._worker.start()
+
+    def reset_worker(self):
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self._worker = None
+
+    def _explain_forever(self):
+        while True:
+            engine, entry, parameters = self._queue.get()
+            try:
+                entry.plan = explain(engine, entry.statement, parameters, self.analyze)
+            except Exception as e:
+                entry.plan_error = str(e)[:STATEMENT_LOG_LENGTH]
+
+
+def explain_engine(engine: Engine) -> Engine:
+    """Returns the sync engine to explain a statement of `engine` on."""
+    if not engine.dialect.is_async:
+        return engine
+    # the sync facade of an async engine only works inside its event loop
+    from app.db import core
+
+    if core.replica_engine is not None and core.replica_engine.url == engine.url:
+        return core.replica_engine
+    return core.engine
+
+
+def explain(engine: Engine, statement: str, parameters, analyze: bool) -> str:
+    with engine.connect() as conn:
+        # never committed: EXPLAIN ANALYZE really runs the statement
+        return explain_on(conn, statement, parameters, analyze)
+
+
+def explain_on(conn, statement: str, parameters, analyze: bool = False) -> str:
+    """Returns the plan of a driver-level statement on an open connection."""
+    is_select = statement.split(None, 1)[0].upper() in ("SELECT", "WITH")
+    if conn.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze and is_select else "EXPLAIN "
+    elif conn.dialect.name == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        prefix = "EXPLAIN "
+    rows = conn.execution_options(**{SKIP_SLOW_QUERY_LOG: True}).exec_driver_sql(
+        prefix + statement, parameters
+    )
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+slow_query_log = SlowQueryLog(max_entries=settings.SLOW_QUERY_LOG_SIZE)
+# a forked worker inherits the thread object but not the thread
+os.register_at_fork(after_in_child=slow_query_log.reset_worker)
+
+
+# start times by cursor, see app.db.instrumentation
+@event.listens_for(Engine, "before_cursor_execute")
+def start_slow_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if slow_query_log.threshold is not None:
+        started = conn.info.setdefault("slow_query_start_time", {})
+        started[cursor] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("slow_query_start_time", {}).pop(cursor, None)
+    if slow_query_log.threshold is None or started is None:
+        return
+    duration = time.perf_counter() - started
+    if duration < slow_query_log.threshold:
+        return
+    if conn.get_execution_options().get(SKIP_SLOW_QUERY_LOG):
+        return
+    slow_query_log.capture(conn, statement, parameters, duration, executemany)
+
+
+@event.listens_for(Engine, "handle_error")
+def forget_failed_slow_query(exception_context):
+    conn = exception_context.connection
+    context = exception_context.execution_context
+    if conn is not None and context is not None and not conn.closed:
+        conn.info.get("slow_query_start_time", {}).pop(context.cursor, None)
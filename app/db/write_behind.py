@@ -0,0 +1,239 @@
+import asyncio
+import fcntl
+import logging
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
+
+from app.db.core import AsyncSessionLocal
+from app.db.ingest import BatchIngest, IngestTarget, parse_row
+from app.exception.app_exception import AppException
+from app.exception.error_message import ErrorMessages
+
+log = logging.getLogger(__name__)
+
+# Write-behind of single-row writes: a validated row is appended to a journal
+# on local disk and acknowledged, and a flusher upserts the buffered rows
+# every `flush_interval` seconds, or as soon as `max_rows` are buffered, in
+# one statement and transaction. Each worker appends to its own segments
+#
+#   <WRITE_BEHIND_DIR>/attendances-<time ns>-<pid>.ndjson
+#
+# and holds a lock on them until their rows are stored, then deletes them.
+# A starting worker replays the segments no one holds, those of a worker
+# that died. Rows the database refuses are kept in <table>.rejected.ndjson.
+
+
+class Segment:
+    """A journal file and the rows appended to it."""
+
+    def __init__(self, path: Path, fd: int, rows: list):
+        self.path = path
+        self.fd = fd
+        self.rows = rows
+        # rows known to be on disk
+        self.synced = 0
+
+
+class WriteBehindBuffer:
+    """Journaled in-process buffer of the rows of one table."""
+
+    def __init__(self, target: IngestTarget):
+        self.target = target
+        self.running = False
+        self.lock = threading.Lock()
+        # held while syncing or closing a segment
+        self.sync_lock = threading.Lock()
+
+    async def start(
+        self,
+        *,
+        directory: str,
+        flush_interval: float,
+        max_rows: int,
+        max_buffered: int,
+        fsync: bool,
+    ):
+        """Replays the orphaned segments and starts the flusher."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_buffered = max_buffered
+        self.fsync = fsync
+        self.pending = deque(self.claim_orphans())
+        self.buffered = sum(len(segment.rows) for segment in self.pending)
+        if self.buffered:
+            log.info(f"Replaying {self.buffered} journaled {self.target.name} rows")
+        self.segment = self.open_segment()
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.wakeup.set()
+        self.running = True
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stops the flusher after a last flush, the rows it could not store
+        stay in the journal for the next start."""
+        self.running = False
+        # not cancelled: wait_for can swallow the cancellation when the
+        # wakeup is set at the same time, and a flush in progress completes
+        self.wakeup.set()
+        await self.task
+        try:
+            await self.flush()
+        except Exception:
+            log.exception(f"Last flush of {self.target.name} failed")
+        with self.lock:
+            if not self.segment.rows:
+                os.unlink(self.segment.path)
+            with self.sync_lock:
+                for segment in (*self.pending, self.segment):
+                    os.close(segment.fd)
+                    segment.fd = None
+
+    def open_segment(self) -> Segment:
+        name = f"{self.target.name}-{time.time_ns()}-{os.getpid()}.ndjson"
+        tmp = self.directory / f".{name}"
+        fd = os.open(tmp, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL)
+        # locked before it is visible, so no starting worker takes it over
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        path = self.directory / name
+        os.rename(tmp, path)
+        return Segment(path, fd, [])
+
+    def claim_orphans(self) -> list[Segment]:
+        """Locks and reads the segments of the workers that are gone, oldest
+        first."""
+        segments = []
+        for path in sorted(self.directory.glob(f"{self.target.name}-*.ndjson")):
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # a running worker's
+                os.close(fd)
+                continue
+            if os.fstat(fd).st_nlink == 0:
+                # stored and deleted since it was listed
+                os.close(fd)
+                continue
+            segments.append(Segment(path, fd, self.read_rows(path)))
+        return segments
+
+    def read_rows(self, path: Path) -> list[BaseModel]:
+        rows = []
+        for number, line in enumerate(path.read_bytes().splitlines(), 1):
+            try:
+                rows.append(parse_row(self.target, line))
+            except ValueError as e:
+                # e.g. the last line of a worker killed while appending
+                log.warning(f"{path.name} line {number} skipped: {e}")
+        return rows
+
+    def append(self, row: BaseModel):
+        """Journals a validated row, it is stored by the next flush."""
+        line = orjson.dumps(row.model_dump(mode="json")) + b"\n"
+        with self.lock:
+            if self.buffered >= self.max_buffered:
+                raise AppException(ErrorMessages.WriteBufferFull(), self.target.name)
+            segment = self.segment
+            os.write(segment.fd, line)
+            segment.rows.append(row)
+            self.buffered += 1
+            written = len(segment.rows)
+            if written >= self.max_rows:
+                self.loop.call_soon_threadsafe(self.wakeup.set)
+        if self.fsync:
+            self.sync(segment, written)
+
+    def sync(self, segment: Segment, written: int):
+        """Returns once the first `written` rows of a segment are on disk.
+        One fdatasync covers every row appended before it started."""
+        with self.sync_lock:
+            if segment.fd is None or segment.synced >= written:
+                return
+            count = len(segment.rows)
+            os.fdatasync(segment.fd)
+            segment.synced = count
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if not self.running:
+                return
+            self.wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                log.exception(f"Flushing {self.target.name} failed")
+
+    async def flush(self):
+        """Seals the current segment and stores the pending ones, oldest first."""
+        with self.lock:
+            if self.segment.rows:
+                self.pending.append(self.segment)
+                self.segment = self.open_segment()
+        while self.pending:
+            segment = self.pending[0]
+            if not await self.store(segment):
+                return
+            self.pending.popleft()
+            os.unlink(segment.path)
+            with self.sync_lock:
+                os.close(segment.fd)
+                segment.fd = None
+            with self.lock:
+                self.buffered -= len(segment.rows)
+
+    async def store(self, segment: Segment) -> bool:
+        """Upserts the rows of a segment, a later row for the same employee
+        and day replacing the earlier. Returns False to retry it later."""
+        batch = {}
+        for number, row in enumerate(segment.rows, 1):
+            batch[(row.employee_id, getattr(row, self.target.day))] = (number, row)
+        lines = []
+        async with AsyncSessionLocal() as db_session:
+            ingest = BatchIngest(
+                db_session=db_session, target=self.target, max_errors=len(batch)
+            )
+            try:
+                lines, values = await ingest.check(batch)
+                if values:
+                    await ingest.upsert(values)
+            except (OperationalError, InterfaceError) as e:
+                log.warning(f"{segment.path.name} not stored, will retry: {e}")
+                return False
+            except SQLAlchemyError as e:
+                log.error(f"{segment.path.name} not stored: {e}")
+                for number in lines:
+                    ingest.fail(number, f"not stored: {getattr(e, 'orig', None) or e}")
+        if ingest.errors:
+            self.reject(segment, ingest.errors)
+        return True
+
+    def reject(self, segment: Segment, errors: list[dict]):
+        """Keeps the refused rows of a segment with their error."""
+        path = self.directory / f"{self.target.name}.rejected.ndjson"
+        with open(path, "ab") as file:
+            for error in errors:
+                row = segment.rows[error["line"] - 1]
+                file.write(
+                    orjson.dumps(
+                        {"row": row.model_dump(mode="json"), "error": error["error"]}
+                    )
+                    + b"\n"
+                )
+        log.warning(f"{len(errors)} {self.target.name} rows refused, see {path}")
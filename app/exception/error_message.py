@@ -100,3 +100,19 @@ class ErrorMessages:
         code = "ERR_WORK_LEAVE_STATE"
         text = json_data["APP_EXCEPTION"][code]
         http_status = status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    class QueryBudgetExceeded(BaseMessage):
+        code = "ERR_QUERY_BUDGET_EXCEEDED"
+        text = json_data["APP_EXCEPTION"][code]
+        http_status = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        def format_message(self, detail: List[str] = None):
+            """Format the error message with the repeated statements."""
+            if detail:
+                return f"{detail[0]}. Repeated statements: " + " | ".join(detail[1:])
+            return self.text
+
+    class WriteBufferFull(BaseMessage):
+        code = "ERR_WRITE_BUFFER_FULL"
+        text = json_data["APP_EXCEPTION"][code]
+        http_status = status.HTTP_503_SERVICE_UNAVAILABLE
@@ -1,21 +1,63 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, Request
-from app.db.core import engine, sessionmaker
+from fastapi import FastAPI
 from app.exception import AppException, SystemException
+from app.middlewares.compression import CompressionMiddleware
+from app.middlewares.db_session import DbSessionMiddleware
+from app.middlewares.metrics import MetricsMiddleware
+from app.middlewares.profiling import ProfilingMiddleware
+from app.middlewares.query_budget import QueryBudgetMiddleware
+from app.middlewares.query_stats import QueryStatsMiddleware
 from app.middlewares.exception_handle import (
     application_error_handler,
     system_error_handler,
 )
 from app.core.config import settings
 from app.core.log import configure_logging
+from app.core.warmup import warm_up, warm_up_until_ready
+from app.db.slow_queries import slow_query_log
 from app.api.api import api_router
+from app.api.routes.attendances.services import attendance_buffer
+from app.api.routes.system.controllers import health_router, metrics_router
+from app.utils.responses import PayrollORJSONResponse
 import logging
 
 log = logging.getLogger(__name__)
 configure_logging()
 
 
-app = FastAPI(title="Payroll API", version=settings.API_VERSION)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = not settings.WARMUP_ENABLED
+    retry = None
+    # the worker only accepts connections once this first attempt is over
+    if settings.WARMUP_ENABLED and not await warm_up(app):
+        retry = asyncio.create_task(
+            warm_up_until_ready(app, settings.WARMUP_RETRY_SECONDS)
+        )
+    if settings.WRITE_BEHIND_ENABLED:
+        await attendance_buffer.start(
+            directory=settings.WRITE_BEHIND_DIR,
+            flush_interval=settings.WRITE_BEHIND_FLUSH_MS / 1000,
+            max_rows=settings.WRITE_BEHIND_MAX_ROWS,
+            max_buffered=settings.WRITE_BEHIND_MAX_BUFFERED,
+            fsync=settings.WRITE_BEHIND_FSYNC,
+        )
+    yield
+    if retry is not None:
+        retry.cancel()
+    if settings.WRITE_BEHIND_ENABLED:
+        await attendance_buffer.stop()
+
+
+app = FastAPI(
+    title="Payroll API",
+    version=settings.API_VERSION,
+    default_response_class=PayrollORJSONResponse,
+    lifespan=lifespan,
+)
 
 
 app.add_middleware(
@@ -26,20 +68,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.RESPONSE_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_BROTLI_QUALITY,
+        brotli_enabled=settings.RESPONSE_BROTLI_ENABLED,
+    )
+
+if settings.PROFILING_ENABLED:
+    # inside DbSessionMiddleware, which closes the session of the admin check
+    app.add_middleware(ProfilingMiddleware, interval=settings.PROFILING_INTERVAL)
+
+app.add_middleware(DbSessionMiddleware)
+
+if settings.QUERY_BUDGET_ENABLED:
+    if settings.ENVIRONMENT == "production":
+        log.warning("QUERY_BUDGET_ENABLED is meant for development and CI only")
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        budgets=settings.QUERY_BUDGETS,
+        default=settings.QUERY_BUDGET_DEFAULT,
+        prefix=settings.API_VERSION_PREFIX,
+    )
+
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        server_timing=settings.SQL_SERVER_TIMING_ENABLED,
+        threshold_queries=settings.SQL_LOG_THRESHOLD_QUERIES,
+        threshold_ms=settings.SQL_LOG_THRESHOLD_MS,
+        slowest=settings.SQL_LOG_SLOWEST_STATEMENTS,
+    )
 
-@app.middleware("http")
-async def db_session_middleware(request: Request, call_next):
-    try:
-        session = sessionmaker(bind=engine)
-        request.state.db = session()
-        response = await call_next(request)
-    except Exception as e:
-        raise e from None
-    finally:
-        request.state.db.close()
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.enable(
+        threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+        explain=settings.SLOW_QUERY_EXPLAIN_ENABLED,
+        analyze=settings.SLOW_QUERY_EXPLAIN_ANALYZE,
+    )
 
-    return response
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
 
+app.include_router(health_router)
 
 app.add_exception_handler(SystemException, system_error_handler)
 app.add_exception_handler(AppException, application_error_handler)
@@ -0,0 +1,17 @@
+from app.metrics.registry import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    HTTP_RESPONSE_SIZE,
+    PAYSLIPS_COMPUTED,
+    ROWS_IMPORTED,
+    render_metrics,
+)
+
+__all__ = [
+    "HTTP_REQUEST_DURATION",
+    "HTTP_REQUESTS_IN_PROGRESS",
+    "HTTP_RESPONSE_SIZE",
+    "PAYSLIPS_COMPUTED",
+    "ROWS_IMPORTED",
+    "render_metrics",
+]
@@ -0,0 +1,89 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from app.db.core import async_engine, engine, get_pool_status, replica_engine
+
+# Imports and bulk payroll runs take seconds, hence the long tail.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = tuple(256 * 4**exponent for exponent in range(9))  # 256 B .. 16 MiB
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, by route template.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of the response body as sent, by route template.",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+PAYSLIPS_COMPUTED = Counter(
+    "payroll_payslips_computed",
+    "Payroll records computed and stored.",
+)
+ROWS_IMPORTED = Counter(
+    "payroll_rows_imported",
+    "Rows stored by the Excel imports.",
+    ["kind"],
+)
+
+
+class PoolCollector:
+    """Reports the connection pool counters of this process at scrape time."""
+
+    def collect(self):
+        engines = {"primary": engine, "async": async_engine}
+        if replica_engine is not None:
+            engines["replica"] = replica_engine
+        gauges = {
+            name: GaugeMetricFamily(
+                f"db_pool_{name}",
+                f"Connection pool {name} connections.",
+                labels=["engine"],
+            )
+            for name in ("size", "checked_out", "checked_in", "overflow")
+        }
+        for label, pool_engine in engines.items():
+            status = get_pool_status(pool_engine.pool)
+            for name, gauge in gauges.items():
+                if status[name] is not None:
+                    gauge.add_metric([label], status[name])
+        yield from gauges.values()
+
+
+REGISTRY.register(PoolCollector())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Returns the metrics in the Prometheus text format and its content type.
+
+    With several workers, set PROMETHEUS_MULTIPROC_DIR so the request metrics
+    of all of them are aggregated; pool gauges are those of the worker that
+    answers the scrape.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        registry.register(PoolCollector())
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
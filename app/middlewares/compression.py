@@ -0,0 +1,189 @@
+import logging
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+log = logging.getLogger(__name__)
+
+# Responses that are already compressed are sent untouched.
+UNCOMPRESSIBLE_CONTENT_TYPES = (
+    "application/zip",
+    "application/gzip",
+    "application/octet-stream",
+    "application/vnd.openxmlformats",
+    "application/vnd.apache",
+    "image/",
+    "video/",
+    "text/event-stream",
+)
+
+
+class GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int):
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def accepted_encodings(accept_encoding: str) -> dict[str, float]:
+    """Returns the encodings a client accepts with their q-values."""
+    encodings = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+class CompressionMiddleware:
+    """Compresses responses with brotli or gzip, negotiated on Accept-Encoding."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        brotli_enabled: bool = True,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled and brotli is not None
+        if brotli_enabled and brotli is None:
+            log.warning("brotli is not installed, falling back to gzip only")
+
+    def select_compressor(self, scope: Scope):
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        wildcard = encodings.get("*", 0.0)
+        gzip_quality = encodings.get("gzip", wildcard)
+        brotli_quality = encodings.get("br", wildcard) if self.brotli_enabled else 0.0
+        # brotli wins ties: it is smaller for the same CPU at the default quality
+        if brotli_quality > 0 and brotli_quality >= gzip_quality:
+            return lambda: BrotliCompressor(self.brotli_quality)
+        if gzip_quality > 0:
+            return lambda: GzipCompressor(self.gzip_level)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            # also without a compressor: the response still needs its Vary
+            responder = CompressionResponder(
+                self.app, self.select_compressor(scope), self.minimum_size
+            )
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    def __init__(self, app: ASGIApp, compressor_factory, minimum_size: int) -> None:
+        self.app = app
+        self.compressor_factory = compressor_factory
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    async def send_with_compression(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the start message until the first body chunk tells us
+            # whether the response is worth compressing.
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            # compressing a byte range would change what the range refers to
+            self.passthrough = (
+                "content-encoding" in headers
+                or "accept-ranges" in headers
+                or content_type.startswith(UNCOMPRESSIBLE_CONTENT_TYPES)
+            )
+            if not self.passthrough:
+                # whether compressed or not, the response depends on the
+                # Accept-Encoding: caches must not serve it to other clients
+                MutableHeaders(raw=message["headers"]).add_vary_header(
+                    "Accept-Encoding"
+                )
+                self.passthrough = self.compressor_factory is None
+        elif self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+        elif message_type == "http.response.body" and not self.started:
+            self.started = True
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            self.compressor = self.compressor_factory()
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.compressor.encoding
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body)
+            else:
+                message["body"] = self.compressor.finish(body)
+                headers["Content-Length"] = str(len(message["body"]))
+
+            await self.send(self.initial_message)
+            await self.send(message)
+        elif message_type == "http.response.body":
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                message["body"] = self.compressor.compress(body)
+            else:
+                message["body"] = self.compressor.finish(body)
+            await self.send(message)
+        else:
+            await self.send(message)
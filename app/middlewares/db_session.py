@@ -1,16 +1,28 @@
-from fastapi import Request
-from sqlalchemy.orm import sessionmaker
-from app.db.core import engine
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 
-async def create_db_session(request: Request, call_next):
-    try:
-        session = sessionmaker(bind=engine)
-        request.state.db = session()
-        response = await call_next(request)
-    except Exception as e:
-        raise e from None
-    finally:
-        request.state.db.close()
+class DbSessionMiddleware:
+    """Closes the request's sessions once the response has been sent.
 
-    return response
+    The session itself is created lazily by `get_db`, so requests that never
+    touch the database do not pay for one.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            db_session = state.pop("db", None)
+            if db_session is not None:
+                db_session.close()
+            async_db_session = state.pop("async_db", None)
+            if async_db_session is not None:
+                await async_db_session.close()
@@ -1,9 +1,9 @@
 import logging
 
 from fastapi import Request
-from fastapi.responses import JSONResponse
 
 from app.exception import AppException, SystemException
+from app.utils.responses import PayrollORJSONResponse
 
 
 log = logging.getLogger(__name__)
@@ -11,16 +11,18 @@ log = logging.getLogger(__name__)
 
 async def application_error_handler(
     request: Request, exc: AppException
-) -> JSONResponse:
+) -> PayrollORJSONResponse:
     log.error(f"Application error: {exc.code} - {exc.text}")
-    return JSONResponse(
+    return PayrollORJSONResponse(
         status_code=exc.http_status,
         content={"error": exc.code, "message": exc.text},
     )
 
 
-async def system_error_handler(request: Request, exc: SystemException) -> JSONResponse:
-    return JSONResponse(
+async def system_error_handler(
+    request: Request, exc: SystemException
+) -> PayrollORJSONResponse:
+    return PayrollORJSONResponse(
         status_code=exc.http_status,
         content={"error": exc.code, "message": exc.text},
     )
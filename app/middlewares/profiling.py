@@ -0,0 +1,92 @@
+import logging
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.models import Role
+from app.auth.service import get_current_user
+from app.db.instrumentation import get_query_stats, start_query_stats, stop_query_stats
+from app.profiling import profile_store, start_profile, stop_profile
+
+log = logging.getLogger(__name__)
+
+PROFILE_PARAMETER = "__profile"
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ProfilingMiddleware:
+    """Profiles requests of admins that ask for it.
+
+    A request is profiled when it carries `?__profile=1` or an `X-Profile: 1`
+    header and its token belongs to an admin; anyone else gets the plain
+    response. The profile (stack samples and every SQL statement) is kept in
+    `profile_store` and its id returned in the `X-Profile-Id` header. Other
+    requests only pay for looking at the query string and headers.
+    """
+
+    def __init__(self, app: ASGIApp, *, interval: float) -> None:
+        self.app = app
+        self.interval = interval
+
+    def requested(self, scope: Scope) -> bool:
+        query_string = scope["query_string"]
+        if PROFILE_PARAMETER.encode() in query_string:
+            values = parse_qs(query_string.decode("latin-1")).get(PROFILE_PARAMETER)
+            if values and values[-1] == "1":
+                return True
+        return any(
+            name == PROFILE_HEADER and value == b"1" for name, value in scope["headers"]
+        )
+
+    async def authorized(self, scope: Scope) -> bool:
+        request = Request(scope)
+        authorization = request.headers.get("Authorization")
+        if not authorization:
+            return False
+        try:
+            user = await run_in_threadpool(get_current_user, request, authorization)
+        except Exception:
+            # invalid tokens are the handlers' business, just do not profile
+            return False
+        return user is not None and user.role == Role.ADMIN
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.requested(scope)
+            or not await self.authorized(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # QueryStatsMiddleware usually opened the stats already
+        stats, stats_token = get_query_stats(), None
+        if stats is None:
+            stats, stats_token = start_query_stats()
+        stats.statements = []
+        profile, handle = start_profile(scope["method"], scope["path"], self.interval)
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(PROFILE_ID_HEADER, profile.id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            stop_profile(profile, handle)
+            profile.statements = stats.statements
+            stats.statements = None
+            if stats_token is not None:
+                stop_query_stats(stats_token)
+            profile_store.add(profile)
+            log.info(
+                f"Profiled {profile.method} {profile.path} as {profile.id}: "
+                f"{profile.sample_count} samples, {len(profile.statements)} statements"
+            )
@@ -0,0 +1,99 @@
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.instrumentation import (
+    get_query_stats,
+    start_query_stats,
+    stop_query_stats,
+    summarize,
+)
+from app.exception import AppException
+from app.exception.error_message import ErrorMessages
+from app.utils.responses import PayrollORJSONResponse
+
+log = logging.getLogger(__name__)
+
+# fingerprints listed in the error, most repeated first
+REPEATED_STATEMENTS_LISTED = 5
+STATEMENT_LENGTH = 300
+
+
+class QueryBudgetMiddleware:
+    """Fails requests that run more SQL statements than their budget.
+
+    Meant for development and CI: an N+1 regression turns into an error that
+    lists the repeated statements instead of a slow endpoint in production.
+    Budgets are keyed by "<METHOD> <route path>", the route path being the
+    path template without the API prefix, e.g. "GET /payroll_managements".
+    The statements are counted up to the start of the response, which covers
+    everything but streamed bodies.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        budgets: dict[str, int],
+        default: int | None = None,
+        prefix: str = "",
+    ) -> None:
+        self.app = app
+        self.budgets = budgets
+        self.default = default
+        self.prefix = prefix
+
+    def endpoint_key(self, scope: Scope) -> str:
+        route = scope.get("route")
+        path = getattr(route, "path", scope["path"])
+        if self.prefix and path.startswith(self.prefix):
+            path = path[len(self.prefix) :]
+        return f"{scope['method']} {path}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # QueryStatsMiddleware usually opened the stats already
+        stats, token = get_query_stats(), None
+        if stats is None:
+            stats, token = start_query_stats()
+        replaced = False
+
+        async def send_within_budget(message: Message) -> None:
+            nonlocal replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                exc = self.check(scope, stats)
+                if exc is not None:
+                    replaced = True
+                    log.error(f"Application error: {exc.code} - {exc.text}")
+                    response = PayrollORJSONResponse(
+                        status_code=exc.http_status,
+                        content={"error": exc.code, "message": exc.text},
+                    )
+                    await response(scope, receive, send)
+                    return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_within_budget)
+        finally:
+            if token is not None:
+                stop_query_stats(token)
+
+    def check(self, scope: Scope, stats) -> AppException | None:
+        key = self.endpoint_key(scope)
+        budget = self.budgets.get(key, self.default)
+        if budget is None or stats.count <= budget:
+            return None
+        repeated = [
+            f"{count}x {summarize(statement, STATEMENT_LENGTH)}"
+            for statement, count in stats.repeated()[:REPEATED_STATEMENTS_LISTED]
+        ]
+        return AppException(
+            ErrorMessages.QueryBudgetExceeded(),
+            [f"{key} ran {stats.count} statements, budget is {budget}", *repeated],
+        )
@@ -0,0 +1,86 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.instrumentation import fingerprint, start_query_stats, stop_query_stats
+
+log = logging.getLogger(__name__)
+
+# statements are shortened to keep warnings on a few lines
+STATEMENT_LOG_LENGTH = 300
+
+
+class QueryStatsMiddleware:
+    """Reports the SQL statements of each request.
+
+    Adds a `Server-Timing: db;dur=<ms>;desc="<n> queries"` header and logs one
+    line per request. When the request goes over the configured thresholds,
+    the slowest and most repeated statements are logged as a warning.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        server_timing: bool = True,
+        threshold_queries: int = 50,
+        threshold_ms: float = 500,
+        slowest: int = 5,
+    ) -> None:
+        self.app = app
+        self.server_timing = server_timing
+        self.threshold_queries = threshold_queries
+        self.threshold_ms = threshold_ms
+        self.slowest = slowest
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_query_stats(slowest=self.slowest)
+        status_code = 500
+
+        async def send_with_server_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries"',
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            stop_query_stats(token)
+            self.report(scope, status_code, stats)
+
+    def report(self, scope: Scope, status_code: int, stats) -> None:
+        if not stats.count:
+            return
+        line = (
+            f"sql method={scope['method']} path={scope['path']} "
+            f"status={status_code} queries={stats.count} "
+            f"db_ms={stats.duration_ms:.1f}"
+        )
+        if (
+            stats.count < self.threshold_queries
+            and stats.duration_ms < self.threshold_ms
+        ):
+            log.info(line)
+            return
+
+        slowest = "".join(
+            f"\n  {duration:.1f}ms {fingerprint(statement)[:STATEMENT_LOG_LENGTH]}"
+            for duration, statement in stats.slowest()
+        )
+        repeated = "".join(
+            f"\n  {count}x {statement[:STATEMENT_LOG_LENGTH]}"
+            for statement, count in stats.repeated()[: self.slowest]
+        )
+        log.warning(f"{line} slowest:{slowest} repeated:{repeated}")
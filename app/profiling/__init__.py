@@ -0,0 +1,11 @@
+from app.profiling.profiler import Profile, get_profile, start_profile, stop_profile
+from app.profiling.store import ProfileStore, profile_store
+
+__all__ = [
+    "Profile",
+    "ProfileStore",
+    "get_profile",
+    "profile_store",
+    "start_profile",
+    "stop_profile",
+]
@@ -0,0 +1,198 @@
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Sampling profiler for single requests. A background thread reads the stack
+# of every thread the request runs on through `sys._current_frames()`: the
+# event loop thread, where the profiling middleware sits, and the threadpool
+# workers running sync dependencies and handlers. Each thread is attached
+# with an "anchor" frame and only samples whose stack still contains that
+# frame are kept, so the other requests served by the same threads are left
+# out and the stacks start at the request instead of the server.
+
+_current_profile: ContextVar["Profile | None"] = ContextVar("profile", default=None)
+
+APP_DIR = str(Path(__file__).resolve().parents[1])
+# collapsed stacks use ";" between frames
+_SEPARATOR = ";"
+
+
+def _label(code, module: str) -> str:
+    return f"{code.co_qualname} ({module}:{code.co_firstlineno})".replace(
+        _SEPARATOR, ","
+    )
+
+
+class Profile:
+    """Stack samples and SQL statements of one request."""
+
+    def __init__(self, method: str, path: str, interval: float):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.created_at = datetime.now(timezone.utc)
+        self.duration = 0.0
+        self.status_code: int | None = None
+        self.samples: Counter = Counter()
+        self.statements: list[tuple[float, str]] = []
+        self._anchors: dict[int, list] = {}
+        self._thread_names: dict[int, str] = {}
+        self._labels: dict = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def attach_thread(self, anchor=None):
+        """Samples the calling thread while `anchor` is on its stack.
+
+        The anchor defaults to the outermost application frame of the caller,
+        i.e. the handler or dependency a threadpool worker is running.
+        """
+        if anchor is None:
+            frame = sys._getframe(1)
+            while frame is not None:
+                if frame.f_code.co_filename.startswith(APP_DIR):
+                    anchor = frame
+                frame = frame.f_back
+            if anchor is None:
+                return
+        ident = threading.get_ident()
+        with self._lock:
+            anchors = self._anchors.setdefault(ident, [])
+            if anchor not in anchors:
+                anchors.append(anchor)
+                self._thread_names[ident] = threading.current_thread().name
+
+    def sample(self, frames: dict):
+        with self._lock:
+            attached = [
+                (ident, list(anchors)) for ident, anchors in self._anchors.items()
+            ]
+        for ident, anchors in attached:
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None:
+                stack.append(frame)
+                if any(frame is anchor for anchor in anchors):
+                    break
+                frame = frame.f_back
+            else:
+                continue
+            labels = [self._thread_names[ident]]
+            for frame in reversed(stack):
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = _label(
+                        code, frame.f_globals.get("__name__", "?")
+                    )
+                labels.append(label)
+            self.samples[tuple(labels)] += 1
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._started
+        self._anchors.clear()
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def collapsed(self) -> str:
+        """Returns the samples in the collapsed stack format read by
+        flamegraph.pl, speedscope and most flame graph viewers."""
+        return "\n".join(
+            f"{_SEPARATOR.join(stack)} {count}"
+            for stack, count in self.samples.most_common()
+        )
+
+    def call_tree(self) -> list[dict]:
+        """Returns the samples as a tree of frames, heaviest branches first.
+
+        Times are estimated as samples multiplied by the sampling interval.
+        """
+        root: dict = {"children": {}}
+        for stack, count in self.samples.items():
+            node = root
+            for label in stack:
+                node = node["children"].setdefault(
+                    label, {"frame": label, "samples": 0, "own": 0, "children": {}}
+                )
+                node["samples"] += count
+            node["own"] += count
+        return self._tree_nodes(root)
+
+    def _tree_nodes(self, node: dict) -> list[dict]:
+        return [
+            {
+                "frame": child["frame"],
+                "samples": child["samples"],
+                "time_ms": child["samples"] * self.interval * 1000,
+                "own_time_ms": child["own"] * self.interval * 1000,
+                "children": self._tree_nodes(child),
+            }
+            for child in sorted(
+                node["children"].values(), key=lambda child: -child["samples"]
+            )
+        ]
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "created_at": self.created_at,
+            "duration_ms": self.duration * 1000,
+            "samples": self.sample_count,
+            "statements": len(self.statements),
+            "sql_time_ms": sum(duration for duration, _ in self.statements),
+        }
+
+
+class Sampler(threading.Thread):
+    def __init__(self, profile: Profile):
+        super().__init__(name=f"profiler-{profile.id[:8]}", daemon=True)
+        self.profile = profile
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.profile.interval):
+            self.profile.sample(sys._current_frames())
+
+
+def start_profile(method: str, path: str, interval: float):
+    """Starts profiling the current request from the calling frame."""
+    profile = Profile(method, path, interval)
+    profile.attach_thread(sys._getframe(1))
+    token = _current_profile.set(profile)
+    sampler = Sampler(profile)
+    sampler.start()
+    return profile, (token, sampler)
+
+
+def stop_profile(profile: Profile, handle):
+    token, sampler = handle
+    sampler.stopped.set()
+    sampler.join()
+    _current_profile.reset(token)
+    profile.finish()
+
+
+def get_profile() -> Profile | None:
+    return _current_profile.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def attach_cursor_thread(conn, cursor, statement, parameters, context, executemany):
+    # sync handlers run in the threadpool, their first statement attaches it
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.attach_thread()
@@ -0,0 +1,35 @@
+import threading
+from collections import deque
+
+from app.core.config import settings
+from app.profiling.profiler import Profile
+
+
+class ProfileStore:
+    """The last `max_entries` profiles of the process, newest first.
+
+    Profiles live in memory only: each worker keeps its own and they are lost
+    on restart, so fetch them from the instance that served the request.
+    """
+
+    def __init__(self, max_entries: int):
+        self._profiles: deque[Profile] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles.appendleft(profile)
+
+    def get(self, profile_id: str) -> Profile | None:
+        with self._lock:
+            return next(
+                (profile for profile in self._profiles if profile.id == profile_id),
+                None,
+            )
+
+    def list(self) -> list[Profile]:
+        with self._lock:
+            return list(self._profiles)
+
+
+profile_store = ProfileStore(max_entries=settings.PROFILING_STORE_SIZE)
@@ -1,6 +1,6 @@
 from io import BytesIO
+import functools
 import os
-from docx import Document
 from fastapi import Depends
 from fastapi.security.utils import get_authorization_scheme_param
 from jose import JWTError, jwt
@@ -10,10 +10,6 @@ from app.core.config import settings
 import logging
 from typing import Annotated
 from fastapi.security import APIKeyHeader
-from docx.shared import Pt
-from docx.oxml.ns import qn
-from docx.table import Table
-from docx.text.paragraph import Paragraph
 
 from app.api.routes.dependants.repositories import (
     # retrieve_dependant_by_cccd,
@@ -31,7 +27,7 @@ api_key_header = APIKeyHeader(name="Authorization")
 TokenDep = Annotated[str, Depends(api_key_header)]
 
 
-def get_user_email(authorization, **kwargs):
+def get_token_claims(authorization, **kwargs):
     scheme, param = get_authorization_scheme_param(authorization)
     if not authorization or scheme.lower() != "bearer":
         logger.exception(
@@ -42,9 +38,15 @@ def get_user_email(authorization, **kwargs):
     token = authorization.split()[1]
 
     try:
-        data = jwt.decode(token, settings.SECRET_KEY.get_secret_value())
+        return jwt.decode(token, settings.SECRET_KEY.get_secret_value())
     except (JWKError, JWTError):
         raise Exception("Invalid token")
+
+
+def get_user_email(authorization, **kwargs):
+    data = get_token_claims(authorization, **kwargs)
+    if not data:
+        return
     return data["email"]
 
 
@@ -62,6 +64,8 @@ def get_error_message_dict():
             "ERR_CANNOT_CREATE_ADMIN_USER": "Cannot create admin user.",
             "ERR_EXIST_DEPEND_OBJECT": "Cannot delete due to related object existing.",
             "ERR_WORK_LEAVE_STATE": "Invalid work or leave state.",
+            "ERR_QUERY_BUDGET_EXCEEDED": "Query budget exceeded.",
+            "ERR_WRITE_BUFFER_FULL": "Too many writes pending, retry later.",
         },
     }
 
@@ -105,10 +109,24 @@ def check_exist_person_by_mst(
     return bool(employee or dependant)
 
 
+@functools.lru_cache(maxsize=None)
+def load_template(template_path: str) -> bytes:
+    """Returns the bytes of a DOCX template, read from disk once per worker."""
+    with open(template_path, "rb") as template:
+        return template.read()
+
+
 def fill_template(template_path: str, data: dict):
+    # python-docx is only loaded by the contract exports
+    from docx import Document
+    from docx.oxml.ns import qn
+    from docx.shared import Pt
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
     if not os.path.exists(template_path):
         raise FileNotFoundError(f"Template not found at {template_path}")
-    doc = Document(template_path)
+    doc = Document(BytesIO(load_template(str(template_path))))
     # Iterate over paragraphs and replace placeholders with actual data
 
     def set_font_to_times_new_roman(paragraph):
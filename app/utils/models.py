@@ -66,6 +66,23 @@ class Pagination(PayrollBase):
     total: int
 
 
+class BatchRowError(PayrollBase):
+    line: int
+    error: str
+
+
+class BatchResult(PayrollBase):
+    """Report of an NDJSON batch: lines received, rows stored, rows refused
+    and lines replaced by a later line for the same employee and day."""
+
+    received: int
+    upserted: int
+    failed: int
+    replaced: int
+    # the first INGEST_MAX_ERRORS errors
+    errors: list[BatchRowError] = []
+
+
 class TaxType(str, Enum):
     Progressive = "PROGRESSIVE"
     Fixed = "FIXED"
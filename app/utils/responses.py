@@ -0,0 +1,119 @@
+from typing import Any
+
+import anyio
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import SecretStr
+
+# Naive datetimes are rendered as "%Y-%m-%dT%H:%M:%SZ", the same output as the
+# `json_encoders` configured on PayrollBase.
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_OMIT_MICROSECONDS
+
+
+def orjson_default(value: Any):
+    """Serializes the types orjson does not handle natively."""
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, SecretStr):
+        return value.get_secret_value()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class PayrollORJSONResponse(ORJSONResponse):
+    """JSON response rendered with orjson, formatted like PayrollBase models."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+def byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Returns the inclusive (start, end) of a single-range `Range` header.
+
+    None means the whole file: no header, several ranges or a malformed one
+    are answered with a 200. Raises ValueError when the range starts past
+    the end of the file (416).
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes=") :].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # "bytes=-500" is the last 500 bytes
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+    if start < 0 or start > end:
+        raise ValueError(f"range {header} of {size} bytes")
+    return start, end
+
+
+class RangeFileResponse(Response):
+    """Streams a file in chunks, or the byte range of a `Range` header with a
+    206. A whole file goes through `http.response.pathsend` when the server
+    supports it, which sends it with sendfile."""
+
+    def __init__(
+        self,
+        path,
+        *,
+        size: int,
+        media_type: str,
+        range_header: str | None = None,
+        chunk_size: int = 64 * 1024,
+        headers: dict | None = None,
+    ) -> None:
+        self.path = path
+        self.size = size
+        self.chunk_size = chunk_size
+        self.media_type = media_type
+        self.background = None
+        headers = {"Accept-Ranges": "bytes", **(headers or {})}
+        try:
+            self.range = byte_range(range_header, size)
+        except ValueError:
+            self.range = None
+            self.status_code = 416
+            headers.update({"Content-Range": f"bytes */{size}", "Content-Length": "0"})
+        else:
+            if self.range is None:
+                self.status_code = 200
+                headers["Content-Length"] = str(size)
+            else:
+                start, end = self.range
+                self.status_code = 206
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                headers["Content-Length"] = str(end - start + 1)
+        self.init_headers(headers)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if scope["method"] == "HEAD" or self.status_code == 416:
+            pass
+        elif self.range is None and "http.response.pathsend" in scope.get(
+            "extensions", {}
+        ):
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+        else:
+            start, end = self.range or (0, self.size - 1)
+            remaining = end - start + 1
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
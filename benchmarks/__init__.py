@@ -0,0 +1,7 @@
+"""Benchmarks for the payroll API.
+
+`python -m benchmarks seed` generates a deterministic synthetic dataset and
+the API scenarios are pytest-benchmark tests run in-process against it:
+`pytest benchmarks --benchmark-save=<name>`, then `--benchmark-compare` to
+compare a later run with a saved one.
+"""
@@ -0,0 +1,254 @@
+import json
+import sys
+from pathlib import Path
+
+import click
+
+
+@click.group()
+def benchmarks_cli():
+    """Benchmarks for the payroll API."""
+    from app.core.log import configure_logging
+
+    configure_logging()
+
+
+database_url_option = click.option(
+    "--database-url",
+    envvar="BENCHMARK_DATABASE_URL",
+    help="SQLAlchemy URL of the benchmark database, e.g. sqlite:///bench.db. "
+    "Defaults to the database of the settings.",
+)
+
+
+@benchmarks_cli.command("seed")
+@database_url_option
+@click.option("--companies", default=1, show_default=True)
+@click.option("--employees", default=200, show_default=True, help="Per company.")
+@click.option("--year", default=2024, show_default=True)
+@click.option("--seed", default=42, show_default=True)
+def seed(database_url, companies, employees, year, seed):
+    """Generates the deterministic synthetic dataset."""
+    from benchmarks.database import bind_database
+
+    engine = bind_database(database_url)
+    from benchmarks.data import DatasetSpec, generate_dataset
+
+    spec = DatasetSpec(companies=companies, employees=employees, year=year, seed=seed)
+    for company in generate_dataset(engine, spec):
+        click.echo(json.dumps(company))
+    click.secho("Success.", fg="green")
+
+
+@benchmarks_cli.command("load")
+@database_url_option
+@click.option(
+    "--url",
+    help="Base URL of a running server, e.g. http://127.0.0.1:8000. "
+    "Defaults to calling the app in-process over ASGI.",
+)
+@click.option(
+    "--mix",
+    type=click.Choice(["office_hours", "month_end", "shift_change"]),
+    default="office_hours",
+    show_default=True,
+)
+@click.option(
+    "-c",
+    "--concurrency",
+    default="1,4,16,32",
+    show_default=True,
+    help="Comma separated virtual user counts, one step each.",
+)
+@click.option("--duration", default=20.0, show_default=True, help="Seconds per step.")
+@click.option(
+    "--think-time",
+    default=0.0,
+    show_default=True,
+    help="Mean pause between requests of a user.",
+)
+@click.option(
+    "--company", default=0, show_default=True, help="Generated company index."
+)
+@click.option("--month", default=4, show_default=True)
+@click.option("--year", default=2024, show_default=True)
+@click.option("--seed", default=42, show_default=True)
+@click.option("-o", "--output", type=click.Path(path_type=Path))
+def load(
+    database_url,
+    url,
+    mix,
+    concurrency,
+    duration,
+    think_time,
+    company,
+    month,
+    year,
+    seed,
+    output,
+):
+    """Replays a traffic mix at increasing concurrency and reports latencies."""
+    import asyncio
+    from contextlib import AsyncExitStack
+
+    import httpx
+
+    from benchmarks.database import bind_database
+    from benchmarks.runner import format_duration, metadata, write_results
+
+    engine = bind_database(database_url)
+    from app.core.config import settings
+    from benchmarks.data import dataset_companies
+    from benchmarks.load import MIXES, LoadContext, run_load
+
+    companies = dataset_companies(engine)
+    if company >= len(companies):
+        raise click.ClickException("Company not found, run `seed` first.")
+    levels = [int(level) for level in concurrency.split(",")]
+
+    async def run_steps():
+        async with AsyncExitStack() as stack:
+            if url:
+                client = httpx.AsyncClient(base_url=url, timeout=None)
+            else:
+                from app.main import app
+
+                # warm-up and write-behind flusher, as in a served worker
+                await stack.enter_async_context(app.router.lifespan_context(app))
+                client = httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=app),
+                    base_url="http://loadtest",
+                    timeout=None,
+                )
+            await stack.enter_async_context(client)
+            response = await client.post(
+                f"{settings.API_VERSION_PREFIX}/auth/login",
+                json={
+                    "email": settings.SUPERUSER,
+                    "password": settings.SUPERUSER_PASSWORD,
+                },
+            )
+            response.raise_for_status()
+            client.headers[
+                "Authorization"
+            ] = f"Bearer {response.json()['access_token']}"
+            response = await client.get(
+                f"{settings.API_VERSION_PREFIX}/employees",
+                params={"company_id": companies[company]["company_id"]},
+            )
+            response.raise_for_status()
+            employees = [row for row in response.json()["data"] if row.get("schedule")]
+            ctx = LoadContext(
+                company=companies[company],
+                month=month,
+                year=year,
+                employee_ids=[row["id"] for row in employees],
+                employee_codes=[row["code"] for row in employees],
+            )
+            steps = []
+            for level in levels:
+                step = await run_load(
+                    client,
+                    ctx,
+                    mix=MIXES[mix],
+                    concurrency=level,
+                    duration=duration,
+                    seed=seed,
+                    think_time=think_time,
+                    in_process=not url,
+                )
+                steps.append(step)
+                report_step(step, format_duration)
+            return steps
+
+    steps = asyncio.run(run_steps())
+    best = max(steps, key=lambda step: step["throughput"])
+    click.echo(
+        f"Throughput peaked at {best['throughput']:.1f} req/s with "
+        f"{best['concurrency']} users"
+        + (
+            ", add higher -c steps to find the saturation point."
+            if best is steps[-1]
+            else ", more users only add latency."
+        )
+    )
+    meta = metadata(
+        database=engine.dialect.name,
+        target=url or "in-process",
+        mix=mix,
+        duration=duration,
+        think_time=think_time,
+        company=companies[company],
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    )
+    click.echo(
+        f"Results written to {write_results('load', meta, {'steps': steps}, output)}"
+    )
+
+
+def report_step(step: dict, format_duration):
+    peaks = " ".join(f"{key}={value}" for key, value in step["peaks"].items())
+    click.secho(
+        f"concurrency {step['concurrency']:>4}  {step['throughput']:8.1f} req/s"
+        f"  p50 {format_duration(step['p50']):>9}  p95 {format_duration(step['p95']):>9}"
+        f"  p99 {format_duration(step['p99']):>9}  errors {step['error_rate']:6.1%}  {peaks}",
+        bold=True,
+    )
+    for name, route in step["routes"].items():
+        click.echo(
+            f"  {name:<28} {route['requests']:>6} req {route['throughput']:8.1f} req/s"
+            f"  p50 {format_duration(route['p50']):>9}  p95 {format_duration(route['p95']):>9}"
+            f"  p99 {format_duration(route['p99']):>9}  errors {route['error_rate']:6.1%}"
+        )
+        if "error_sample" in route:
+            click.secho(f"    {route['error_sample']}", fg="red")
+
+
+@benchmarks_cli.command("plans")
+@database_url_option
+@click.option("-c", "--case", "names", multiple=True, help="Defaults to all.")
+@click.option(
+    "--company", default=0, show_default=True, help="Generated company index."
+)
+@click.option("--month", default=4, show_default=True)
+@click.option("--year", default=2024, show_default=True)
+@click.option("-v", "--verbose", is_flag=True, help="Print every statement and plan.")
+def plans(database_url, names, company, month, year, verbose):
+    """EXPLAINs the repository queries; exits with 1 on a full scan of a large
+    table."""
+    from benchmarks.database import bind_database
+
+    engine = bind_database(database_url)
+    from app.db.core import SessionLocal
+    from benchmarks.data import dataset_companies
+    from benchmarks.plans import audit_plans, sample_ids
+
+    companies = dataset_companies(engine)
+    if company >= len(companies):
+        raise click.ClickException("Company not found, run `seed` first.")
+    with SessionLocal() as db_session:
+        ids = sample_ids(db_session, companies[company]["company_id"], month, year)
+    if ids is None:
+        raise click.ClickException("The company has no contracts, run `seed` first.")
+
+    failed = False
+    for result in audit_plans(engine, ids, names):
+        failed = failed or bool(result.full_scans)
+        status = (
+            f"full scan of {', '.join(result.full_scans)}"
+            if result.full_scans
+            else "ok"
+        )
+        click.secho(
+            f"{result.name:<36} {status:<28} {' '.join(result.statement.split())[:70]}",
+            fg="red" if result.full_scans else None,
+        )
+        if verbose or result.full_scans:
+            click.echo("    " + result.plan.replace("\n", "\n    "))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    benchmarks_cli()
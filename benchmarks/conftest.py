@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("payroll benchmarks")
+    group.addoption(
+        "--database-url",
+        default=os.environ.get("BENCHMARK_DATABASE_URL"),
+        help="SQLAlchemy URL of the benchmark database, e.g. sqlite:///bench.db. "
+        "Defaults to the database of the settings.",
+    )
+    group.addoption(
+        "--company", type=int, default=0, help="Generated company index (0)."
+    )
+    group.addoption("--month", type=int, default=4, help="Month (4).")
+    group.addoption("--year", type=int, default=2024, help="Year (2024).")
+    group.addoption(
+        "--import-budget",
+        type=float,
+        default=float(os.environ.get("IMPORT_TIME_BUDGET", 3)),
+        help="Seconds a cold import of app.main may take (IMPORT_TIME_BUDGET, 3).",
+    )
+
+
+@pytest.fixture(scope="session")
+def period(pytestconfig) -> dict:
+    return {
+        "month": pytestconfig.getoption("month"),
+        "year": pytestconfig.getoption("year"),
+    }
+
+
+@pytest.fixture(scope="session")
+def engine(pytestconfig):
+    from benchmarks.database import bind_database
+
+    return bind_database(pytestconfig.getoption("database_url"))
+
+
+@pytest.fixture(scope="session")
+def company(pytestconfig, engine, period) -> dict:
+    """The generated company, an empty database is seeded with the default
+    dataset first."""
+    from benchmarks.data import DatasetSpec, dataset_companies, generate_dataset
+
+    companies = dataset_companies(engine) if has_schema(engine) else []
+    if not companies:
+        generate_dataset(engine, DatasetSpec(year=period["year"]))
+        companies = dataset_companies(engine)
+    index = pytestconfig.getoption("company")
+    if index >= len(companies):
+        pytest.fail("Company not found, run `python -m benchmarks seed` first.")
+    return companies[index]
+
+
+def has_schema(engine) -> bool:
+    from sqlalchemy import inspect
+
+    return inspect(engine).has_table("companies")
@@ -0,0 +1,331 @@
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.auth.models import Role, UserRegister
+from app.auth.service import get_or_create
+from app.core.config import settings
+from app.db.core import Base
+from app.db.models import (
+    InsurancePolicy,
+    PayrollAttendance,
+    PayrollCompany,
+    PayrollContractHistory,
+    PayrollDepartment,
+    PayrollDependant,
+    PayrollEmployee,
+    PayrollOvertime,
+    PayrollPosition,
+    PayrollSchedule,
+    PayrollScheduleDetail,
+    PayrollShift,
+)
+from app.utils.models import (
+    ContractHistoryType,
+    Day,
+    DependantRelationship,
+    Gender,
+    IDDocType,
+)
+
+CREATED_BY = "benchmark"
+BATCH_SIZE = 5000
+DEPARTMENTS = 4
+POSITIONS = 6
+# weekdays worked by each generated schedule, Monday is 0
+SCHEDULE_WEEKDAYS = {"5D": range(5), "6D": range(6)}
+WEEKDAY_NAMES = list(Day)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Size and shape of the synthetic dataset."""
+
+    companies: int = 1
+    employees: int = 200
+    year: int = 2024
+    seed: int = 42
+    # share of employees with a dependant / with a mid-year addendum
+    dependant_ratio: float = 0.3
+    addendum_ratio: float = 0.2
+    # chance of overtime on a day off
+    overtime_ratio: float = 0.15
+
+    def dict(self):
+        return asdict(self)
+
+
+def company_code(index: int) -> str:
+    return f"BC{index:03d}"
+
+
+def working_days(year: int, weekdays) -> list[date]:
+    day = date(year, 1, 1)
+    days = []
+    while day.year == year:
+        if day.weekday() in weekdays:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def insert_batches(conn, model, rows: list[dict]):
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(model), rows[start : start + BATCH_SIZE])
+
+
+def insert_returning_ids(conn, model, rows: list[dict]) -> list[int]:
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    ids = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        ids += conn.scalars(statement, rows[start : start + BATCH_SIZE]).all()
+    return ids
+
+
+def create_owner(engine) -> int:
+    """Creates the superuser from the settings, who owns every company."""
+    with Session(engine) as session:
+        user = get_or_create(
+            db_session=session,
+            user_in=UserRegister(
+                email=settings.SUPERUSER,
+                name="Admin",
+                role=Role.ADMIN,
+                password=settings.SUPERUSER_PASSWORD,
+            ),
+        )
+        return user.id
+
+
+def generate_company(conn, spec: DatasetSpec, index: int, owner_id: int) -> dict:
+    """Inserts one company with its reference data, staff and a year of time data."""
+    rng = random.Random(spec.seed * 1000 + index)
+    code = company_code(index)
+    company_id = conn.scalar(
+        insert(PayrollCompany).returning(PayrollCompany.id),
+        dict(
+            code=code, name=f"Company {index}", owner_id=owner_id, created_by=CREATED_BY
+        ),
+    )
+    reference = dict(company_id=company_id, created_by=CREATED_BY)
+
+    department_ids = insert_returning_ids(
+        conn,
+        PayrollDepartment,
+        [
+            dict(code=f"{code}-D{i}", name=f"Department {i}", **reference)
+            for i in range(DEPARTMENTS)
+        ],
+    )
+    position_ids = insert_returning_ids(
+        conn,
+        PayrollPosition,
+        [
+            dict(code=f"{code}-P{i}", name=f"Position {i}", **reference)
+            for i in range(POSITIONS)
+        ],
+    )
+    shift_id = conn.scalar(
+        insert(PayrollShift).returning(PayrollShift.id),
+        dict(code=f"{code}-S", name="Day shift", standard_work_hours=8, **reference),
+    )
+    schedule_ids = insert_returning_ids(
+        conn,
+        PayrollSchedule,
+        [
+            dict(code=f"{code}-{name}", name=name, shift_per_day=1, **reference)
+            for name in SCHEDULE_WEEKDAYS
+        ],
+    )
+    insert_batches(
+        conn,
+        PayrollScheduleDetail,
+        [
+            dict(
+                schedule_id=schedule_id,
+                shift_id=shift_id,
+                day=WEEKDAY_NAMES[weekday],
+                created_by=CREATED_BY,
+            )
+            for schedule_id, weekdays in zip(schedule_ids, SCHEDULE_WEEKDAYS.values())
+            for weekday in weekdays
+        ],
+    )
+    insurance_id = conn.scalar(
+        insert(InsurancePolicy).returning(InsurancePolicy.id),
+        dict(
+            code=f"{code}-I",
+            name="Social insurance",
+            company_percentage=21.5,
+            employee_percentage=10.5,
+            **reference,
+        ),
+    )
+
+    employees = []
+    for i in range(spec.employees):
+        salary = rng.randrange(6_000_000, 60_000_000, 500_000)
+        employees.append(
+            dict(
+                code=f"{code}-E{i:05d}",
+                name=f"Employee {index}-{i}",
+                date_of_birth=date(rng.randint(1965, 2003), rng.randint(1, 12), 1),
+                gender=rng.choice(list(Gender)),
+                department_id=rng.choice(department_ids),
+                position_id=rng.choice(position_ids),
+                mst=f"{index:02d}{i:08d}",
+                cccd=f"{index:03d}{i:09d}",
+                cccd_date=date(2015, 1, 1),
+                cccd_place="Ha Noi",
+                is_probation=False,
+                start_date=date(spec.year - 1, rng.randint(1, 12), 1),
+                is_offboard=False,
+                salary=salary,
+                meal_benefit=730_000,
+                transportation_benefit=rng.choice((0, 300_000, 500_000)),
+                housing_benefit=rng.choice((0, 1_000_000)),
+                toxic_benefit=0,
+                phone_benefit=200_000,
+                attendant_benefit=300_000,
+                # a few employees have no schedule, as in real tenants
+                schedule_id=rng.choice(schedule_ids) if rng.random() < 0.97 else None,
+                **reference,
+            )
+        )
+    employee_ids = insert_returning_ids(conn, PayrollEmployee, employees)
+
+    contracts, dependants = [], []
+    for employee_id, employee in zip(employee_ids, employees):
+        contract = dict(
+            employee_id=employee_id,
+            department_id=employee["department_id"],
+            position_id=employee["position_id"],
+            is_probation=False,
+            start_date=employee["start_date"],
+            salary=employee["salary"],
+            meal_benefit=employee["meal_benefit"],
+            transportation_benefit=employee["transportation_benefit"],
+            housing_benefit=employee["housing_benefit"],
+            toxic_benefit=0,
+            phone_benefit=employee["phone_benefit"],
+            attendant_benefit=employee["attendant_benefit"],
+            contract_type=ContractHistoryType.CONTRACT,
+            schedule_id=employee["schedule_id"],
+            **reference,
+        )
+        contracts.append(contract)
+        if rng.random() < spec.addendum_ratio:
+            contracts.append(
+                dict(
+                    contract,
+                    start_date=date(spec.year, rng.randint(2, 11), 1),
+                    salary=employee["salary"] * 1.1,
+                    contract_type=ContractHistoryType.ADDENDUM,
+                )
+            )
+        if rng.random() < spec.dependant_ratio:
+            dependants.append(
+                dict(
+                    code=f"{employee['code']}-DP",
+                    name=f"Dependant of {employee['code']}",
+                    employee_id=employee_id,
+                    date_of_birth=date(rng.randint(2005, 2022), 6, 1),
+                    mst=f"D{employee['mst']}",
+                    id_doc_type=IDDocType.GIAYKHAISINH,
+                    doc_number=f"GKS{employee['cccd']}",
+                    relationship=DependantRelationship.CHILD,
+                    deduction_from=date(spec.year - 1, 1, 1),
+                    deduction_to=date(spec.year + 5, 12, 31),
+                    **reference,
+                )
+            )
+    insert_batches(conn, PayrollContractHistory, contracts)
+    insert_batches(conn, PayrollDependant, dependants)
+
+    calendars = {
+        schedule_id: working_days(spec.year, weekdays)
+        for schedule_id, weekdays in zip(schedule_ids, SCHEDULE_WEEKDAYS.values())
+    }
+    days_off = {
+        schedule_id: working_days(spec.year, set(range(7)) - set(weekdays))
+        for schedule_id, weekdays in zip(schedule_ids, SCHEDULE_WEEKDAYS.values())
+    }
+    attendances = overtimes = 0
+    for employee_id, employee in zip(employee_ids, employees):
+        schedule_id = employee["schedule_id"]
+        if schedule_id is None:
+            continue
+        rows = [
+            dict(
+                employee_id=employee_id,
+                day_attendance=day,
+                work_hours=8 if rng.random() < 0.9 else rng.choice((4, 6, 7)),
+                is_holiday=False,
+                **reference,
+            )
+            for day in calendars[schedule_id]
+            if rng.random() < 0.97
+        ]
+        insert_batches(conn, PayrollAttendance, rows)
+        attendances += len(rows)
+        rows = [
+            dict(
+                employee_id=employee_id,
+                day_overtime=day,
+                overtime_hours=rng.choice((2, 4, 8)),
+                **reference,
+            )
+            for day in days_off[schedule_id]
+            if rng.random() < spec.overtime_ratio
+        ]
+        insert_batches(conn, PayrollOvertime, rows)
+        overtimes += len(rows)
+
+    return {
+        "company_id": company_id,
+        "insurance_id": insurance_id,
+        "employees": len(employee_ids),
+        "contracts": len(contracts),
+        "dependants": len(dependants),
+        "attendances": attendances,
+        "overtimes": overtimes,
+    }
+
+
+def generate_dataset(engine, spec: DatasetSpec) -> list[dict]:
+    """Creates the schema if needed and inserts `spec.companies` companies.
+
+    Companies that already exist (by code) are left alone, so seeding twice
+    with the same spec is a no-op.
+    """
+    Base.metadata.create_all(engine)
+    owner_id = create_owner(engine)
+    summary = []
+    for index in range(spec.companies):
+        with engine.begin() as conn:
+            if conn.scalar(
+                select(PayrollCompany.id).where(
+                    PayrollCompany.code == company_code(index)
+                )
+            ):
+                continue
+            summary.append(generate_company(conn, spec, index, owner_id))
+    return summary
+
+
+def dataset_companies(engine) -> list[dict]:
+    """Returns the generated companies with the ids the scenarios need."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(PayrollCompany.id, PayrollCompany.code, InsurancePolicy.id)
+            .join(InsurancePolicy, InsurancePolicy.company_id == PayrollCompany.id)
+            .where(PayrollCompany.created_by == CREATED_BY)
+            .order_by(PayrollCompany.id)
+        ).all()
+    return [
+        {"company_id": company_id, "code": code, "insurance_id": insurance_id}
+        for company_id, code, insurance_id in rows
+    ]
@@ -0,0 +1,33 @@
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def bind_database(url: str | None = None):
+    """Points the app at the benchmark database and returns its engine.
+
+    Must run before `app.main` is imported: modules that import the engines
+    by name keep whatever they saw at import time. Without a URL the engines
+    configured from the settings are kept. SQLite files are served to the
+    async endpoints through aiosqlite.
+    """
+    import app.db.core as core
+
+    if url is None:
+        return core.engine
+
+    sync_url = make_url(url)
+    if sync_url.get_backend_name() == "sqlite":
+        engine = create_engine(sync_url)
+        async_engine = create_async_engine(sync_url.set(drivername="sqlite+aiosqlite"))
+    else:
+        engine = create_engine(sync_url, **core.POOL_OPTIONS)
+        async_engine = create_async_engine(sync_url, **core.POOL_OPTIONS)
+
+    core.engine = engine
+    core.async_engine = async_engine
+    core.replica_engine = None
+    core.async_replica_engine = None
+    core.SessionLocal.configure(bind=engine, replica=None)
+    core.AsyncSessionLocal.configure(bind=async_engine, replica=None)
+    return engine
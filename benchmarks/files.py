@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+from io import BytesIO
+
+import pandas as pd
+
+from app.api.routes.employees.constant import IMPORT_EMPLOYEES_EXCEL_MAP
+
+# Layout expected by POST /attendances/import-excel: three title rows, then
+# the employee code column followed by one column per day.
+ATTENDANCE_TITLE_ROWS = 3
+EMPLOYEE_CODE_COLUMN = "Mã nhân viên"
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def to_xlsx(df: pd.DataFrame, startrow: int = 0) -> bytes:
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False, startrow=startrow)
+    return buffer.getvalue()
+
+
+def attendance_workbook(employee_codes: list[str], month: int, year: int) -> bytes:
+    """Returns a monthly attendance sheet with 8 hours on every weekday."""
+    day = date(year, month, 1)
+    columns = {}
+    while day.month == month:
+        if day.weekday() < 5:
+            columns[day.strftime("%d/%m/%Y")] = [8.0] * len(employee_codes)
+        day += timedelta(days=1)
+    df = pd.DataFrame({EMPLOYEE_CODE_COLUMN: employee_codes, **columns})
+    return to_xlsx(df, startrow=ATTENDANCE_TITLE_ROWS)
+
+
+def employee_workbook(company_code: str, count: int) -> bytes:
+    """Returns an employee import sheet with `count` new employees."""
+    rows = []
+    for i in range(count):
+        rows.append(
+            {
+                "code": f"{company_code}-X{i:05d}",
+                "name": f"Imported {i}",
+                "gender": "male" if i % 2 else "female",
+                "department_code": f"{company_code}-D0",
+                "position_code": f"{company_code}-P0",
+                "mst": f"X{i:09d}",
+                "date_of_birth": "1990-01-01",
+                "cccd": f"X{i:011d}",
+                "cccd_date": "2015-01-01",
+                "cccd_place": "Ha Noi",
+                "permanent_addr": "Ha Noi",
+                "start_date": "2024-01-01",
+                "end_date": None,
+                "is_probation": "False",
+                "salary": 15_000_000,
+                "housing_benefit": 0,
+                "attendant_benefit": 300_000,
+                "transportation_benefit": 500_000,
+                "meal_benefit": 730_000,
+                "toxic_benefit": 0,
+                "phone_benefit": 200_000,
+            }
+        )
+    df = pd.DataFrame(rows).rename(columns=IMPORT_EMPLOYEES_EXCEL_MAP)
+    return to_xlsx(df)
@@ -0,0 +1,265 @@
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable
+
+from app.core.config import settings
+from benchmarks.files import XLSX_CONTENT_TYPE, attendance_workbook
+
+# Traffic mixes: operation name -> relative weight.
+MIXES = {
+    # dashboards polling the metrics while clerks page through the month
+    "office_hours": {
+        "payroll_metrics": 30,
+        "list_attendances_by_month": 30,
+        "list_employees": 20,
+        "list_payroll_managements": 15,
+        "list_overtimes_by_month": 5,
+    },
+    # month end: the same reads plus bulk payroll runs and Excel uploads
+    "month_end": {
+        "payroll_metrics": 25,
+        "list_attendances_by_month": 20,
+        "list_employees": 10,
+        "list_payroll_managements": 20,
+        "bulk_payroll": 5,
+        "import_attendances_excel": 2,
+    },
+    # time clocks posting single attendances at shift change, compare with
+    # and without WRITE_BEHIND_ENABLED
+    "shift_change": {
+        "clock_attendance": 90,
+        "list_attendances_by_month": 10,
+    },
+}
+# employees per generated bulk payroll request and attendance upload
+LOAD_BATCH_EMPLOYEES = 20
+# how often pool and threadpool usage are sampled in-process
+SAMPLE_INTERVAL = 0.05
+
+
+@dataclass
+class LoadContext:
+    company: dict
+    month: int
+    year: int
+    employee_ids: list[int]
+    employee_codes: list[str]
+    files: dict = field(default_factory=dict)
+
+    @property
+    def period(self) -> dict:
+        return {
+            "company_id": self.company["company_id"],
+            "month": self.month,
+            "year": self.year,
+        }
+
+
+def bulk_payroll(ctx: LoadContext, rng: random.Random) -> dict:
+    # random months and employees, so that runs do not only hit existing rows
+    return dict(
+        method="POST",
+        path="/payroll_managements/bulk",
+        json={
+            "apply_all": False,
+            "list_emp": rng.sample(
+                ctx.employee_ids, min(LOAD_BATCH_EMPLOYEES, len(ctx.employee_ids))
+            ),
+            "month": rng.randint(1, 12),
+            "year": ctx.year,
+            "work_days_standard": 22,
+            "company_id": ctx.company["company_id"],
+            "apply_insurance": True,
+            "insurance_id": ctx.company["insurance_id"],
+        },
+    )
+
+
+def clock_attendance(ctx: LoadContext, rng: random.Random) -> dict:
+    # a random day of the year, so that most posts create a row
+    day = date(ctx.year, 1, 1) + timedelta(days=rng.randrange(365))
+    return dict(
+        method="POST",
+        path="/attendances",
+        json={
+            "employee_id": rng.choice(ctx.employee_ids),
+            "company_id": ctx.company["company_id"],
+            "day_attendance": day.isoformat(),
+            "work_hours": 8,
+            "is_holiday": False,
+        },
+    )
+
+
+def import_attendances_excel(ctx: LoadContext, rng: random.Random) -> dict:
+    if "attendances" not in ctx.files:
+        ctx.files["attendances"] = attendance_workbook(
+            ctx.employee_codes[:LOAD_BATCH_EMPLOYEES], 1, ctx.year + 1
+        )
+    return dict(
+        method="POST",
+        path="/attendances/import-excel",
+        files={
+            "file": ("attendances.xlsx", ctx.files["attendances"], XLSX_CONTENT_TYPE)
+        },
+        data={"company_id": ctx.company["company_id"]},
+    )
+
+
+OPERATIONS: dict[str, Callable[[LoadContext, random.Random], dict]] = {
+    "payroll_metrics": lambda ctx, rng: dict(
+        method="GET", path="/payroll_managements/metrics", params=ctx.period
+    ),
+    "list_payroll_managements": lambda ctx, rng: dict(
+        method="GET", path="/payroll_managements", params=ctx.period
+    ),
+    "list_attendances_by_month": lambda ctx, rng: dict(
+        method="GET",
+        path="/attendances/period",
+        params=dict(ctx.period, month=rng.randint(1, 12)),
+    ),
+    "list_overtimes_by_month": lambda ctx, rng: dict(
+        method="GET",
+        path="/overtimes/period",
+        params=dict(ctx.period, month=rng.randint(1, 12)),
+    ),
+    "list_employees": lambda ctx, rng: dict(
+        method="GET",
+        path="/employees",
+        params={"company_id": ctx.company["company_id"]},
+    ),
+    "bulk_payroll": bulk_payroll,
+    "clock_attendance": clock_attendance,
+    "import_attendances_excel": import_attendances_excel,
+}
+
+
+class LoadStats:
+    """Latencies and errors per operation, plus resource usage samples."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+        self.peaks = defaultdict(int)
+
+    def record(self, name: str, duration: float, status: int | None, detail=""):
+        self.latencies[name].append(duration)
+        if status is None or status >= 400:
+            self.errors[name] += 1
+            self.error_samples.setdefault(name, f"{status} {detail}"[:200])
+
+    def sample(self, **values):
+        for key, value in values.items():
+            if value is not None:
+                self.peaks[key] = max(self.peaks[key], value)
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        for name, latencies in sorted(self.latencies.items()):
+            routes[name] = {
+                "requests": len(latencies),
+                "throughput": len(latencies) / elapsed,
+                "error_rate": self.errors[name] / len(latencies),
+                **percentiles(latencies),
+            }
+            if name in self.error_samples:
+                routes[name]["error_sample"] = self.error_samples[name]
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        every = [duration for values in self.latencies.values() for duration in values]
+        return {
+            "elapsed": elapsed,
+            "requests": total,
+            "throughput": total / elapsed,
+            "error_rate": sum(self.errors.values()) / total if total else 0.0,
+            **percentiles(every),
+            "peaks": dict(self.peaks),
+            "routes": routes,
+        }
+
+
+def percentiles(latencies: list[float]) -> dict:
+    if len(latencies) < 2:
+        value = latencies[0] if latencies else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+async def virtual_user(client, ctx, mix, rng, deadline, stats, think_time):
+    names, weights = zip(*mix.items())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        request = OPERATIONS[name](ctx, rng)
+        method, path = request.pop("method"), request.pop("path")
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                method, settings.API_VERSION_PREFIX + path, **request
+            )
+            status, detail = response.status_code, response.text[:200]
+        except Exception as e:
+            status, detail = None, repr(e)
+        stats.record(name, time.perf_counter() - started, status, detail)
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+
+async def sample_resources(stats: LoadStats, stop: asyncio.Event):
+    """Records peak pool and threadpool usage of the in-process app."""
+    from anyio.to_thread import current_default_thread_limiter
+
+    import app.db.core as core
+
+    limiter = current_default_thread_limiter()
+    while not stop.is_set():
+        stats.sample(
+            threadpool_size=limiter.total_tokens,
+            threadpool_busy=limiter.borrowed_tokens,
+            threadpool_waiting=limiter.statistics().tasks_waiting,
+            pool_checked_out=core.get_pool_status()["checked_out"],
+            async_pool_checked_out=core.get_pool_status(core.async_engine.pool)[
+                "checked_out"
+            ],
+        )
+        try:
+            await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(
+    client,
+    ctx: LoadContext,
+    *,
+    mix: dict,
+    concurrency: int,
+    duration: float,
+    seed: int,
+    think_time: float = 0.0,
+    in_process: bool = False,
+) -> dict:
+    """Runs `concurrency` virtual users for `duration` seconds."""
+    stats = LoadStats()
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_resources(stats, stop)) if in_process else None
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            virtual_user(
+                client, ctx, mix, random.Random(seed + i), deadline, stats, think_time
+            )
+            for i in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    if sampler is not None:
+        await sampler
+    return {"concurrency": concurrency, **stats.summary(elapsed)}
@@ -0,0 +1,88 @@
+import re
+from types import SimpleNamespace
+from typing import Callable
+
+# Microbenchmarks of the pure payroll helpers, independent of the database.
+# Each factory prepares its inputs once and returns the callable to time.
+MICROBENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {}
+
+# one income per tax bracket, from 5% to 35%
+INCOMES = (4e6, 8e6, 15e6, 25e6, 40e6, 60e6, 100e6)
+PLACEHOLDER = re.compile(r"\{\{ (\w+) \}\}")
+
+
+def microbenchmark(name: str):
+    def register(factory):
+        MICROBENCHMARKS[name] = factory
+        return factory
+
+    return register
+
+
+def schedule_details(*days) -> dict:
+    return {"data": [SimpleNamespace(day=day, shift_id=1) for day in days]}
+
+
+@microbenchmark("tax_handler")
+def bench_tax_handler():
+    from app.api.routes.payroll_managements.services import tax_handler
+
+    return lambda: [tax_handler(income) for income in INCOMES]
+
+
+@microbenchmark("benefit_salary_handler")
+def bench_benefit_salary_handler():
+    from app.api.routes.payroll_managements.services import benefit_salary_handler
+
+    return lambda: benefit_salary_handler(
+        benefit_value=730_000,
+        work_days_standard=22,
+        work_hours_standard=8,
+        work_hours_real=168,
+    )
+
+
+@microbenchmark("work_days_actual_handler")
+def bench_work_days_actual_handler():
+    from app.api.routes.payroll_managements.services import work_days_actual_handler
+    from app.utils.models import Day
+
+    details = schedule_details(Day.Mon, Day.Tue, Day.Wed, Day.Thu, Day.Fri, Day.Sat)
+    return lambda: work_days_actual_handler(
+        schedule_details=details, month=4, year=2024
+    )
+
+
+@microbenchmark("get_month_boundaries")
+def bench_get_month_boundaries():
+    from app.api.routes.payroll_managements.services import get_month_boundaries
+
+    return lambda: get_month_boundaries(month=12, year=2024)
+
+
+@microbenchmark("format_with_dot")
+def bench_format_with_dot():
+    from app.utils.functions import format_with_dot
+
+    return lambda: format_with_dot(25_750_000.5)
+
+
+@microbenchmark("fill_template")
+def bench_fill_template():
+    from docx import Document
+
+    from app.api.routes.contract_histories.services import TEMPLATE_DIR
+    from app.utils.functions import fill_template
+
+    template_path = TEMPLATE_DIR / "contract.docx"
+    document = Document(template_path)
+    paragraphs = list(document.paragraphs) + [
+        paragraph
+        for table in document.tables
+        for row in table.rows
+        for cell in row.cells
+        for paragraph in cell.paragraphs
+    ]
+    text = "\n".join(paragraph.text for paragraph in paragraphs)
+    data = {key: f"value of {key}" for key in PLACEHOLDER.findall(text)}
+    return lambda: fill_template(template_path=template_path, data=data)
@@ -0,0 +1,389 @@
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from types import SimpleNamespace
+from typing import Callable
+
+from sqlalchemy import event, select
+
+from app.db.models import (
+    PayrollContractHistory,
+    PayrollEmployee,
+    PayrollScheduleDetail,
+)
+
+# Query plan audit: runs the tenant-scoped repository functions against the
+# benchmark database, records the statements they execute and EXPLAINs each
+# of them. A plan that reads a whole large table means a filter of the
+# repositories has no index behind it.
+LARGE_TABLES = {
+    "employees",
+    "attendances",
+    "overtimes",
+    "dependants",
+    "contract_histories",
+    "payroll_managements",
+}
+# "Seq Scan on attendances" (PostgreSQL), "SCAN attendances" (SQLite, also
+# for a full pass over an index, which reads every row just the same)
+FULL_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (\w+)"),
+}
+# partitions of attendances and overtimes, e.g. attendances_2024_04
+PARTITION_SUFFIX = re.compile(r"_(\d{4}_\d{2}|default)$")
+PLAN_CASES: dict[str, Callable[[object, SimpleNamespace], object]] = {}
+
+
+def plan_case(name: str):
+    def register(fn):
+        PLAN_CASES[name] = fn
+        return fn
+
+    return register
+
+
+@dataclass
+class PlanResult:
+    name: str
+    statement: str
+    plan: str
+    full_scans: list[str]
+
+
+def sample_ids(db_session, company_id: int, month: int, year: int):
+    """Picks an employee of the company and the rows hanging off it."""
+    row = db_session.execute(
+        select(PayrollContractHistory, PayrollEmployee)
+        .join(PayrollEmployee, PayrollContractHistory.employee_id == PayrollEmployee.id)
+        .where(PayrollContractHistory.company_id == company_id)
+        .order_by(PayrollContractHistory.id)
+        .limit(1)
+    ).first()
+    if row is None:
+        return None
+    contract_history, employee = row
+    shift_id = db_session.execute(
+        select(PayrollScheduleDetail.shift_id)
+        .where(PayrollScheduleDetail.schedule_id == contract_history.schedule_id)
+        .limit(1)
+    ).scalar()
+    return SimpleNamespace(
+        company_id=company_id,
+        month=month,
+        year=year,
+        day=date(year, month, 1),
+        employee=employee,
+        contract_history_id=contract_history.id,
+        schedule_id=contract_history.schedule_id,
+        shift_id=shift_id,
+    )
+
+
+@contextmanager
+def capture_statements(engine):
+    """Collects the (statement, parameters) executed on `engine`."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def full_scans(plan: str, dialect: str) -> list[str]:
+    pattern = FULL_SCAN.get(dialect)
+    if pattern is None:
+        return []
+    tables = {PARTITION_SUFFIX.sub("", table) for table in pattern.findall(plan)}
+    return sorted(tables & LARGE_TABLES)
+
+
+def audit_plans(engine, ids: SimpleNamespace, names=None) -> list[PlanResult]:
+    """Returns the plan of every statement of the cases in `names`."""
+    from app.db.core import SessionLocal
+    from app.db.slow_queries import explain_on
+
+    results = []
+    for name in names or PLAN_CASES:
+        with capture_statements(engine) as statements, SessionLocal() as db_session:
+            PLAN_CASES[name](db_session, ids)
+            db_session.rollback()
+        with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                # on small tables a sequential scan is the cheaper plan even
+                # with an index; this way one is only chosen without index
+                conn.exec_driver_sql("SET enable_seqscan = off")
+            for statement, parameters in statements:
+                plan = explain_on(conn, statement, parameters)
+                results.append(
+                    PlanResult(
+                        name,
+                        statement,
+                        plan,
+                        full_scans(plan, engine.dialect.name),
+                    )
+                )
+            conn.rollback()
+    return results
+
+
+@plan_case("employees.by_id_schedule")
+def employee_schedule(db_session, ids):
+    from app.api.routes.employees.repositories import retrieve_schedule_by_employee_id
+
+    retrieve_schedule_by_employee_id(db_session=db_session, employee_id=ids.employee.id)
+
+
+@plan_case("employees.by_code")
+def employee_by_code(db_session, ids):
+    from app.api.routes.employees.repositories import retrieve_employee_by_code
+
+    retrieve_employee_by_code(
+        db_session=db_session,
+        employee_code=ids.employee.code,
+        company_id=ids.company_id,
+    )
+
+
+@plan_case("employees.by_cccd_mst")
+def employee_by_cccd_mst(db_session, ids):
+    from app.api.routes.employees.repositories import (
+        retrieve_employee_by_cccd,
+        retrieve_employee_by_mst,
+    )
+
+    retrieve_employee_by_cccd(
+        db_session=db_session,
+        employee_cccd=ids.employee.cccd,
+        exclude_employee_id=ids.employee.id,
+        company_id=ids.company_id,
+    )
+    retrieve_employee_by_mst(
+        db_session=db_session,
+        employee_mst=ids.employee.mst,
+        exclude_employee_id=ids.employee.id,
+        company_id=ids.company_id,
+    )
+
+
+@plan_case("employees.by_department_position")
+def employee_by_department_position(db_session, ids):
+    from app.api.routes.employees.repositories import (
+        retrieve_employee_by_department,
+        retrieve_employee_by_position,
+    )
+
+    retrieve_employee_by_department(
+        db_session=db_session, department_id=ids.employee.department_id
+    )
+    retrieve_employee_by_position(
+        db_session=db_session, position_id=ids.employee.position_id
+    )
+
+
+@plan_case("employees.list")
+def employee_list(db_session, ids):
+    from app.api.routes.employees.read_repositories import read_all_employees
+    from app.api.routes.employees.repositories import (
+        retrieve_active_employees_benefits,
+        retrieve_all_employees,
+    )
+
+    retrieve_all_employees(db_session=db_session, company_id=ids.company_id)
+    retrieve_active_employees_benefits(db_session=db_session, company_id=ids.company_id)
+    read_all_employees(db_session=db_session, company_id=ids.company_id)
+
+
+@plan_case("attendances.by_employee")
+def attendances_by_employee(db_session, ids):
+    from app.api.routes.attendances.repositories import (
+        retrieve_attendance_by_employee_and_day,
+        retrieve_employee_attendances,
+        retrieve_employee_attendances_by_month,
+    )
+
+    retrieve_attendance_by_employee_and_day(
+        db_session=db_session, day_attendance=ids.day, employee_id=ids.employee.id
+    )
+    retrieve_employee_attendances(db_session=db_session, employee_id=ids.employee.id)
+    retrieve_employee_attendances_by_month(
+        db_session=db_session,
+        employee_id=ids.employee.id,
+        month=ids.month,
+        year=ids.year,
+    )
+
+
+@plan_case("attendances.by_company")
+def attendances_by_company(db_session, ids):
+    from app.api.routes.attendances.read_repositories import (
+        read_all_attendances,
+        read_attendances_by_month,
+    )
+    from app.api.routes.attendances.repositories import (
+        retrieve_all_attendances,
+        retrieve_multi_attendances_by_month,
+    )
+
+    retrieve_all_attendances(db_session=db_session, company_id=ids.company_id)
+    retrieve_multi_attendances_by_month(
+        db_session=db_session, company_id=ids.company_id, month=ids.month, year=ids.year
+    )
+    read_all_attendances(db_session=db_session, company_id=ids.company_id)
+    read_attendances_by_month(
+        db_session=db_session, company_id=ids.company_id, month=ids.month, year=ids.year
+    )
+
+
+@plan_case("overtimes.by_employee")
+def overtimes_by_employee(db_session, ids):
+    from app.api.routes.overtimes.repositories import (
+        retrieve_employee_overtime_by_month,
+        retrieve_employee_overtimes,
+        retrieve_overtime_by_employee_and_day,
+    )
+
+    retrieve_overtime_by_employee_and_day(
+        db_session=db_session, day_overtime=ids.day, employee_id=ids.employee.id
+    )
+    retrieve_employee_overtimes(db_session=db_session, employee_id=ids.employee.id)
+    retrieve_employee_overtime_by_month(
+        db_session=db_session,
+        employee_id=ids.employee.id,
+        month=ids.month,
+        year=ids.year,
+    )
+
+
+@plan_case("overtimes.by_company")
+def overtimes_by_company(db_session, ids):
+    from app.api.routes.overtimes.read_repositories import read_overtimes_by_month
+    from app.api.routes.overtimes.repositories import (
+        retrieve_employee_overtimes_by_month,
+    )
+
+    retrieve_employee_overtimes_by_month(
+        db_session=db_session, month=ids.month, year=ids.year, company_id=ids.company_id
+    )
+    read_overtimes_by_month(
+        db_session=db_session, company_id=ids.company_id, month=ids.month, year=ids.year
+    )
+
+
+@plan_case("dependants")
+def dependants(db_session, ids):
+    from app.api.routes.dependants.repositories import (
+        retrieve_all_dependants,
+        retrieve_all_dependants_by_employee_id,
+    )
+
+    retrieve_all_dependants_by_employee_id(
+        db_session=db_session, employee_id=ids.employee.id
+    )
+    retrieve_all_dependants(db_session=db_session, company_id=ids.company_id)
+
+
+@plan_case("contract_histories")
+def contract_histories(db_session, ids):
+    from app.api.routes.contract_histories.repositories import (
+        retrieve_all_contract_histories,
+        retrieve_contract_histories_by_employee,
+        retrieve_contract_history_addendum_by_employee_and_period,
+        retrieve_contract_history_addendums_by_employee_and_period,
+        retrieve_contract_history_by_employee_and_period,
+    )
+
+    retrieve_contract_histories_by_employee(
+        db_session=db_session, employee_id=ids.employee.id
+    )
+    for retrieve in (
+        retrieve_contract_history_by_employee_and_period,
+        retrieve_contract_history_addendum_by_employee_and_period,
+        retrieve_contract_history_addendums_by_employee_and_period,
+    ):
+        retrieve(
+            db_session=db_session,
+            employee_id=ids.employee.id,
+            from_date=ids.day,
+            to_date=ids.day,
+        )
+    retrieve_all_contract_histories(db_session=db_session, company_id=ids.company_id)
+
+
+@plan_case("payroll_managements.by_employee")
+def payroll_managements_by_employee(db_session, ids):
+    from app.api.routes.payroll_managements.repositories import (
+        retrieve_payroll_management_by_information,
+    )
+
+    retrieve_payroll_management_by_information(
+        db_session=db_session,
+        employee_id=ids.employee.id,
+        contract_history_id=ids.contract_history_id,
+        month=ids.month,
+        year=ids.year,
+    )
+
+
+@plan_case("payroll_managements.by_period")
+def payroll_managements_by_period(db_session, ids):
+    from app.api.routes.payroll_managements.read_repositories import (
+        read_all_payroll_managements,
+        read_payroll_metrics,
+    )
+    from app.api.routes.payroll_managements.repositories import (
+        retrieve_all_payroll_managements,
+        retrieve_number_of_payroll,
+        retrieve_total_benefit_salary_by_period,
+        retrieve_total_gross_income_by_period,
+        retrieve_total_overtime_salary_by_period,
+        retrieve_total_tax_by_period,
+    )
+
+    period = {"company_id": ids.company_id, "month": ids.month, "year": ids.year}
+    for retrieve in (
+        retrieve_number_of_payroll,
+        retrieve_all_payroll_managements,
+        retrieve_total_gross_income_by_period,
+        retrieve_total_tax_by_period,
+        retrieve_total_overtime_salary_by_period,
+        retrieve_total_benefit_salary_by_period,
+        read_all_payroll_managements,
+        read_payroll_metrics,
+    ):
+        retrieve(db_session=db_session, **period)
+
+
+@plan_case("payroll_managements.export")
+def payroll_managements_export(db_session, ids):
+    from app.api.routes.payroll_managements.read_repositories import (
+        read_payroll_management_batches,
+    )
+
+    for _ in read_payroll_management_batches(
+        db_session=db_session,
+        company_id=ids.company_id,
+        start=(ids.year, 1),
+        end=(ids.year, ids.month),
+    ):
+        pass
+
+
+@plan_case("schedule_details")
+def schedule_details(db_session, ids):
+    from app.api.routes.schedule_details.repositories import (
+        retrieve_schedule_detail_by_shift,
+        retrieve_schedule_details_by_schedule_id,
+    )
+
+    retrieve_schedule_details_by_schedule_id(
+        db_session=db_session, schedule_id=ids.schedule_id
+    )
+    retrieve_schedule_detail_by_shift(db_session=db_session, shift_id=ids.shift_id)
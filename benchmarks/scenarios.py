@@ -0,0 +1,265 @@
+import calendar
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable
+
+from sqlalchemy import and_, delete, select
+
+from app.core.config import settings
+from app.db.models import (
+    PayrollAttendance,
+    PayrollContractHistory,
+    PayrollEmployee,
+    PayrollPayrollManagement,
+)
+from benchmarks.files import XLSX_CONTENT_TYPE, attendance_workbook, employee_workbook
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+# employees in the Excel imports and contracts in the DOCX export
+IMPORT_EMPLOYEES = 200
+EXPORT_CONTRACTS = 20
+# month and year written by the attendance import, outside the generated year
+IMPORT_MONTH = 1
+
+
+class ScenarioError(Exception):
+    pass
+
+
+@dataclass
+class Context:
+    client: object
+    headers: dict
+    engine: object
+    company: dict
+    month: int
+    year: int
+    files: dict = field(default_factory=dict)
+
+    @property
+    def company_id(self) -> int:
+        return self.company["company_id"]
+
+    @property
+    def period(self) -> dict:
+        return {"company_id": self.company_id, "month": self.month, "year": self.year}
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    run: Callable[[Context], dict]
+    setup: Callable[[Context], None] | None = None
+
+
+SCENARIOS: dict[str, Scenario] = {}
+
+
+def scenario(name: str, *, setup: Callable[[Context], None] | None = None):
+    def register(fn):
+        SCENARIOS[name] = Scenario(name, (fn.__doc__ or "").strip(), fn, setup)
+        return fn
+
+    return register
+
+
+def call(ctx: Context, method: str, path: str, **kwargs) -> dict:
+    """Calls the API and returns what the results record about the response."""
+    response = ctx.client.request(
+        method, settings.API_VERSION_PREFIX + path, headers=ctx.headers, **kwargs
+    )
+    if response.status_code >= 400:
+        raise ScenarioError(f"{response.status_code} {response.text[:300]}")
+    queries = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+    return {
+        "status": response.status_code,
+        "bytes": len(response.content),
+        "queries": int(queries.group(1)) if queries else None,
+    }
+
+
+def build_context(engine, company: dict, month: int, year: int) -> Context:
+    """Starts the app in-process and logs in as the superuser."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    response = client.post(
+        f"{settings.API_VERSION_PREFIX}/auth/login",
+        json={"email": settings.SUPERUSER, "password": settings.SUPERUSER_PASSWORD},
+    )
+    if response.status_code != 200:
+        raise ScenarioError(f"login failed: {response.text[:300]}")
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return Context(client, headers, engine, company, month, year)
+
+
+def delete_payroll(ctx: Context):
+    with ctx.engine.begin() as conn:
+        conn.execute(
+            delete(PayrollPayrollManagement).where(
+                PayrollPayrollManagement.company_id == ctx.company_id,
+                PayrollPayrollManagement.month == ctx.month,
+                PayrollPayrollManagement.year == ctx.year,
+            )
+        )
+
+
+def bulk_payroll_request(ctx: Context) -> dict:
+    return call(
+        ctx,
+        "POST",
+        "/payroll_managements/bulk",
+        json={
+            "apply_all": True,
+            "list_emp": [],
+            "month": ctx.month,
+            "year": ctx.year,
+            "work_days_standard": 22,
+            "company_id": ctx.company_id,
+            "apply_insurance": True,
+            "insurance_id": ctx.company["insurance_id"],
+        },
+    )
+
+
+def ensure_payroll(ctx: Context):
+    """Computes the month's payroll once for the read scenarios."""
+    with ctx.engine.connect() as conn:
+        exists = conn.scalar(
+            select(PayrollPayrollManagement.id)
+            .where(
+                PayrollPayrollManagement.company_id == ctx.company_id,
+                PayrollPayrollManagement.month == ctx.month,
+                PayrollPayrollManagement.year == ctx.year,
+            )
+            .limit(1)
+        )
+    if not exists:
+        bulk_payroll_request(ctx)
+
+
+def company_employee_codes(ctx: Context, limit: int) -> list[str]:
+    with ctx.engine.connect() as conn:
+        return conn.scalars(
+            select(PayrollEmployee.code)
+            .where(
+                PayrollEmployee.company_id == ctx.company_id,
+                PayrollEmployee.schedule_id.is_not(None),
+            )
+            .order_by(PayrollEmployee.id)
+            .limit(limit)
+        ).all()
+
+
+def delete_imported_attendances(ctx: Context):
+    year = ctx.year + 1
+    last_day = calendar.monthrange(year, IMPORT_MONTH)[1]
+    with ctx.engine.begin() as conn:
+        conn.execute(
+            delete(PayrollAttendance).where(
+                and_(
+                    PayrollAttendance.employee_id.in_(
+                        select(PayrollEmployee.id).where(
+                            PayrollEmployee.company_id == ctx.company_id
+                        )
+                    ),
+                    PayrollAttendance.day_attendance.between(
+                        date(year, IMPORT_MONTH, 1), date(year, IMPORT_MONTH, last_day)
+                    ),
+                )
+            )
+        )
+
+
+@scenario("bulk_payroll", setup=delete_payroll)
+def bulk_payroll(ctx: Context):
+    """POST /payroll_managements/bulk for every employee of the company."""
+    return bulk_payroll_request(ctx)
+
+
+@scenario("payroll_metrics", setup=ensure_payroll)
+def payroll_metrics(ctx: Context):
+    """GET /payroll_managements/metrics for the month."""
+    return call(ctx, "GET", "/payroll_managements/metrics", params=ctx.period)
+
+
+@scenario("list_payroll_managements", setup=ensure_payroll)
+def list_payroll_managements(ctx: Context):
+    """GET /payroll_managements for the month."""
+    return call(ctx, "GET", "/payroll_managements", params=ctx.period)
+
+
+@scenario("list_employees")
+def list_employees(ctx: Context):
+    """GET /employees of the company."""
+    return call(ctx, "GET", "/employees", params={"company_id": ctx.company_id})
+
+
+@scenario("list_attendances_by_month")
+def list_attendances_by_month(ctx: Context):
+    """GET /attendances/period for the month."""
+    return call(ctx, "GET", "/attendances/period", params=ctx.period)
+
+
+@scenario("list_overtimes_by_month")
+def list_overtimes_by_month(ctx: Context):
+    """GET /overtimes/period for the month."""
+    return call(ctx, "GET", "/overtimes/period", params=ctx.period)
+
+
+@scenario("import_attendances_excel", setup=delete_imported_attendances)
+def import_attendances_excel(ctx: Context):
+    """POST /attendances/import-excel with a month for IMPORT_EMPLOYEES employees."""
+    if "attendances" not in ctx.files:
+        codes = company_employee_codes(ctx, IMPORT_EMPLOYEES)
+        ctx.files["attendances"] = attendance_workbook(
+            codes, IMPORT_MONTH, ctx.year + 1
+        )
+    return call(
+        ctx,
+        "POST",
+        "/attendances/import-excel",
+        files={
+            "file": ("attendances.xlsx", ctx.files["attendances"], XLSX_CONTENT_TYPE)
+        },
+        data={"company_id": ctx.company_id},
+    )
+
+
+@scenario("import_employees_excel")
+def import_employees_excel(ctx: Context):
+    """POST /employees/import-excel with IMPORT_EMPLOYEES employees."""
+    if "employees" not in ctx.files:
+        ctx.files["employees"] = employee_workbook(
+            ctx.company["code"], IMPORT_EMPLOYEES
+        )
+    return call(
+        ctx,
+        "POST",
+        "/employees/import-excel",
+        files={"file": ("employees.xlsx", ctx.files["employees"], XLSX_CONTENT_TYPE)},
+        data={"company_id": ctx.company_id, "update_on_exists": True},
+    )
+
+
+@scenario("export_contracts_docx")
+def export_contracts_docx(ctx: Context):
+    """GET /contract_histories/export/ zipping EXPORT_CONTRACTS contracts."""
+    if "contract_ids" not in ctx.files:
+        with ctx.engine.connect() as conn:
+            ctx.files["contract_ids"] = conn.scalars(
+                select(PayrollContractHistory.id)
+                .where(PayrollContractHistory.company_id == ctx.company_id)
+                .order_by(PayrollContractHistory.id)
+                .limit(EXPORT_CONTRACTS)
+            ).all()
+    return call(
+        ctx,
+        "GET",
+        "/contract_histories/export/",
+        params={"list_id": ctx.files["contract_ids"]},
+    )
@@ -0,0 +1,10 @@
+# the CLI shares these helpers, they live in the app so the image has them
+from app.core.importtime import (
+    ImportTime,
+    by_package,
+    measure_import,
+    parse_importtime,
+    total_us,
+)
+
+__all__ = ["ImportTime", "by_package", "measure_import", "parse_importtime", "total_us"]
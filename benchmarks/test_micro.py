@@ -0,0 +1,12 @@
+import pytest
+
+from benchmarks.micro import MICROBENCHMARKS
+
+pytestmark = pytest.mark.benchmark(group="micro")
+
+
+@pytest.mark.parametrize("name", MICROBENCHMARKS)
+def test_microbenchmark(benchmark, name):
+    """Times one call of a payroll helper, the loop count is calibrated by
+    pytest-benchmark."""
+    benchmark(MICROBENCHMARKS[name]())
@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks.plans import PLAN_CASES, audit_plans, sample_ids
+
+
+@pytest.fixture(scope="module")
+def ids(engine, company, period):
+    from app.db.core import SessionLocal
+
+    with SessionLocal() as db_session:
+        ids = sample_ids(db_session, company["company_id"], **period)
+    if ids is None:
+        pytest.fail("The company has no contracts, run `python -m benchmarks seed`.")
+    return ids
+
+
+@pytest.mark.parametrize("name", PLAN_CASES)
+def test_no_full_scan(engine, ids, name):
+    """No statement of a repository case reads a whole large table."""
+    results = audit_plans(engine, ids, [name])
+    assert results, "the case executed no statement"
+    for result in results:
+        assert not result.full_scans, f"{result.statement}\n{result.plan}"
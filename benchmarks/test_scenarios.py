@@ -0,0 +1,31 @@
+import pytest
+
+from benchmarks.scenarios import SCENARIOS, build_context
+
+pytestmark = pytest.mark.benchmark(group="api")
+
+
+@pytest.fixture(scope="module")
+def api_context(engine, company, period):
+    # the app must be imported after the engines are bound
+    return build_context(engine, company, period["month"], period["year"])
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_scenario(benchmark, pytestconfig, api_context, name):
+    """Times an API scenario, its setup runs untimed before every round."""
+    scenario = SCENARIOS[name]
+
+    def setup():
+        if scenario.setup is not None:
+            scenario.setup(api_context)
+        return (api_context,), {}
+
+    result = benchmark.pedantic(
+        scenario.run,
+        setup=setup,
+        rounds=pytestconfig.getoption("benchmark_min_rounds"),
+        warmup_rounds=1,
+    )
+    # the query count and response size of the last round
+    benchmark.extra_info.update(result, database=api_context.engine.dialect.name)
@@ -0,0 +1,21 @@
+from benchmarks.startup import by_package, measure_import, total_us
+
+MODULE = "app.main"
+RUNS = 3
+
+
+def test_import_time_within_budget(pytestconfig):
+    """A cold import of the API, the fastest of RUNS, stays under the budget."""
+    budget = pytestconfig.getoption("import_budget")
+    rows = min(
+        (measure_import(MODULE) for _ in range(RUNS)),
+        key=lambda rows: total_us(rows, MODULE),
+    )
+    total = total_us(rows, MODULE) / 1e6
+    slowest = ", ".join(
+        f"{package} {self_us / 1e3:.0f}ms"
+        for package, self_us, _ in by_package(rows)[:5]
+    )
+    assert (
+        total <= budget
+    ), f"import {MODULE} took {total:.3f}s, slowest packages: {slowest}"
@@ -8,7 +8,7 @@ log = logging.getLogger(__name__)
 @click.group()
 def payroll_cli():
     """Command-line interface to Payroll."""
-    from .app.core.log import configure_logging
+    from app.core.log import configure_logging
 
     configure_logging()
 
@@ -23,13 +23,221 @@ def payroll_database():
 def database_init():
     """Initializes a new database."""
     click.echo("Initializing new database...")
-    from .app.db.core import engine
-    from .app.db.manage import init_database
+    from app.db.core import engine
+    from app.db.manage import init_database
 
     init_database(engine)
     click.secho("Success.", fg="green")
 
 
+@payroll_database.command("partitions")
+@click.option(
+    "--months-ahead",
+    default=3,
+    show_default=True,
+    help="Months after the current one to create partitions for.",
+)
+@click.option(
+    "--brin-after",
+    default=2,
+    show_default=True,
+    help="Months after which a partition gets a BRIN index on the day.",
+)
+def database_partitions(months_ahead, brin_after):
+    """Creates the monthly attendance and overtime partitions ahead of time.
+
+    Run it at least once a month, e.g. from cron.
+    """
+    from app.db.core import engine
+    from app.db.partitions import maintain_partitions
+
+    report = maintain_partitions(
+        engine, months_ahead=months_ahead, brin_after_months=brin_after
+    )
+    for table, changes in report.items():
+        click.echo(
+            f"{table}: created {', '.join(changes['created']) or 'no partitions'}, "
+            f"{len(changes['indexed'])} BRIN indexes"
+        )
+    click.secho("Success.", fg="green")
+
+
+@payroll_database.command("detach-year")
+@click.argument("year", type=int)
+def database_detach_year(year):
+    """Detaches the attendance and overtime partitions of a closed year."""
+    from app.db.core import engine
+    from app.db.partitions import PARTITIONED_TABLES, detach_year
+
+    with engine.begin() as conn:
+        detached = [
+            name
+            for table in PARTITIONED_TABLES
+            for name in detach_year(conn, table, year)
+        ]
+    if not detached:
+        raise click.ClickException(f"No partitions of {year}.")
+    click.echo(
+        f"Detached {', '.join(detached)}. They are plain tables now: archive them "
+        "with `pg_dump -t <table>` and drop them."
+    )
+    click.secho("Success.", fg="green")
+
+
+@payroll_cli.group("archive")
+def payroll_archive():
+    """Container for the cold archive commands."""
+    pass
+
+
+@payroll_archive.command("run")
+@click.option("--year", type=int, required=True)
+@click.option("--month", type=click.IntRange(1, 12), help="Defaults to every month.")
+def archive_run(year, month):
+    """Moves closed periods of the payroll, attendances and overtimes to the
+    Parquet archive and deletes them from the database."""
+    from app.archive import archive_store
+    from app.archive.service import archive_period, is_closed
+    from app.db.core import engine
+
+    months = [m for m in ([month] if month else range(1, 13)) if is_closed(year, m)]
+    if not months:
+        raise click.ClickException("Nothing to archive, the period is not closed yet.")
+    for month in months:
+        archived = archive_period(engine, archive_store, year, month)
+        click.echo(
+            f"{year}-{month:02d}: "
+            + ", ".join(f"{rows} {table}" for table, rows in archived.items())
+        )
+    click.secho("Success.", fg="green")
+
+
+@payroll_archive.command("list")
+def archive_list():
+    """Lists the archived periods of each table."""
+    from app.archive import archive_store
+    from app.archive.service import ARCHIVED_TABLES
+
+    for spec in ARCHIVED_TABLES:
+        periods = archive_store.periods(spec.name)
+        click.echo(
+            f"{spec.name}: "
+            + (", ".join(f"{y}-{m:02d}" for y, m in periods) or "nothing archived")
+        )
+
+
+@payroll_cli.group("storage")
+def payroll_storage():
+    """Container for the file storage commands."""
+    pass
+
+
+@payroll_storage.command("gc")
+@click.option(
+    "--grace-hours",
+    default=24,
+    show_default=True,
+    help="Only contents untouched for this long are removed.",
+)
+def storage_gc(grace_hours):
+    """Removes stored contents no file points at any more."""
+    from app.api.routes.storage.services import collect_garbage
+    from app.auth.models import PayrollUser  # noqa: F401, mapped by companies
+    from app.db.core import SessionLocal
+
+    with SessionLocal() as db_session:
+        removed = collect_garbage(
+            db_session=db_session, grace_seconds=grace_hours * 3600
+        )
+    click.echo(f"Removed {removed} files.")
+    click.secho("Success.", fg="green")
+
+
+@payroll_cli.command("serve")
+@click.option("--host", default="0.0.0.0", show_default=True, envvar="HOST")
+@click.option("--port", default=8000, show_default=True, envvar="PORT")
+@click.option(
+    "-w",
+    "--workers",
+    type=int,
+    envvar="WEB_CONCURRENCY",
+    help="Worker processes. Defaults to the CPUs available to the container.",
+)
+@click.option(
+    "--timeout",
+    default=60,
+    show_default=True,
+    help="Seconds a silent worker is given before it is killed and replaced.",
+)
+@click.option(
+    "--graceful-timeout",
+    default=30,
+    show_default=True,
+    help="Seconds in-flight requests get to finish on restart or shutdown.",
+)
+@click.option("--keepalive", default=5, show_default=True)
+@click.option(
+    "--max-requests",
+    default=0,
+    show_default=True,
+    help="Replace a worker after this many requests, 0 never does.",
+)
+@click.option("--max-requests-jitter", default=0, show_default=True)
+@click.option(
+    "--preload/--no-preload",
+    default=True,
+    show_default=True,
+    help="Import the app once in the master before forking the workers.",
+)
+def serve(**options):
+    """Serves the API with one worker process per CPU.
+
+    Send HUP to the master for a rolling restart of the workers (they keep
+    the preloaded code unless --no-preload), TERM to drain and stop,
+    TTIN/TTOU to add or remove a worker.
+    """
+    from app.core.server import serve as run_server
+
+    run_server(**options)
+
+
+@payroll_cli.command("importtime")
+@click.option("--module", default="app.main", show_default=True)
+@click.option(
+    "--runs", default=3, show_default=True, help="Cold imports, the fastest is kept."
+)
+@click.option("--limit", default=20, show_default=True, help="Rows per table.")
+@click.option(
+    "--budget",
+    type=float,
+    help="Seconds; exits with 1 when the cold import takes longer.",
+)
+@click.pass_context
+def importtime(ctx, module, runs, limit, budget):
+    """Reports what a cold import of the API spends its time on."""
+    from app.core.importtime import by_package, measure_import, total_us
+
+    rows = min(
+        (measure_import(module) for _ in range(runs)),
+        key=lambda rows: total_us(rows, module),
+    )
+    total = total_us(rows, module) / 1e6
+
+    click.secho(f"{'module':<56} {'self ms':>9} {'cumul. ms':>10}", bold=True)
+    for row in sorted(rows, key=lambda row: -row.self_us)[:limit]:
+        click.echo(
+            f"{row.module:<56} {row.self_us / 1e3:9.1f} {row.cumulative_us / 1e3:10.1f}"
+        )
+    click.secho(f"\n{'package':<56} {'self ms':>9} {'modules':>10}", bold=True)
+    for package, self_us, modules in by_package(rows)[:limit]:
+        click.echo(f"{package:<56} {self_us / 1e3:9.1f} {modules:10}")
+
+    click.echo(f"\n{len(rows)} modules, import {module} took {total:.3f}s")
+    if budget is not None and total > budget:
+        click.secho(f"Over the budget of {budget:.3f}s.", fg="red")
+        ctx.exit(1)
+
+
 def entrypoint():
     """The entry that the CLI is executed from"""
     try:
@@ -2,4 +2,4 @@
 
 poetry run alembic upgrade head
 
-uvicorn app.main:app --host 0.0.0.0 --port 8000
+python cli.py serve --host 0.0.0.0 --port 8000
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+# the relationships of the models name the user model
+import app.auth.models  # noqa: F401
+from app.db.core import Base
+from app.db.models import PayrollAttendance, PayrollEmployee
+
+# employee id: company id
+EMPLOYEES = {1: 1, 2: 1, 3: 2}
+
+
+def employee(employee_id: int, company_id: int) -> dict:
+    return {
+        "id": employee_id,
+        "code": f"E{employee_id:03d}",
+        "name": f"Employee {employee_id}",
+        "date_of_birth": date(1990, 1, 1),
+        "gender": "male",
+        "department_id": 1,
+        "position_id": 1,
+        "mst": f"{employee_id:010d}",
+        "cccd": f"{employee_id:012d}",
+        "cccd_date": date(2015, 1, 1),
+        "cccd_place": "Ha Noi",
+        "is_probation": False,
+        "start_date": date(2020, 1, 1),
+        "is_offboard": False,
+        "salary": 10_000_000,
+        "meal_benefit": 0,
+        "transportation_benefit": 0,
+        "housing_benefit": 0,
+        "toxic_benefit": 0,
+        "phone_benefit": 0,
+        "attendant_benefit": 0,
+        "company_id": company_id,
+        "created_by": "admin",
+    }
+
+
+@dataclass
+class AttendanceDatabase:
+    url: str
+    sessions: async_sessionmaker
+
+    def attendances(self) -> dict:
+        """Returns the stored work hours by (employee_id, day)."""
+        engine = create_engine(self.url)
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(
+                    PayrollAttendance.employee_id,
+                    PayrollAttendance.day_attendance,
+                    PayrollAttendance.work_hours,
+                )
+            ).all()
+        engine.dispose()
+        return {(employee_id, day): hours for employee_id, day, hours in rows}
+
+
+@pytest.fixture
+def attendance_db(tmp_path) -> AttendanceDatabase:
+    """A SQLite database with the employees of EMPLOYEES and no attendance."""
+    url = f"sqlite:///{tmp_path / 'payroll.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(
+        engine, tables=[PayrollEmployee.__table__, PayrollAttendance.__table__]
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            insert(PayrollEmployee),
+            [employee(*item) for item in EMPLOYEES.items()],
+        )
+    engine.dispose()
+    # every asyncio.run gets its own connection
+    async_engine = create_async_engine(
+        url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool
+    )
+    return AttendanceDatabase(
+        url, async_sessionmaker(async_engine, expire_on_commit=False)
+    )
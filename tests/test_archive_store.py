@@ -0,0 +1,47 @@
+import stat
+
+import pyarrow as pa
+
+from app.archive import ArchiveStore
+
+
+def rows(*ids, company_id=1):
+    return pa.table(
+        {
+            "id": list(ids),
+            "company_id": [company_id] * len(ids),
+            "work_hours": [8.0] * len(ids),
+        }
+    )
+
+
+def test_finds_an_archived_row_by_id(tmp_path):
+    store = ArchiveStore(tmp_path)
+    store.write("attendances", 2024, 3, rows(1, 2))
+    store.write("attendances", 2024, 4, rows(3, company_id=2))
+
+    assert store.find("attendances", 3, columns=["id", "company_id"]) == {
+        "id": 3,
+        "company_id": 2,
+    }
+    assert store.find("attendances", 4, columns=["id"]) is None
+    assert store.find("overtimes", 1, columns=["id"]) is None
+
+
+def test_columns_left_out_of_the_files_are_read_as_nulls(tmp_path):
+    store = ArchiveStore(tmp_path)
+    store.write("attendances", 2024, 3, rows(1))
+
+    assert store.read("attendances", columns=["id", "note"]) == [
+        {"id": 1, "note": None}
+    ]
+
+
+def test_parts_are_only_readable_by_their_owner(tmp_path):
+    store = ArchiveStore(tmp_path / "archive")
+
+    part = store.write("payroll_managements", 2024, 3, rows(1))
+
+    assert stat.S_IMODE(part.stat().st_mode) == 0o600
+    for directory in (store.root, part.parent.parent, part.parent):
+        assert stat.S_IMODE(directory.stat().st_mode) == 0o700
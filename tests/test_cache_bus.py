@@ -0,0 +1,58 @@
+from app.cache.bus import LocalVersionBus
+
+OTHER_PID = "1"
+
+
+class RecordingCache:
+    def __init__(self):
+        self.invalidated = []
+        self.cleared = 0
+
+    def invalidate(self, namespace, scope=None):
+        self.invalidated.append((namespace, scope))
+
+    def clear(self):
+        self.cleared += 1
+
+
+def write(path, *lines):
+    with open(path, "a", encoding="utf-8") as bus:
+        bus.writelines(f"{line}\n" for line in lines)
+
+
+def test_replays_the_lines_of_other_workers(tmp_path):
+    path = tmp_path / "cache.bus"
+    write(path, f"{OTHER_PID} shift 1")
+    bus = LocalVersionBus(str(path), poll_seconds=0)
+    cache = RecordingCache()
+    bus.publish("schedule", 2)
+    write(path, f"{OTHER_PID} shift 3", f"{OTHER_PID} insurance ")
+
+    bus.poll(cache)
+
+    # its own line and those from before it started are skipped
+    assert cache.invalidated == [("shift", 3), ("insurance", None)]
+    assert cache.cleared == 0
+
+
+def test_truncation_clears_the_cache_once_regrown(tmp_path):
+    path = tmp_path / "cache.bus"
+    write(path, *(f"{OTHER_PID} shift {company}" for company in range(20)))
+    bus = LocalVersionBus(str(path), poll_seconds=0)
+    cache = RecordingCache()
+    offset = path.stat().st_size
+
+    # another worker truncates and the file grows past the old offset
+    # before the next poll
+    LocalVersionBus(str(path), max_bytes=offset).publish("shift", 99)
+    write(path, *(f"{OTHER_PID} shift {company}" for company in range(40)))
+    assert path.stat().st_size > offset
+
+    bus.poll(cache)
+    assert cache.cleared == 1
+    assert cache.invalidated == []
+
+    write(path, f"{OTHER_PID} shift 7")
+    bus.poll(cache)
+    assert cache.cleared == 1
+    assert cache.invalidated == [("shift", 7)]
@@ -0,0 +1,47 @@
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middlewares.compression import CompressionMiddleware
+
+BODY = "payroll " * 512
+
+
+def text(request):
+    return PlainTextResponse(BODY)
+
+
+def small(request):
+    return PlainTextResponse("ok")
+
+
+def archive(request):
+    return Response(BODY.encode(), media_type="application/zip")
+
+
+app = Starlette(
+    routes=[Route("/text", text), Route("/small", small), Route("/zip", archive)]
+)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+client = TestClient(app)
+
+
+def test_compressed_response_varies_on_accept_encoding():
+    response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == BODY
+
+
+def test_uncompressed_response_varies_on_accept_encoding():
+    for path, accept_encoding in (("/text", "identity"), ("/small", "gzip")):
+        response = client.get(path, headers={"Accept-Encoding": accept_encoding})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_ineligible_response_does_not_vary():
+    response = client.get("/zip", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
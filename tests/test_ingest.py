@@ -0,0 +1,135 @@
+import asyncio
+from datetime import date
+
+import orjson
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes.attendances.services import ATTENDANCE_INGEST
+from app.db.ingest import (
+    MAX_LINE_SIZE,
+    BatchIngest,
+    ndjson_lines,
+    parse_row,
+    upsert_statement,
+)
+
+DAY = date(2024, 5, 2)
+
+
+def line(employee_id=1, company_id=1, work_hours=8, day=DAY) -> bytes:
+    return orjson.dumps(
+        {
+            "employee_id": employee_id,
+            "company_id": company_id,
+            "day_attendance": day.isoformat(),
+            "work_hours": work_hours,
+            "is_holiday": False,
+        }
+    )
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def read_lines(*chunks: bytes) -> list:
+    async def collect():
+        return [item async for item in ndjson_lines(stream(*chunks))]
+
+    return asyncio.run(collect())
+
+
+def test_lines_are_numbered_across_chunks():
+    assert read_lines(b'{"a": 1}\n\n{"b"', b": 2}\n", b'{"c": 3}') == [
+        (1, b'{"a": 1}'),
+        (3, b'{"b": 2}'),
+        (4, b'{"c": 3}'),
+    ]
+
+
+def test_a_line_too_long_is_reported_as_none():
+    assert read_lines(b"x" * (MAX_LINE_SIZE + 1), b"\n", b'{"a": 1}\n') == [
+        (1, None),
+        (2, b'{"a": 1}'),
+    ]
+    assert read_lines(b'{"a": 1}\n', b"x" * (MAX_LINE_SIZE + 1)) == [
+        (1, b'{"a": 1}'),
+        (2, None),
+    ]
+
+
+def test_parse_row_validates_like_the_single_row_endpoint():
+    row = parse_row(ATTENDANCE_INGEST, line(work_hours=4))
+    assert (row.employee_id, row.day_attendance, row.work_hours) == (1, DAY, 4)
+
+    with pytest.raises(ValueError, match="^line longer than"):
+        parse_row(ATTENDANCE_INGEST, None)
+    with pytest.raises(ValueError, match="^invalid JSON"):
+        parse_row(ATTENDANCE_INGEST, b'{"employee_id": ')
+    with pytest.raises(ValueError, match="^work_hours: Field required$"):
+        parse_row(
+            ATTENDANCE_INGEST,
+            b'{"employee_id": 1, "company_id": 1, '
+            b'"day_attendance": "2024-05-02", "is_holiday": false}',
+        )
+    with pytest.raises(ValueError, match="work hours"):
+        parse_row(ATTENDANCE_INGEST, line(work_hours=25))
+
+
+BODY = [
+    line(employee_id=1, work_hours=8),
+    line(employee_id=1, work_hours=25),
+    line(employee_id=99),
+    line(employee_id=3),
+    line(employee_id=1, work_hours=4),
+    line(employee_id=2),
+]
+
+
+def ingest(attendance_db, body, batch_size, max_errors=10) -> dict:
+    async def run():
+        async with attendance_db.sessions() as db_session:
+            return await BatchIngest(
+                db_session=db_session,
+                target=ATTENDANCE_INGEST,
+                max_errors=max_errors,
+            ).run(stream(b"\n".join(body)), batch_size)
+
+    return asyncio.run(run())
+
+
+def test_refused_lines_are_reported_with_their_number(attendance_db):
+    result = ingest(attendance_db, BODY, batch_size=100)
+
+    errors = {error["line"]: error["error"] for error in result["errors"]}
+    assert sorted(errors) == [2, 3, 4]
+    assert "work hours" in errors[2]
+    assert errors[3] == "employee not found"
+    assert errors[4] == "employee is not in company 1"
+    # line 1 is replaced by line 5, for the same employee and day
+    assert (result["received"], result["upserted"]) == (6, 2)
+    assert (result["failed"], result["replaced"]) == (3, 1)
+    assert attendance_db.attendances() == {(1, DAY): 4, (2, DAY): 8}
+
+
+def test_a_later_batch_overwrites_the_stored_row(attendance_db):
+    result = ingest(attendance_db, BODY, batch_size=2, max_errors=2)
+
+    # lines 1 and 5 are in different batches, both are upserted
+    assert (result["received"], result["upserted"]) == (6, 3)
+    assert (result["failed"], result["replaced"]) == (3, 0)
+    assert len(result["errors"]) == 2
+    assert attendance_db.attendances() == {(1, DAY): 4, (2, DAY): 8}
+
+
+def test_postgresql_upserts_a_batch_in_one_statement():
+    statement = str(
+        upsert_statement(ATTENDANCE_INGEST, ["employee_id", "work_hours"]).compile(
+            dialect=postgresql.dialect()
+        )
+    )
+
+    assert statement.count("unnest(") == 2
+    assert "ON CONFLICT (employee_id, day_attendance) DO UPDATE" in statement
@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.db.instrumentation import start_query_stats, stop_query_stats
+
+
+def test_failed_statement_leaves_no_start_time():
+    engine = create_engine("sqlite://")
+    stats, token = start_query_stats()
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+            assert not conn.info["query_start_time"]
+
+            conn.execute(text("SELECT 1"))
+            assert not conn.info["query_start_time"]
+    finally:
+        stop_query_stats(token)
+    assert stats.count == 1
@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.db.slow_queries import slow_query_log
+
+
+@pytest.fixture
+def slow_query_threshold():
+    threshold = slow_query_log.threshold
+    # timed, but never slow enough to be captured
+    slow_query_log.threshold = 3600.0
+    yield
+    slow_query_log.threshold = threshold
+
+
+def test_failed_statement_leaves_no_start_time(slow_query_threshold):
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+        assert not conn.info["slow_query_start_time"]
+
+        conn.execute(text("SELECT 1"))
+        assert not conn.info["slow_query_start_time"]
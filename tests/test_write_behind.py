@@ -0,0 +1,192 @@
+import asyncio
+import os
+from datetime import date
+
+import orjson
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.routes.attendances import controllers
+from app.api.routes.attendances.schemas import AttendanceCreate
+from app.api.routes.attendances.services import ATTENDANCE_INGEST
+from app.db import write_behind
+from app.db.write_behind import WriteBehindBuffer
+from app.exception.app_exception import AppException
+
+DAY = date(2024, 5, 2)
+# stored on stop() or an explicit flush() only
+OPTIONS = dict(flush_interval=3600, max_rows=1000, max_buffered=100, fsync=False)
+
+
+def attendance(employee_id=1, company_id=1, work_hours=8) -> AttendanceCreate:
+    return AttendanceCreate(
+        employee_id=employee_id,
+        company_id=company_id,
+        day_attendance=DAY,
+        work_hours=work_hours,
+        is_holiday=False,
+    )
+
+
+def segments(directory) -> list:
+    return sorted(directory.glob("attendances-*.ndjson"))
+
+
+async def start(directory, **options) -> WriteBehindBuffer:
+    """Starts a buffer and lets its flusher run the replay of nothing."""
+    buffer = WriteBehindBuffer(ATTENDANCE_INGEST)
+    await buffer.start(directory=str(directory), **dict(OPTIONS, **options))
+    await idle(buffer)
+    return buffer
+
+
+async def idle(buffer: WriteBehindBuffer):
+    """Returns once the flusher has taken the wakeup of the start."""
+    while buffer.wakeup.is_set():
+        await asyncio.sleep(0)
+
+
+async def drained(buffer: WriteBehindBuffer):
+    while buffer.buffered:
+        await asyncio.sleep(0.01)
+
+
+async def kill(buffer: WriteBehindBuffer):
+    """Stops a buffer like a killed worker: no flush, the locks released."""
+    buffer.running = False
+    buffer.wakeup.set()
+    await buffer.task
+    for segment in (*buffer.pending, buffer.segment):
+        os.close(segment.fd)
+
+
+@pytest.fixture
+def database(attendance_db, monkeypatch):
+    monkeypatch.setattr(write_behind, "AsyncSessionLocal", attendance_db.sessions)
+    return attendance_db
+
+
+def test_the_journal_of_a_killed_worker_is_replayed(tmp_path, database):
+    async def run():
+        killed = await start(tmp_path)
+        killed.append(attendance(employee_id=1, work_hours=8))
+        killed.append(attendance(employee_id=2))
+        killed.append(attendance(employee_id=1, work_hours=4))
+
+        # a running worker's segments are not taken over
+        running = await start(tmp_path)
+        assert running.buffered == 0
+        await running.stop()
+
+        await kill(killed)
+        [segment] = segments(tmp_path)
+        with open(segment, "ab") as file:
+            file.write(b'{"employee_id": 2, "company_id": 1, "day_att')
+
+        replaying = WriteBehindBuffer(ATTENDANCE_INGEST)
+        await replaying.start(directory=str(tmp_path), **OPTIONS)
+        # the torn last line is skipped
+        assert replaying.buffered == 3
+        # stored by the flusher without waiting for the interval
+        await asyncio.wait_for(drained(replaying), 10)
+        await replaying.stop()
+
+    asyncio.run(run())
+
+    assert database.attendances() == {(1, DAY): 4, (2, DAY): 8}
+    assert segments(tmp_path) == []
+
+
+def test_rows_stay_journaled_while_the_database_is_unreachable(
+    tmp_path, database, monkeypatch
+):
+    unreachable = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'payroll.db'}",
+        poolclass=NullPool,
+    )
+    monkeypatch.setattr(
+        write_behind, "AsyncSessionLocal", async_sessionmaker(unreachable)
+    )
+    journal = tmp_path / "journal"
+
+    async def run(restarted: bool):
+        buffer = WriteBehindBuffer(ATTENDANCE_INGEST)
+        await buffer.start(directory=str(journal), **OPTIONS)
+        if restarted:
+            await asyncio.wait_for(drained(buffer), 10)
+        else:
+            await idle(buffer)
+            buffer.append(attendance())
+            await buffer.flush()
+            assert buffer.buffered == 1
+        await buffer.stop()
+
+    asyncio.run(run(restarted=False))
+    assert len(segments(journal)) == 1
+    assert database.attendances() == {}
+
+    monkeypatch.setattr(write_behind, "AsyncSessionLocal", database.sessions)
+    asyncio.run(run(restarted=True))
+    assert database.attendances() == {(1, DAY): 8}
+    assert segments(journal) == []
+
+
+def test_a_full_buffer_refuses_rows(tmp_path, database):
+    async def run():
+        buffer = await start(tmp_path, max_buffered=2)
+        buffer.append(attendance(employee_id=1))
+        buffer.append(attendance(employee_id=2))
+        with pytest.raises(AppException) as refused:
+            buffer.append(attendance(employee_id=1, work_hours=4))
+        await buffer.flush()
+        buffer.append(attendance(employee_id=1, work_hours=4))
+        await buffer.stop()
+        return refused.value
+
+    refused = asyncio.run(run())
+
+    assert (refused.code, refused.http_status) == ("ERR_WRITE_BUFFER_FULL", 503)
+    assert database.attendances() == {(1, DAY): 4, (2, DAY): 8}
+
+
+def test_refused_rows_are_kept_with_their_error(tmp_path, database):
+    async def run():
+        buffer = await start(tmp_path)
+        buffer.append(attendance(employee_id=99))
+        buffer.append(attendance(employee_id=1))
+        buffer.append(attendance(employee_id=3))
+        await buffer.stop()
+
+    asyncio.run(run())
+
+    assert database.attendances() == {(1, DAY): 8}
+    rejected = [
+        orjson.loads(line)
+        for line in (tmp_path / "attendances.rejected.ndjson").read_bytes().splitlines()
+    ]
+    assert [(item["row"]["employee_id"], item["error"]) for item in rejected] == [
+        (3, "employee is not in company 1"),
+        (99, "employee not found"),
+    ]
+    # stop() removed the stored segments and its empty last one
+    assert segments(tmp_path) == []
+
+
+def test_create_one_journals_while_the_buffer_runs(tmp_path, database):
+    buffer = controllers.attendance_buffer
+
+    async def run():
+        await buffer.start(directory=str(tmp_path), **OPTIONS)
+        await idle(buffer)
+        try:
+            return controllers.create_one(db_session=None, attendance_in=attendance())
+        finally:
+            await buffer.stop()
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 202
+    assert orjson.loads(response.body) == attendance().model_dump(mode="json")
+    assert not buffer.running
+    assert database.attendances() == {(1, DAY): 8}